@@ -5,15 +5,15 @@ make_color_fade
 Create a video that fades from one color to another.
 """
 import argparse
+from pathlib import Path
 from textwrap import dedent
-
-import numpy as np
+from typing import Optional
 
 import imgwriter as iw
 
 
 # Constants.
-R, G, B = 0, 1, 2
+MPEG_MAX_SIZE = iw.imgwriter.MPEG_MAX_SIZE
 RESOLUTIONS = iw.RESOLUTIONS
 SUPPORTED = iw.SUPPORTED
 
@@ -63,7 +63,7 @@ def main(
     end_color: tuple[int, int, int],
     frames: int,
     framerate: float,
-    codec: str = 'mp4v'
+    codec: Optional[str] = None
 ) -> None:
     """Create a video that fades from one color to another.
 
@@ -79,19 +79,31 @@ def main(
         order) are contained in the final color of the fade.
     :param frames: The number of frames for the transition.
     :param framerate: The frame rate of the video.
+    :param codec: (Optional.) The codec used to encode the video. The
+        default is mp4v, unless the video is too large for the MPEG
+        codecs, in which case it's saved as FFV1 in an .avi file.
     :return: None.
     :rtype: None.
     """
-    # Create the array of image data for the fade.
-    diff_inc = [-1 * (s - e) / frames for s, e in zip(start_color, end_color)]
-    a = np.indices((frames, *res[::-1], 3), dtype=np.float32)[0]
-    for c in R, G, B:
-        a[:, :, :, c] *= diff_inc[c]
-        a[:, :, :, c] += start_color[c]
-    a = a.astype(np.uint8)
-
-    # Send that image and the save location to imagewriter.save_video.
-    iw.write_video(filepath, a, framerate, codec=codec)
+    # The MPEG codecs can't encode frames larger than MPEG_MAX_SIZE on
+    # a side, so larger fades default to FFV1, which needs an .avi.
+    if codec is None and max(res) > MPEG_MAX_SIZE:
+        codec = 'FFV1'
+        avi = str(Path(filepath).with_suffix('.avi'))
+        if avi != filepath:
+            msg = (
+                f'Saving as FFV1 to {avi}, since mp4v is limited to '
+                f'{MPEG_MAX_SIZE} pixels on a side.'
+            )
+            print(msg)
+        filepath = avi
+    elif codec is None:
+        codec = 'mp4v'
+
+    # Build the frames of the fade one at a time and send them to the
+    # video as they are built, so only one frame is ever in memory.
+    fade = iw.fade(res, start_color, end_color, frames)
+    iw.write_frames(filepath, fade, framerate, codec=codec)
 
 
 if __name__ == '__main__':
@@ -107,8 +119,12 @@ if __name__ == '__main__':
             'kwargs': {
                 'type': str,
                 'action': 'store',
-                'help': 'The codec to encode the video.',
-                'default': 'mp4v',
+                'help': (
+                    'The codec to encode the video. The default is mp4v, '
+                    'or FFV1 in an .avi file for resolutions over '
+                    f'{MPEG_MAX_SIZE} pixels on a side, like 16k.'
+                ),
+                'default': None,
             },
         },
         'end_color': {
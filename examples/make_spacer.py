@@ -6,8 +6,7 @@ Create a black JPG that can be used as a spacer in a video.
 """
 import argparse
 from textwrap import dedent
-
-import numpy as np
+from typing import Optional
 
 import imgwriter as iw
 
@@ -52,7 +51,8 @@ def get_channels(color: str) -> tuple[int, int, int]:
 
 def main(filepath: str,
          res: tuple[int, int],
-         color: tuple[int, int, int]) -> None:
+         color: tuple[int, int, int],
+         cache: Optional[str] = None) -> None:
     """Create a color image that can be used as a spacer in a video.
 
     :param filepath: The location to save the spacer image.
@@ -62,16 +62,14 @@ def main(filepath: str,
     :param color: The color of the image. This is a tuple of integers
         representing the amounts of red, green, and blue (in that
         order) are contained in the color.
+    :param cache: (Optional.) A directory to keep encoded spacer images
+        in. If a spacer with the same resolution, color, and format has
+        already been made, it's copied rather than encoded again.
     :return: None.
     :rtype: None.
     """
-    # Create the array of image data for the spacer image.
-    a = np.zeros((1, *res[::-1], 3), dtype=int)
-    for c in 0, 1, 2:
-        a[:, :, :, c] = color[c]
-
-    # Send that image and the save location to imagewriter.save_image.
-    iw.save(filepath, a)
+    file_cache = iw.FileCache(cache) if cache else None
+    iw.write_spacer(filepath, res, color, cache=file_cache)
 
 
 if __name__ == '__main__':
@@ -101,6 +99,15 @@ if __name__ == '__main__':
                 'default': '720p'
             }
         },
+        'cache': {
+            'args': ('-C', '--cache',),
+            'kwargs': {
+                'type': str,
+                'action': 'store',
+                'help': 'A directory to cache spacer images in.',
+                'default': None
+            }
+        },
         'color': {
             'args': ('-c', '--color',),
             'kwargs': {
@@ -133,4 +140,4 @@ if __name__ == '__main__':
     # Create the spacer image.
     res = RESOLUTIONS[args.resolution]
     color = get_channels(args.color)
-    main(args.filepath, res, color)
+    main(args.filepath, res, color, args.cache)
@@ -4,7 +4,18 @@ __init__
 
 The namespace of the :mod:`imgwriter` module.
 """
-__all__ = ['imgwriter', 'imgreader']
-from imgwriter.common import RESOLUTIONS, SUPPORTED, Image, Video
+__all__ = [
+    'batch', 'cache', 'frames', 'imgwriter', 'imgreader', 'pipeline',
+    'reducers',
+]
+from imgwriter.cache import *
+from imgwriter.common import (
+    RESOLUTIONS, SUPPORTED, Image, Info, JobResult, MemoryBudgetExceeded,
+    Raw, Reducer, Target, Video
+)
+from imgwriter.frames import *
 from imgwriter.imgwriter import *
 from imgwriter.imgreader import *
+from imgwriter.pipeline import *
+from imgwriter.reducers import *
+from imgwriter.batch import *
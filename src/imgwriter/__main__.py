@@ -0,0 +1,13 @@
+"""
+__main__
+~~~~~~~~
+
+Run :mod:`imgwriter` from the command line with `python -m imgwriter`.
+"""
+import sys
+
+from imgwriter.cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+batch
+~~~~~
+
+Run many image and video jobs across a pool of processes.
+"""
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Union
+
+import cv2
+import numpy as np
+
+from imgwriter.cache import FileCache
+from imgwriter.common import SUPPORTED, JobResult, Video, get_resolution
+from imgwriter.frames import fade
+from imgwriter.imgreader import read, read_video
+from imgwriter.imgwriter import write, write_frames, write_spacer
+from imgwriter.pipeline import transcode
+
+
+# Importable names.
+__all__ = ['iter_batch', 'load_manifest', 'run_batch',]
+
+
+# Types.
+Job = Mapping[str, Any]
+Manifest = Union[str, Path, Iterable[Job]]
+
+
+# Job functions.
+def _fade_job(
+    filepath: str,
+    resolution: Union[str, list[int]] = '720p',
+    start_color: Union[str, list[int]] = 'ffffff',
+    end_color: Union[str, list[int]] = '000000',
+    frames: int = 72,
+    framerate: float = 24,
+    codec: str = 'mp4v'
+) -> None:
+    """Save a video that fades from one color to another."""
+    frames_ = fade(
+        get_resolution(resolution),
+        _color(start_color),
+        _color(end_color),
+        frames
+    )
+    write_frames(filepath, frames_, framerate, codec)
+
+
+def _spacer_job(
+    filepath: str,
+    resolution: Union[str, list[int]] = '720p',
+    color: Union[str, list[int]] = '000000',
+    cache: Optional[str] = None
+) -> None:
+    """Save an image that is a single color."""
+    file_cache = FileCache(cache) if cache else None
+    write_spacer(
+        filepath, get_resolution(resolution), _color(color), cache=file_cache
+    )
+
+
+def _transcode_job(filepath: str, source: str, **options: Any) -> None:
+    """Convert a video or series of images to a different format."""
+    transcode(source, filepath, **options)
+
+
+def _write_job(filepath: str, source: str, **options: Any) -> None:
+    """Save the image data read from one file to another file."""
+    # Video is read as BGR by default, but the writers expect RGB.
+    ftype = SUPPORTED.get(Path(source).suffix.casefold()[1:])
+    if isinstance(ftype, Video):
+        a = read_video(source, mode='rgb')
+    else:
+        a = read(source)
+    write(filepath, a, **options)
+
+
+# The types of jobs a batch can run, by the name used in the manifest.
+JOBS: dict[str, Callable[..., None]] = {
+    'fade': _fade_job,
+    'spacer': _spacer_job,
+    'transcode': _transcode_job,
+    'write': _write_job,
+}
+
+
+# Core functions.
+def iter_batch(
+    jobs: Manifest,
+    workers: Optional[int] = None
+) -> Iterator[JobResult]:
+    """Run a batch of jobs, yielding the result of each job as it
+    finishes, in the order the jobs are given.
+
+    :param jobs: The jobs to run, or the path to a manifest file that
+        contains the jobs. See :func:`run_batch`.
+    :param workers: (Optional.) The number of processes used to run
+        the jobs. See :func:`run_batch`.
+    :return: A :class:`imgwriter.JobResult` for each job.
+    :rtype: collections.abc.Iterator
+    """
+    if isinstance(jobs, (str, Path)):
+        jobs = load_manifest(jobs)
+    jobs = list(jobs)
+
+    if workers == 1:
+        yield from map(_run_job, range(len(jobs)), jobs)
+        return
+
+    # Sending jobs to the processes in chunks cuts the overhead of
+    # each job, but the chunks need to be small enough that the work
+    # stays balanced between processes.
+    chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        yield from executor.map(
+            _run_job, range(len(jobs)), jobs, chunksize=chunksize
+        )
+
+
+def load_manifest(path: Union[str, Path]) -> list[dict[str, Any]]:
+    """Read the jobs in a manifest file.
+
+    The manifest can either be a JSON file that contains a list of
+    jobs or an NDJSON file with one job on each line. Blank lines in
+    an NDJSON file are ignored.
+
+    :param path: The location of the manifest. If it's `-`, the
+        manifest is read from standard input.
+    :return: The jobs as a :class:`list`.
+    :rtype: list
+    """
+    if str(path) == '-':
+        text = sys.stdin.read()
+    else:
+        text = Path(path).read_text()
+
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def run_batch(
+    jobs: Manifest,
+    workers: Optional[int] = None
+) -> list[JobResult]:
+    """Run a batch of jobs across a pool of processes.
+
+    Each job is a mapping with a `job` key that gives the type of the
+    job. The rest of the keys are the arguments for the job:
+
+    *   `spacer`: Save a single color image with :func:`write_spacer`.
+        Takes `filepath`, `resolution`, `color`, and `cache`.
+    *   `fade`: Save a color fade with :func:`write_frames`. Takes
+        `filepath`, `resolution`, `start_color`, `end_color`, `frames`,
+        `framerate`, and `codec`.
+    *   `transcode`: Stream the frames of the file at `source` to
+        `filepath`. Any other keys are passed to :func:`transcode`.
+    *   `write`: Read the file at `source` and save it to `filepath`.
+        Any other keys are passed to :func:`write`.
+
+    Resolutions can be the name of a resolution in
+    :data:`imgwriter.RESOLUTIONS` or a list of the width and height.
+    Colors can be a 24-bit hex string or a list of the red, green,
+    and blue values.
+
+    A job that fails doesn't stop the batch. The error is recorded in
+    its result, and the rest of the jobs still run.
+
+    :param jobs: The jobs to run, or the path to a JSON or NDJSON
+        manifest file that contains the jobs.
+    :param workers: (Optional.) The number of processes used to run
+        the jobs. The default is the number of processors on the
+        system. If it's one, the jobs are run in this process.
+    :return: A :class:`imgwriter.JobResult` for each job, in the order
+        the jobs were given.
+    :rtype: list
+
+    Usage::
+
+        >>> results = run_batch([
+        ...     {'job': 'spacer', 'filepath': 'spam.jpg', 'color': 'c05632'},
+        ...     {'job': 'fade', 'filepath': 'eggs.mp4', 'frames': 24},
+        ... ], workers=2)
+        >>> [result.ok for result in results]
+        [True, True]
+    """
+    return list(iter_batch(jobs, workers))
+
+
+# Utility functions.
+def _color(value: Union[str, Iterable[int]]) -> tuple[int, ...]:
+    """Convert a 24-bit hex color string into an RGB color."""
+    if isinstance(value, str):
+        value = value.lstrip('#')
+        return tuple(int(value[i:i + 2], 16) for i in range(0, 6, 2))
+    return tuple(value)
+
+
+def _init_worker() -> None:
+    """Prepare a process in the pool to run jobs.
+
+    The jobs already run in parallel, so opencv shouldn't start its
+    own threads in each process. Encoding a tiny image loads the
+    encoders once, rather than in the first job each process runs.
+    """
+    cv2.setNumThreads(1)
+    cv2.imencode('.png', np.zeros((1, 1), dtype=np.uint8))
+
+
+def _run_job(index: int, job: Job) -> JobResult:
+    """Run a job, recording how long it took and whether it failed."""
+    options = dict(job)
+    name = str(options.pop('job', ''))
+    filepath = str(options.get('filepath', ''))
+    error = None
+    start = perf_counter()
+    try:
+        if name not in JOBS:
+            msg = f'There is no job named {name}.'
+            raise ValueError(msg)
+        JOBS[name](**options)
+    except Exception as ex:
+        error = f'{type(ex).__name__}: {ex}'
+    return JobResult(index, name, filepath, perf_counter() - start, error)
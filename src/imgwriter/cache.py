@@ -0,0 +1,396 @@
+"""
+cache
+~~~~~
+
+Caches for decoded image and video data and for encoded files.
+"""
+import hashlib
+import inspect
+import os
+import shutil
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Optional, Union
+from uuid import uuid4
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+# Importable names.
+__all__ = ['DiskCache', 'FileCache', 'MemoryCache',]
+
+
+# Classes.
+class DiskCache:
+    """A cache that stores decoded image data on disk as `.npy` files.
+
+    Decoding video is slow, and decoding the same file over and over
+    again is a waste of time. A :class:`DiskCache` stores the decoded
+    data the first time a file is read. Later reads with the same
+    options return a read-only :class:`numpy.memmap` of the stored data
+    rather than decoding the file again.
+
+    :param path: The directory used to store the cached data. It will
+        be created if it doesn't exist.
+    :param max_bytes: (Optional.) The total size the cached data is
+        allowed to take up on disk. When it goes over that size, the
+        least recently used data is deleted.
+    :return: A :class:`DiskCache` object.
+    :rtype: imgwriter.cache.DiskCache
+
+    Usage::
+
+        >>> cache = DiskCache('.imgcache', max_bytes=2 ** 30)
+        >>> a = read_video('spam.mp4', cache=cache)
+    """
+    def __init__(
+        self, path: Union[str, Path],
+        max_bytes: int = 2 ** 30
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of cached data stored on disk."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def clear(self) -> None:
+        """Remove all data from the cache."""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[np.memmap]:
+        """Get data from the cache.
+
+        :param key: The key for the data.
+        :return: A read-only :class:`numpy.memmap` if the data is in
+            the cache. Otherwise `None`.
+        :rtype: numpy.memmap or None
+        """
+        entry = self._entry(key)
+        try:
+            a = np.load(entry, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Touching the file marks it as recently used, which keeps it
+        # from being evicted.
+        os.utime(entry)
+        return a
+
+    def put(self, key: str, a: NDArray[Any]) -> NDArray[Any]:
+        """Add data to the cache.
+
+        :param key: The key for the data.
+        :param a: The data to cache.
+        :return: A read-only :class:`numpy.memmap` of the cached data.
+            If the data is too large for the cache, the data is returned
+            without being cached.
+        :rtype: numpy.memmap
+        """
+        if a.nbytes > self.max_bytes:
+            return a
+
+        # Write to a temporary file and then rename it, so another
+        # process reading from the cache never sees a partial file. The
+        # name is unique, so threads and processes writing the same key
+        # at the same time don't share a temporary file.
+        entry = self._entry(key)
+        tmp = entry.with_name(f'{entry.stem}.{uuid4().hex}.tmp')
+        with open(tmp, 'wb') as fh:
+            np.save(fh, a)
+        os.replace(tmp, entry)
+        _evict(self._entries(), self.max_bytes, keep=entry)
+        return np.load(entry, mmap_mode='r')
+
+    def _entries(self) -> list[Path]:
+        return list(self.path.glob('*.npy'))
+
+    def _entry(self, key: str) -> Path:
+        return self.path / f'{key}.npy'
+
+
+class FileCache:
+    """A cache that stores encoded image and video files on disk.
+
+    Some files, like spacer images, are created with the same settings
+    over and over again. A :class:`FileCache` keeps a copy of the file
+    the first time it's written. Later requests for the same file are
+    a copy or a hard link of the cached file rather than encoding the
+    data again.
+
+    :param path: The directory used to store the cached files. It will
+        be created if it doesn't exist.
+    :param max_bytes: (Optional.) The total size the cached files are
+        allowed to take up on disk. When it goes over that size, the
+        least recently used files are deleted.
+    :param link: (Optional.) Whether to hard link cached files to their
+        destination rather than copying them. Linked files share their
+        contents with the cache, so they must not be changed in place.
+        If the link can't be made, the file is copied.
+    :return: A :class:`FileCache` object.
+    :rtype: imgwriter.cache.FileCache
+
+    Usage::
+
+        >>> cache = FileCache('.imgcache/files')
+        >>> write_spacer('spam.jpg', (1920, 1080), cache=cache)
+    """
+    def __init__(
+        self, path: Union[str, Path],
+        max_bytes: int = 2 ** 30,
+        link: bool = False
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.link = link
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of cached files stored on disk."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def clear(self) -> None:
+        """Remove all files from the cache."""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def get(self, key: str, filepath: Union[str, Path]) -> bool:
+        """Copy a file from the cache.
+
+        :param key: The key for the file.
+        :param filepath: Where to put the copy of the file.
+        :return: Whether the file was in the cache.
+        :rtype: bool
+        """
+        entry = self._entry(key, filepath)
+        if not entry.exists():
+            return False
+
+        # Copy to a temporary file and then rename it, so there is
+        # never a partial file at the destination.
+        filepath = Path(filepath)
+        tmp = filepath.with_name(f'.{filepath.name}.{uuid4().hex}.tmp')
+        try:
+            if self.link:
+                try:
+                    os.link(entry, tmp)
+                except OSError:
+                    shutil.copyfile(entry, tmp)
+            else:
+                shutil.copyfile(entry, tmp)
+        except FileNotFoundError:
+            return False
+        os.replace(tmp, filepath)
+
+        # Touching the file marks it as recently used, which keeps it
+        # from being evicted.
+        os.utime(entry)
+        return True
+
+    def put(self, key: str, filepath: Union[str, Path]) -> None:
+        """Add a file to the cache.
+
+        :param key: The key for the file.
+        :param filepath: The location of the file to cache.
+        :return: None.
+        :rtype: None.
+        """
+        if Path(filepath).stat().st_size > self.max_bytes:
+            return
+
+        entry = self._entry(key, filepath)
+        tmp = entry.with_name(f'{entry.name}.{uuid4().hex}.tmp')
+        shutil.copyfile(filepath, tmp)
+        os.replace(tmp, entry)
+        _evict(self._entries(), self.max_bytes, keep=entry)
+
+    def _entries(self) -> list[Path]:
+        return [
+            entry for entry in self.path.iterdir()
+            if entry.suffix != '.tmp'
+        ]
+
+    def _entry(self, key: str, filepath: Union[str, Path]) -> Path:
+        return self.path / f'{key}{Path(filepath).suffix.casefold()}'
+
+
+class MemoryCache:
+    """A cache that keeps decoded image data in memory.
+
+    Arrays returned from a :class:`MemoryCache` are shared by everyone
+    who reads the same file, so they are made read-only rather than
+    being copied each time they are returned. If you need to change
+    the data, copy it first.
+
+    The cache is safe to use from multiple threads.
+
+    :param max_bytes: (Optional.) The total size of the arrays the cache
+        is allowed to hold. When it goes over that size, the least
+        recently used arrays are removed.
+    :return: A :class:`MemoryCache` object.
+    :rtype: imgwriter.cache.MemoryCache
+
+    Usage::
+
+        >>> cache = MemoryCache(max_bytes=2 ** 28)
+        >>> a = read_image('spam.png', cache=cache)
+        >>> cache.hits, cache.misses
+        (0, 1)
+    """
+    def __init__(self, max_bytes: int = 2 ** 28) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, NDArray[Any]] = OrderedDict()
+        self._lock = Lock()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of data held in the cache."""
+        return self._nbytes
+
+    def clear(self) -> None:
+        """Remove all data from the cache."""
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+
+    def get(self, key: str) -> Optional[NDArray[Any]]:
+        """Get data from the cache.
+
+        :param key: The key for the data.
+        :return: A read-only :class:`numpy.ndarray` if the data is in
+            the cache. Otherwise `None`.
+        :rtype: numpy.ndarray or None
+        """
+        with self._lock:
+            a = self._data.get(key)
+            if a is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return a
+
+    def put(self, key: str, a: NDArray[Any]) -> NDArray[Any]:
+        """Add data to the cache.
+
+        :param key: The key for the data.
+        :param a: The data to cache. It will be made read-only. If
+            the data is too large for the cache, it isn't changed.
+        :return: The cached data. If the data is too large for the
+            cache, the data is returned without being cached.
+        :rtype: numpy.ndarray
+        """
+        if a.nbytes > self.max_bytes:
+            return a
+
+        a.flags.writeable = False
+        with self._lock:
+            if key in self._data:
+                self._nbytes -= self._data.pop(key).nbytes
+            self._data[key] = a
+            self._nbytes += a.nbytes
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+        return a
+
+
+# Constants.
+# Reader arguments that change how a file is read but not the data
+# that is returned, so they aren't part of the cache key.
+IGNORED_OPTIONS = {'lazy', 'max_memory', 'workers',}
+
+
+# Types.
+Cache = Union[DiskCache, MemoryCache]
+Reader = Callable[..., Any]
+
+
+# Decorators.
+def uses_cache(fn: Reader) -> Reader:
+    """Allow the data returned by a reader to be cached.
+
+    The decorated reader accepts a `cache` keyword argument. If it is
+    given, the cache is checked before the file is decoded. Reads into
+    an existing array with the `out` argument and results that aren't
+    arrays, such as a lazy :class:`imgwriter.VideoStream`, aren't
+    cached. The key is built from the resolved path, modification
+    time, and size of the file, as well as the arguments passed to
+    the reader.
+    """
+    sig = inspect.signature(fn)
+
+    @wraps(fn)
+    def wrapper(*args, cache: Optional[Cache] = None, **kwargs) -> Any:
+        if cache is None or kwargs.get('out') is not None:
+            return fn(*args, **kwargs)
+
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        path, *args_ = bound.arguments.items()
+        options = {k: v for k, v in args_ if k not in IGNORED_OPTIONS}
+
+        # If the file can't be found, let the reader raise the error.
+        try:
+            key = make_key(fn.__name__, path[1], **options)
+        except FileNotFoundError:
+            return fn(*args, **kwargs)
+
+        a = cache.get(key)
+        if a is None:
+            a = fn(*args, **kwargs)
+            if isinstance(a, np.ndarray):
+                a = cache.put(key, a)
+        return a
+    return wrapper
+
+
+# Utility functions.
+def _evict(entries: list[Path], max_bytes: int, keep: Path) -> None:
+    """Remove least recently used entries until a cache is under its
+    size budget.
+    """
+    stats = []
+    for entry in entries:
+        try:
+            stats.append((entry.stat(), entry))
+        except FileNotFoundError:
+            continue
+    total = sum(stat.st_size for stat, _ in stats)
+    stats.sort(key=lambda item: item[0].st_mtime_ns)
+    for stat, entry in stats:
+        if total <= max_bytes:
+            break
+        if entry == keep:
+            continue
+        entry.unlink(missing_ok=True)
+        total -= stat.st_size
+
+
+def make_key(name: str, path: Union[str, Path], **options: Any) -> str:
+    """Build a cache key for a file.
+
+    :param name: The name of the reader used to decode the file.
+    :param path: The location of the file.
+    :param options: The options used to decode the file.
+    :return: The key as a :class:`str`.
+    :rtype: str
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    parts = [name, str(path), str(stat.st_mtime_ns), str(stat.st_size)]
+    parts.extend(f'{k}={options[k]!r}' for k in sorted(options))
+    return hashlib.sha256('\0'.join(parts).encode()).hexdigest()
@@ -0,0 +1,149 @@
+"""
+cli
+~~~
+
+The command line interface for :mod:`imgwriter`.
+"""
+import argparse
+import os
+import sys
+from typing import Optional, Sequence
+
+from imgwriter.batch import iter_batch
+from imgwriter.pipeline import transcode
+
+
+# Commands.
+def batch(manifest: str, workers: Optional[int] = None) -> int:
+    """Run the jobs in a manifest file, printing the result of each
+    job as it finishes.
+
+    :param manifest: The location of the manifest file.
+    :param workers: (Optional.) The number of processes used to run
+        the jobs.
+    :return: The exit status as an :class:`int`.
+    :rtype: int
+    """
+    failed = total = 0
+    for result in iter_batch(manifest, workers):
+        total += 1
+        status = 'ok' if result.ok else 'FAILED'
+        line = f'{status}\t{result.seconds:.3f}s\t{result.filepath}'
+        if not result.ok:
+            failed += 1
+            line += f'\t{result.error}'
+        print(line, flush=True)
+    print(f'{total - failed} of {total} jobs succeeded.')
+    return 1 if failed else 0
+
+
+def convert(args: argparse.Namespace) -> int:
+    """Convert a file to a different format.
+
+    :param args: The arguments for :func:`imgwriter.transcode`. A file
+        given as `-` is read from standard input or written to standard
+        output as Y4M video.
+    :return: The exit status as an :class:`int`.
+    :rtype: int
+    """
+    src = sys.stdin.buffer if args.src == '-' else args.src
+    dst = sys.stdout.buffer if args.dst == '-' else args.dst
+    try:
+        frames = transcode(
+            src, dst,
+            start=args.start,
+            stop=args.stop,
+            step=args.step,
+            scale=args.scale,
+            framerate=args.framerate,
+            codec=args.codec
+        )
+    except BrokenPipeError:
+        # The program reading the video stopped early. Standard output
+        # is pointed at devnull so Python doesn't fail again flushing it
+        # when it exits.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    # Don't mix the message into video written to standard output.
+    out = sys.stderr if args.dst == '-' else sys.stdout
+    print(f'Converted {frames} frames.', file=out)
+    return 0
+
+
+# Mainline.
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run :mod:`imgwriter` from the command line.
+
+    :param argv: (Optional.) The command line arguments. The default
+        is to use the arguments the script was called with.
+    :return: The exit status as an :class:`int`.
+    :rtype: int
+    """
+    p = argparse.ArgumentParser(
+        prog='imgwriter',
+        description='Create and convert image and video files.',
+    )
+    commands = p.add_subparsers(dest='command', required=True)
+
+    p_batch = commands.add_parser(
+        'batch',
+        help='Run the jobs in a JSON or NDJSON manifest.',
+        description='Run the jobs in a JSON or NDJSON manifest.',
+    )
+    p_batch.add_argument(
+        'manifest',
+        type=str,
+        help='The manifest file, or - to read it from standard input.',
+    )
+    p_batch.add_argument(
+        '-w', '--workers',
+        type=int,
+        help='The number of processes used to run the jobs.',
+        default=None,
+    )
+
+    p_transcode = commands.add_parser(
+        'transcode',
+        help='Convert a video or image series to a different format.',
+        description='Convert a video or image series to a different format.',
+    )
+    p_transcode.add_argument(
+        'src', type=str,
+        help='The file to read, or - to read Y4M from standard input.',
+    )
+    p_transcode.add_argument(
+        'dst', type=str,
+        help='The file to write, or - to write Y4M to standard output.',
+    )
+    p_transcode.add_argument(
+        '--start', type=int, default=None,
+        help='The number of the first frame to convert.',
+    )
+    p_transcode.add_argument(
+        '--stop', type=int, default=None,
+        help='Stop converting before this frame.',
+    )
+    p_transcode.add_argument(
+        '--step', type=int, default=1,
+        help='Only convert every step-th frame.',
+    )
+    p_transcode.add_argument(
+        '--scale', type=float, default=1,
+        help='Reduce the resolution by 1, 0.5, 0.25, or 0.125.',
+    )
+    p_transcode.add_argument(
+        '-f', '--framerate', type=float, default=None,
+        help='The frame rate of the video.',
+    )
+    p_transcode.add_argument(
+        '-c', '--codec', type=str, default='mp4v',
+        help='The codec to encode the video.',
+    )
+
+    args = p.parse_args(argv)
+    if args.command == 'batch':
+        return batch(args.manifest, args.workers)
+    elif args.command == 'transcode':
+        return convert(args)
+    return 2
@@ -6,10 +6,15 @@ Configuration values used by :mod:`imgwriter`.
 """
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Union
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Union
 
 
 # Exceptions.
+class MemoryBudgetExceeded(MemoryError):
+    """Reading the file would use more memory than is allowed."""
+
+
 class UnsupportedFileType(TypeError):
     """The given file type isn't supported."""
 
@@ -28,6 +33,114 @@ class Video:
     codecs: tuple[str, ...] = tuple()
 
 
+@dataclass
+class Raw:
+    ext: str
+    description: str = ''
+
+
+@dataclass(frozen=True)
+class Info:
+    """Information about the image data in a file.
+
+    :param width: The width of the image in pixels.
+    :param height: The height of the image in pixels.
+    :param channels: The number of color channels in the image.
+    :param dtype: The data type of the samples stored in the file.
+    :param frames: (Optional.) The number of frames in the file.
+    :param fps: (Optional.) The number of frames played per second.
+        This is `None` for still images.
+    :param codec: (Optional.) The FOURCC code of the codec used to
+        encode the video. This is `None` for still images.
+    """
+    width: int
+    height: int
+    channels: int
+    dtype: str
+    frames: int = 1
+    fps: Optional[float] = None
+    codec: Optional[str] = None
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """The shape of the array the file reads into."""
+        shape: tuple[int, ...] = (self.frames, self.height, self.width)
+        if self.channels > 1:
+            shape = (*shape, self.channels)
+        return shape
+
+
+@dataclass(frozen=True)
+class JobResult:
+    """The result of a job run by :func:`imgwriter.run_batch`.
+
+    :param index: The position of the job in the batch.
+    :param job: The type of the job.
+    :param filepath: The file the job was writing.
+    :param seconds: How long the job took to run.
+    :param error: (Optional.) Why the job failed. This is `None` if
+        the job succeeded.
+    """
+    index: int
+    job: str
+    filepath: str
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job succeeded."""
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class Reducer:
+    """The functions used by :func:`imgwriter.reduce_video` to reduce
+    the frames of a video to a single value.
+
+    :param fn: A function that takes the value so far and a batch of
+        frames and returns the new value.
+    :param init: (Optional.) The value before any frames are reduced.
+    :param combine: (Optional.) A function that takes the values from
+        two segments of the video and returns the value for both. It
+        is needed to reduce segments of the video in parallel.
+    :param finish: (Optional.) A function that takes the value after
+        all the frames are reduced and returns the final result.
+    """
+    fn: Callable[[Any, Any], Any]
+    init: Any = None
+    combine: Optional[Callable[[Any, Any], Any]] = None
+    finish: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass(frozen=True)
+class Target:
+    """A file saved by :func:`imgwriter.write_many`.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine whether the frames
+        are saved as a video or as a series of images.
+    :param resolution: (Optional.) Resize the frames before saving
+        them. This is either the name of a resolution in
+        :data:`imgwriter.RESOLUTIONS` or a tuple of the form (x, y).
+    :param interpolation: (Optional.) The method used to resize the
+        frames. See :func:`imgwriter.write_image`.
+    :param framerate: (Optional.) The number of frames the video will
+        play per second. This is ignored for images.
+    :param codec: (Optional.) The codec used to encode the video. This
+        is ignored for images.
+    :param frame: (Optional.) Only save the frame at this index as a
+        single image, such as a poster frame. This is ignored for
+        video.
+    """
+    filepath: Union[str, Path]
+    resolution: Optional[Union[str, tuple[int, int]]] = None
+    interpolation: Optional[str] = None
+    framerate: float = 12.0
+    codec: str = 'mp4v'
+    frame: Optional[int] = None
+
+
 # Common data.
 RESOLUTIONS: dict[str, tuple[int, int]] = {
     'dv_ntsc': (720, 480),
@@ -51,7 +164,7 @@ RESOLUTIONS: dict[str, tuple[int, int]] = {
     '8k': (7680, 4320),
     '16k': (15360, 8640),
 }
-VALID_FORMATS: list[Union[Image, Video]] = [
+VALID_FORMATS: list[Union[Image, Video, Raw]] = [
     Image('bmp', 'Windows bitmap'),
     Image('dib', 'Windows bitmap'),
 
@@ -74,13 +187,47 @@ VALID_FORMATS: list[Union[Image, Video]] = [
 
     Image('webp', 'WebP'),
 
-    Video('avi', 'Audio Video Interleave', ('avc1', 'mp4v',)),
-    Video('mov', 'QuickTime movie', ('avc1', 'hev1', 'mp4v',)),
+    Video(
+        'avi', 'Audio Video Interleave',
+        ('avc1', 'mp4v', 'FFV1', 'MJPG',)
+    ),
+    Video('mov', 'QuickTime movie', ('avc1', 'hev1', 'mp4v', 'png ',)),
     Video('mp4', 'MPEG-4 part 14', ('avc1', 'hev1', 'mp4v',)),
+    Video('y4m', 'YUV4MPEG2'),
+
+    Raw('npy', 'NumPy array'),
 ]
 
+# The chroma subsampling of Y4M video for each codec, and the ITU-R
+# BT.601 matrix, in studio range, used to convert BGR data to YUV.
+Y4M_CHROMA = {'I420': '420jpeg', 'I444': '444',}
+YUV_FROM_BGR = (
+    (24.966 / 255, 128.553 / 255, 65.481 / 255, 16.0),
+    (112.0 / 255, -74.203 / 255, -37.797 / 255, 128.0),
+    (-18.214 / 255, -93.786 / 255, 112.0 / 255, 128.0),
+)
+
 # Register supported types. This is also used to determine whether the
 # user is trying to save data as a still image or video.
-SUPPORTED: defaultdict[str, Union[Image, Video, None]] = defaultdict(
+SUPPORTED: defaultdict[str, Union[Image, Video, Raw, None]] = defaultdict(
     None, {format.ext: format for format in VALID_FORMATS}
 )
+
+
+# Utility functions.
+def get_resolution(value: Union[str, Sequence[int]]) -> tuple[int, int]:
+    """Get the width and height for a resolution.
+
+    :param value: The name of a resolution in :data:`RESOLUTIONS` or a
+        sequence of the form (x, y).
+    :return: The width and height as a :class:`tuple`.
+    :rtype: tuple
+    """
+    if isinstance(value, str):
+        try:
+            return RESOLUTIONS[value]
+        except KeyError:
+            msg = f'There is no resolution named {value}.'
+            raise ValueError(msg)
+    width, height = value
+    return (int(width), int(height))
@@ -0,0 +1,102 @@
+"""
+frames
+~~~~~~
+
+Sources of synthetic image data that build frames one at a time.
+"""
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+
+# Importable names.
+__all__ = ['fade', 'solid',]
+
+
+# Frame builders.
+def solid(
+    res: Sequence[int],
+    color: Sequence[float],
+    dtype: DTypeLike = np.uint8
+) -> NDArray[Any]:
+    """Build a frame that is a single color.
+
+    The frame is filled by :func:`numpy.full` in one pass, and it is
+    only as large as the data type needs it to be.
+
+    :param res: The resolution of the frame. This is a tuple of the
+        form (x, y), where "x" is the width of the frame in pixels and
+        "y" is the height of the frame in pixels.
+    :param color: The amounts of red, green, and blue (in that order)
+        in the color. A single value builds a grayscale frame.
+    :param dtype: (Optional.) The data type of the frame. The color
+        must be in the range used by that data type when the frame is
+        saved: 0 to 255 for integers and 0 to 1 for floats.
+    :return: An RGB or grayscale :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+
+    Usage::
+
+        >>> a = solid((3, 2), (0xc0, 0x56, 0x32))
+        >>> a.shape, a.dtype
+        ((2, 3, 3), dtype('uint8'))
+        >>> a[1, 2]
+        array([192,  86,  50], dtype=uint8)
+    """
+    width, height = res
+    shape: tuple[int, ...] = (height, width)
+    if np.ndim(color):
+        shape = (*shape, len(color))
+    return np.full(shape, color, dtype=dtype)
+
+
+# Frame generators.
+def fade(
+    res: Sequence[int],
+    start_color: Sequence[int],
+    end_color: Sequence[int],
+    frames: int
+) -> Iterator[NDArray[np.uint8]]:
+    """Build the frames of a fade from one color to another.
+
+    Only the color of each frame is calculated ahead of time. Each
+    frame is built as it's needed, so the memory used is the size of
+    one frame no matter how long or large the fade is.
+
+    :param res: The resolution of the frames. This is a tuple of the
+        form (x, y), where "x" is the width of the frame in pixels and
+        "y" is the height of the frame in pixels.
+    :param start_color: The amounts of red, green, and blue (in that
+        order) in the color of the first frame.
+    :param end_color: The amounts of red, green, and blue (in that
+        order) in the color the fade moves towards. The fade stops
+        one step before it reaches this color.
+    :param frames: The number of frames in the fade.
+    :return: The frames as RGB :class:`numpy.ndarray` objects of
+        unsigned 8-bit integers.
+    :rtype: collections.abc.Iterator
+
+    Usage::
+
+        >>> start, end = (0x00, 0xff, 0x00), (0xff, 0x00, 0xff)
+        >>> for frame in fade((3, 2), start, end, 3):
+        ...     print(frame[0, 0], frame.shape)
+        [  0 255   0] (2, 3, 3)
+        [ 85 170  85] (2, 3, 3)
+        [170  85 170] (2, 3, 3)
+    """
+    # The colors are calculated in 32-bit floats, so the frames have
+    # the same values as the frames calculated from a full array of
+    # frame indices.
+    diff_inc = np.array(
+        [-1 * (s - e) / frames for s, e in zip(start_color, end_color)],
+        dtype=np.float32
+    )
+    start = np.array(start_color, dtype=np.float32)
+    index = np.arange(frames, dtype=np.float32)[:, np.newaxis]
+    colors = (index * diff_inc + start).astype(np.uint8)
+
+    width, height = res
+    for color in colors:
+        yield np.full((height, width, len(color)), color, dtype=np.uint8)
@@ -4,45 +4,306 @@ imgreader
 
 A module for reading image and video files numpy arrays.
 """
+import glob
+import os
+import re
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed
+)
+from functools import lru_cache
+from io import BytesIO
+from itertools import count, islice
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
-from typing import Union
+from tempfile import NamedTemporaryFile
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Sequence, Union
+from weakref import finalize
 
 import cv2
 import numpy as np
 from numpy.typing import NDArray
 
-from imgwriter.common import SUPPORTED, Image, UnsupportedFileType, Video
+from imgwriter.cache import Cache, uses_cache
+from imgwriter.common import (
+    SUPPORTED,
+    YUV_FROM_BGR,
+    Image,
+    Info,
+    MemoryBudgetExceeded,
+    Raw,
+    UnsupportedFileType,
+    Video
+)
 
 
 # Importable names.
 __all__ = [
+    "VideoStream",
+    "info", "iter_video", "iter_y4m",
     "load", "load_image", "load_video",
-    "read", "read_image", "read_video",
+    "read", "read_image", "read_image_bytes", "read_many", "read_raw",
+    "read_series", "read_video", "read_video_bytes", "read_y4m",
 ]
 
 
+# Types.
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+# Constants.
+# The opencv flags that reduce the resolution of a JPEG while it's
+# decoded, by the factor the resolution is divided by and whether the
+# image is in color.
+REDUCED_FLAGS = {
+    1: (cv2.IMREAD_UNCHANGED, cv2.IMREAD_UNCHANGED),
+    2: (cv2.IMREAD_REDUCED_GRAYSCALE_2, cv2.IMREAD_REDUCED_COLOR_2),
+    4: (cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_COLOR_4),
+    8: (cv2.IMREAD_REDUCED_GRAYSCALE_8, cv2.IMREAD_REDUCED_COLOR_8),
+}
+
+# The opencv flags used to decode an image into a color space.
+MODE_FLAGS = {
+    None: cv2.IMREAD_UNCHANGED,
+    'gray': cv2.IMREAD_GRAYSCALE | cv2.IMREAD_ANYDEPTH,
+    'rgb': cv2.IMREAD_COLOR | cv2.IMREAD_ANYDEPTH,
+    'rgba': cv2.IMREAD_UNCHANGED,
+}
+
+# The opencv conversions used to change the color space of a frame of
+# video, and the number of channels in the result.
+FRAME_CONVERSIONS = {
+    'gray': cv2.COLOR_BGR2GRAY,
+    'rgb': cv2.COLOR_BGR2RGB,
+    'rgba': cv2.COLOR_BGR2RGBA,
+}
+FRAME_CHANNELS = {'rgb': 3, 'rgba': 4,}
+
+# When reading frames from a video, seek rather than stepping through
+# the frames if the next frame is more than this many frames away.
+SEEK_THRESHOLD = 250
+
+# The most memory, in bytes, that reading a video is allowed to use.
+# If it's `None`, the IMGWRITER_MAX_MEMORY environment variable is used
+# when a video is read. If that isn't set either, there is no limit.
+MAX_MEMORY: Optional[int] = None
+
+# The start of a Y4M video, and the layout of the planes in each
+# frame for the chroma subsamplings that can be read.
+Y4M_MAGIC = b'YUV4MPEG2 '
+Y4M_LAYOUTS = {
+    '420': '420', '420jpeg': '420', '420mpeg2': '420', '420paldv': '420',
+    '444': '444',
+    'mono': 'mono',
+}
+
+# Where temporary copies of video files are kept if it's available.
+SHM_DIR = '/dev/shm'
+
+# The markers for the JPEG segments that contain the image size.
+SOF_MARKERS = {
+    0xc0, 0xc1, 0xc2, 0xc3, 0xc5, 0xc6, 0xc7,
+    0xc9, 0xca, 0xcb, 0xcd, 0xce, 0xcf,
+}
+
+# The number of color channels opencv reads from a PNG, by the PNG
+# color type and whether the image has a transparency chunk.
+PNG_CHANNELS = {
+    0: (1, 1),
+    2: (3, 4),
+    3: (3, 4),
+    4: (4, 4),
+    6: (4, 4),
+}
+
+# The conversion from studio range YUV to BGR data. It's the inverse
+# of the conversion used to save Y4M video. Luma only video is full
+# range, so it isn't converted.
+BGR_FROM_YUV = np.hstack((
+    np.linalg.inv(np.array(YUV_FROM_BGR)[:, :3]),
+    np.zeros((3, 1)),
+))
+BGR_FROM_YUV[:, 3] = -BGR_FROM_YUV[:, :3] @ np.array(YUV_FROM_BGR)[:, 3]
+
+
+# Classes.
+class _BufferReader:
+    """Read a buffer the way a binary file is read. Only the bytes that
+    are read are copied, rather than the whole buffer.
+    """
+    def __init__(self, data: Buffer) -> None:
+        self._view = memoryview(data).cast('B')
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        stop = len(self._view) if size < 0 else self._pos + size
+        chunk = self._view[self._pos:stop].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        start = (0, self._pos, len(self._view))[whence]
+        self._pos = max(0, start + offset)
+        return self._pos
+
+
+class VideoStream:
+    """The frames of a video that are decoded as they are iterated
+    over rather than all at once.
+
+    This is returned by :func:`read_video` with `lazy` when the video
+    is too large to read into memory. Only one frame is held in memory
+    at a time, and each iteration decodes the video from the start.
+
+    :param path: The path to the video file.
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. See :func:`read_video`.
+    :param step: (Optional.) Only keep every step-th frame.
+    :param sample: (Optional.) Only keep this many frames.
+    :param mode: (Optional.) The color space to read the frames into.
+    :param channels: (Optional.) Only keep these color channels.
+    :param out: (Optional.) An array to decode each frame into. See
+        :func:`iter_video`.
+    :return: A :class:`VideoStream` object.
+    :rtype: imgwriter.VideoStream
+
+    Usage::
+
+        >>> stream = VideoStream('tests/data/__test_save_rgb_video_mp4v.mp4')
+        >>> stream.shape
+        (3, 480, 720, 3)
+        >>> [frame.shape for frame in stream]
+        [(480, 720, 3), (480, 720, 3), (480, 720, 3)]
+    """
+    def __init__(
+        self, path: Union[str, Path],
+        scale: float = 1,
+        step: int = 1,
+        sample: Optional[int] = None,
+        mode: Optional[str] = None,
+        channels: Optional[Sequence[int]] = None,
+        out: Optional[NDArray[np.uint8]] = None
+    ) -> None:
+        self.path = Path(path)
+        self.scale = scale
+        self.step = step
+        self.sample = sample
+        self.mode = mode
+        self.channels = channels
+        self.out = out
+
+        factor = _scale_factor(scale)
+        _check_mode(mode)
+        meta = info(self.path)
+        indices = _frame_indices(str(self.path), step, sample)
+        frames = meta.frames if indices is None else len(indices)
+        self.shape = (frames, *_frame_shape(meta, factor, mode, channels))
+        if out is not None:
+            _check_out(out, self.shape[1:], np.uint8)
+
+    def __iter__(self) -> Iterator[NDArray[np.uint8]]:
+        return iter_video(
+            self.path, self.scale, self.step, self.sample,
+            self.mode, self.channels, self.out
+        )
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({str(self.path)!r}, shape={self.shape})'
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The data type of the frames."""
+        return np.dtype(np.uint8)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory needed to read every frame into one array."""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+
 # Core functions.
-def read(path: Union[str, Path]) -> NDArray[np.float_]:
-    """Read an image or video file.
+def info(path: Union[str, Path]) -> Info:
+    """Get information about the image data in a file without reading
+    all of the data.
+
+    For video, the information comes from the properties opencv reads
+    from the container. For PNGs and JPEGs, it comes from the headers
+    of the file. Other image formats have to be decoded. The result
+    is cached by the path and modification time of the file, so
+    asking for the same file again is cheap.
 
     :param path: The path to the file.
+    :return: A :class:`imgwriter.Info` object.
+    :rtype: imgwriter.Info
+
+    Usage::
+
+        >>> result = info('tests/data/__test_save_rgb_image.png')
+        >>> result.width, result.height, result.channels, result.dtype
+        (3, 3, 3, 'uint8')
+        >>> result.shape
+        (1, 3, 3, 3)
+    """
+    path = Path(path)
+    _check_file(str(path))
+    stat = path.stat()
+    return _info(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def read(
+    path: Union[str, Path, BinaryIO],
+    cache: Optional[Cache] = None,
+    max_memory: Optional[int] = None,
+    lazy: bool = False
+) -> Union[NDArray[np.float_], VideoStream]:
+    """Read an image or video file.
+
+    :param path: The path to the file or a binary file-like object
+        open for reading. If the file-like object has a name, the
+        extension of the name determines whether it's read as an image
+        or a video. Otherwise, it's read as an image if it can be
+        decoded as one and a video if it can't.
+    :param cache: (Optional.) A cache to store the decoded data in,
+        so it doesn't have to be decoded again the next time the file
+        is read. File-like objects are not cached.
+    :param max_memory: (Optional.) The most memory, in bytes, reading
+        a video is allowed to use. See :func:`read_video`.
+    :param lazy: (Optional.) Whether to return a :class:`VideoStream`
+        rather than raising an exception when a video is too large
+        to read. See :func:`read_video`.
     :return: The image or video data as a :class:`numpy.ndarray`.
-    :rtype: numpy.ndarray
+    :rtype: numpy.ndarray or imgwriter.VideoStream
     """
+    if not isinstance(path, (str, Path)):
+        return _read_fileobj(path)
+
     path = Path(path)
     ftype = SUPPORTED[path.suffix.casefold()[1:]]
     if isinstance(ftype, Image):
-        a = read_image(path)
+        a = read_image(path, cache=cache)
     elif isinstance(ftype, Video):
-        a = read_video(path)
+        a = read_video(
+            path, max_memory=max_memory, lazy=lazy, cache=cache
+        )
+    elif isinstance(ftype, Raw):
+        a = read_raw(path)
     else:
         raise UnsupportedFileType(f'{path.suffix}')
     return a
 
 
+@uses_cache
 def read_image(
     filepath: Union[str, Path],
-    as_video: bool = True
+    as_video: bool = True,
+    scale: float = 1,
+    out: Optional[NDArray[Any]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
 ) -> NDArray[np.float_]:
     """Read image data from an image file.
 
@@ -50,6 +311,23 @@ def read_image(
     :param as_video: (Optional.) Whether the data should be read as
         a still image or a single frame of video. The difference is
         video has one more dimension than a still image.
+    :param scale: (Optional.) Reduce the resolution of the image while
+        reading it. It must be 1, 1/2, 1/4, or 1/8. JPEGs are reduced
+        while they are decoded, which is much faster than decoding the
+        full image. Other formats are resized after decoding.
+    :param out: (Optional.) An array to store the image data in rather
+        than creating a new one. It must have the same shape and data
+        type as the array that would have been returned.
+    :param mode: (Optional.) The color space to read the image into.
+        It can be `'gray'`, `'rgb'`, or `'rgba'`. The default is to
+        keep the color space of the file.
+    :param channels: (Optional.) Only keep these color channels. The
+        channels are numbered in RGB or RGBA order.
+    :param cache: (Optional.) A :class:`imgwriter.DiskCache` or
+        :class:`imgwriter.MemoryCache` to store the decoded data in. If
+        the file has already been decoded into the cache, a read-only
+        array of the cached data is returned instead of decoding the
+        file again.
     :return: A :class:`numpy.ndarray` object.
     :rtype: numpy.ndarray
 
@@ -74,32 +352,14 @@ def read_image(
     data, it treats still images as a single frame video. As a result,
     it will add a Z axis to image data from still images.
     """
-    # Ensure filepath is a string in case opencv doesn't like Path.
-    filepath = str(filepath)
-
-    # Before wasting time trying to open the file, check if it
-    # even exists.
-    if not Path(filepath).is_file():
-        msg = f'There is no file at {filepath}.'
-        raise FileNotFoundError(msg)
-
-    # Read in the data from the image file. Don't change whether it's
-    # color or grayscale. If it wasn't readable, puke.
-    a = cv2.imread(filepath, cv2.IMREAD_UNCHANGED)
-    if a is None:
-        msg = f'The file at {filepath} cannot be read.'
-        raise ValueError(msg)
-
-    # If the data in the file was unsigned 8-bit integers, convert it
-    # to floats in the range 0 <= x <= 1.
-    if a.dtype == np.uint8:
-        a = a.astype(float)
-        a /= 0xff
-
-    # Opencv returns color data from RGB files as BGR. Transform it
-    # back to RGB.
-    if len(a.shape) == 3:
-        a = np.flip(a, -1)
+    a = _imread(filepath, scale, mode)
+    a = _reorder(a, mode, channels)
+    if out is not None:
+        shape = (1, *a.shape) if as_video else a.shape
+        _check_out(out, shape, _normalized_dtype(a))
+        _normalize(a, out=out[0] if as_video else out)
+        return out
+    a = _normalize(a)
 
     # Since this module deals with video and still images, it allows
     # you to read the image in as a single frame of video rather than
@@ -110,7 +370,78 @@ def read_image(
     return a
 
 
-def read_video(path: Union[str, Path]) -> NDArray[np.float_]:
+def read_image_bytes(
+    data: Buffer,
+    as_video: bool = True,
+    scale: float = 1,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.float_]:
+    """Read image data from the contents of an image file held in
+    memory.
+
+    The data is decoded in place, so it isn't copied before decoding.
+    The result is normalized the same way as :func:`read_image`.
+
+    :param data: The contents of the image file.
+    :param as_video: (Optional.) Whether the data should be read as
+        a still image or a single frame of video. See :func:`read_image`.
+    :param scale: (Optional.) Reduce the resolution of the image while
+        reading it. See :func:`read_image`.
+    :param mode: (Optional.) The color space to read the image into.
+        See :func:`read_image`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_image`.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    a = _imdecode(data, scale, mode)
+    a = _normalize(_reorder(a, mode, channels))
+    if as_video:
+        a = a[np.newaxis, ...]
+    return a
+
+
+def read_video_bytes(
+    data: Buffer,
+    suffix: str = '.mp4',
+    scale: float = 1
+) -> NDArray[np.uint8]:
+    """Read image data from the contents of a video file held in
+    memory.
+
+    Opencv can only read video from a file, so the data is written
+    to a temporary file before it's read. If it's available, the
+    temporary file is kept in shared memory rather than on disk.
+
+    :param data: The contents of the video file.
+    :param suffix: (Optional.) The extension given to the temporary
+        file.
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. See :func:`read_video`.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    tmpdir = SHM_DIR if os.access(SHM_DIR, os.W_OK) else None
+    with NamedTemporaryFile(suffix=suffix, dir=tmpdir) as fh:
+        fh.write(data)
+        fh.flush()
+        return read_video(fh.name, scale=scale)
+
+
+@uses_cache
+def read_video(
+    path: Union[str, Path],
+    scale: float = 1,
+    workers: Optional[int] = None,
+    out: Optional[NDArray[np.uint8]] = None,
+    step: int = 1,
+    sample: Optional[int] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None,
+    max_memory: Optional[int] = None,
+    lazy: bool = False
+) -> Union[NDArray[np.uint8], VideoStream]:
     """Capture image data from a video file.
 
     .. note:
@@ -120,23 +451,1201 @@ def read_video(path: Union[str, Path]) -> NDArray[np.float_]:
         exactly the same as the array you saved out to the file.
 
     :param path: The path to the file to read.
-    :return: A :class:`numpy.ndarray` containing the data from the file.
-    :rtype: numpy.ndarray
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. It must be 1, 1/2, 1/4, or 1/8.
+    :param workers: (Optional.) The number of processes used to decode
+        the video. If more than one, the frames are split into segments
+        that are decoded at the same time by separate processes into a
+        block of shared memory. The returned array uses that shared
+        memory, so the frames are never copied between processes.
+    :param out: (Optional.) An array to decode the frames into rather
+        than creating a new one. It must be an array of unsigned 8-bit
+        integers with one item in the Z axis for each frame in the
+        video. If it's given, the video is decoded in this process.
+    :param step: (Optional.) Only keep every step-th frame, starting
+        with the first frame.
+    :param sample: (Optional.) Only keep this many frames, evenly
+        spaced from the first frame to the last frame.
+    :param mode: (Optional.) The color space to read the frames into.
+        It can be `'gray'`, `'rgb'`, or `'rgba'`. The default is to
+        return the frames in BGR order, the way opencv decodes them.
+    :param channels: (Optional.) Only keep these color channels. The
+        channels are numbered in RGB or RGBA order.
+    :param max_memory: (Optional.) The most memory, in bytes, reading
+        the video is allowed to use. The default is :data:`MAX_MEMORY`,
+        or the `IMGWRITER_MAX_MEMORY` environment variable if that
+        isn't set. The size is estimated from the container before any
+        frames are decoded, and any frames past the count in the
+        container are checked as they are decoded. It isn't checked
+        when `out` is given.
+    :param lazy: (Optional.) If the video is larger than `max_memory`,
+        return a :class:`VideoStream` that decodes one frame at a time
+        rather than raising a :class:`imgwriter.MemoryBudgetExceeded`
+        exception.
+    :param cache: (Optional.) A :class:`imgwriter.DiskCache` or
+        :class:`imgwriter.MemoryCache` to store the decoded data in. If
+        the file has already been decoded into the cache, a read-only
+        array of the cached data is returned instead of decoding the
+        file again.
+    :return: A :class:`numpy.ndarray` containing the data from the file,
+        or a :class:`VideoStream` if the video is too large and `lazy`
+        is set.
+    :rtype: numpy.ndarray or imgwriter.VideoStream
+
+    .. rubric:: Sampling Frames
+
+    When only some of the frames are kept with `step` or `sample`, the
+    frames that are skipped aren't converted into image data. If the
+    gap between two kept frames is long, the video seeks to the next
+    kept frame instead of stepping through the frames between them.
+    """
+    factor = _scale_factor(scale)
+    _check_mode(mode)
+    indices = _frame_indices(str(path), step, sample)
+    if out is not None:
+        return _read_video_into(
+            str(path), factor, out, indices, mode, channels
+        )
+
+    # Check the size of the video before anything is allocated, so a
+    # mistaken read of a huge video fails rather than running out of
+    # memory.
+    budget = _memory_budget(max_memory)
+    if budget is not None:
+        stream = VideoStream(path, scale, step, sample, mode, channels)
+        if stream.nbytes > budget and lazy:
+            return stream
+        elif stream.nbytes > budget:
+            msg = (
+                f'Reading the video at {path} needs {stream.nbytes} '
+                f'bytes, which is more than the memory budget of {budget} '
+                'bytes. Use iter_video() or lazy=True to read one frame '
+                'at a time.'
+            )
+            raise MemoryBudgetExceeded(msg)
+
+    if workers is not None and workers > 1 and indices is None:
+        a = _read_video_shared(str(path), factor, workers, mode, channels)
+        if a is not None:
+            return a
+
+    # The frames are decoded straight into an array sized from the
+    # container, so the only copy of the frames is the one returned.
+    # The count in the container can be wrong, so any frames past the
+    # end of the array are added after. Those frames weren't part of
+    # the estimate, so they are checked against the budget as they are
+    # decoded.
+    meta = info(path)
+    length = meta.frames if indices is None else len(indices)
+    shape = _frame_shape(meta, factor, mode, channels)
+    a = np.empty((max(length, 0), *shape), dtype=np.uint8)
+    extra = []
+    decoded = 0
+    capture = cv2.VideoCapture(str(path))
+    try:
+        frames = _iter_frames(capture, factor, indices, a, mode, channels)
+        for decoded, frame in enumerate(frames, 1):
+            if decoded <= len(a):
+                continue
+            extra.append(frame)
+            nbytes = a.nbytes + frame.nbytes * len(extra)
+            if budget is not None and nbytes > budget and lazy:
+                return VideoStream(path, scale, step, sample, mode, channels)
+            elif budget is not None and nbytes > budget:
+                msg = (
+                    f'The video at {path} has more frames than its '
+                    'container reports, and reading them needs more '
+                    f'than the memory budget of {budget} bytes. Use '
+                    'iter_video() or lazy=True to read one frame at a '
+                    'time.'
+                )
+                raise MemoryBudgetExceeded(msg)
+    finally:
+        capture.release()
+    if extra:
+        return np.concatenate((a, extra))
+    return a if decoded == len(a) else a[:decoded]
+
+
+def iter_video(
+    path: Union[str, Path],
+    scale: float = 1,
+    step: int = 1,
+    sample: Optional[int] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None,
+    out: Optional[NDArray[np.uint8]] = None
+) -> Iterator[NDArray[np.uint8]]:
+    """Decode the frames of a video one at a time.
+
+    Only the frame being yielded is held in memory, so this can read
+    videos that are too large for :func:`read_video`.
+
+    :param path: The path to the file to read.
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. See :func:`read_video`.
+    :param step: (Optional.) Only keep every step-th frame. See
+        :func:`read_video`.
+    :param sample: (Optional.) Only keep this many frames. See
+        :func:`read_video`.
+    :param mode: (Optional.) The color space to read the frames into.
+        See :func:`read_video`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_video`.
+    :param out: (Optional.) An array to decode each frame into rather
+        than creating a new array for each frame. It must be an array
+        of unsigned 8-bit integers with the shape of one frame. Every
+        frame yielded is this array, so copy any frames you need to
+        keep.
+    :return: The frames as :class:`numpy.ndarray` objects.
+    :rtype: collections.abc.Iterator
+
+    Usage::
+
+        >>> path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+        >>> for frame in iter_video(path, scale=1/2):
+        ...     print(frame.shape)
+        (240, 360, 3)
+        (240, 360, 3)
+        (240, 360, 3)
     """
+    factor = _scale_factor(scale)
+    _check_mode(mode)
+    indices = _frame_indices(str(path), step, sample)
+    if out is not None:
+        shape = _frame_shape(info(path), factor, mode, channels)
+        _check_out(out, shape, np.uint8)
     capture = cv2.VideoCapture(str(path))
+    try:
+        yield from _iter_frames(
+            capture, factor, indices, mode=mode, channels=channels,
+            buffer=out
+        )
+    finally:
+        capture.release()
+
+
+def iter_y4m(
+    file: Union[str, Path, BinaryIO],
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> Iterator[NDArray[np.uint8]]:
+    """Read the frames of an uncompressed YUV4MPEG2 (Y4M) video one at
+    a time.
+
+    Y4M video saved to a file can also be read by :func:`read_video`,
+    but this reads the frames as they arrive from any binary file-like
+    object, such as `sys.stdin.buffer`, so it can read video from a
+    pipe without a temporary file.
+
+    :param file: The path to the file or a binary file-like object
+        open for reading.
+    :param mode: (Optional.) The color space to read the frames into.
+        See :func:`read_video`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_video`.
+    :return: The frames as :class:`numpy.ndarray` objects.
+    :rtype: collections.abc.Iterator
+    """
+    _check_mode(mode)
+    if isinstance(file, (str, Path)):
+        _check_file(str(file))
+        with open(file, 'rb') as fh:
+            yield from iter_y4m(fh, mode, channels)
+        return
+
+    width, height, chroma = _read_y4m_header(file)
+    if chroma == 'mono':
+        shape: tuple[int, ...] = (height, width)
+    elif chroma == '420':
+        shape = (height * 3 // 2, width)
+    else:
+        shape = (3, height, width)
+
+    while line := file.readline():
+        if not line.startswith(b'FRAME'):
+            msg = 'The Y4M video is missing a frame header.'
+            raise ValueError(msg)
+        yuv = np.empty(shape, dtype=np.uint8)
+        _read_exactly(file, yuv)
+
+        if chroma == 'mono':
+            frame = yuv
+            if mode == 'gray':
+                yield _convert_frame(frame, None, channels)
+                continue
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        elif chroma == '420':
+            frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+        else:
+            frame = cv2.transform(cv2.merge(list(yuv)), BGR_FROM_YUV)
+        yield _convert_frame(frame, mode, channels)
+
+
+def read_y4m(
+    file: Union[str, Path, BinaryIO],
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.uint8]:
+    """Read an uncompressed YUV4MPEG2 (Y4M) video from a file or from
+    any binary file-like object, such as `sys.stdin.buffer`.
+
+    :param file: The path to the file or a binary file-like object
+        open for reading.
+    :param mode: (Optional.) The color space to read the frames into.
+        See :func:`read_video`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_video`.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    frames = list(iter_y4m(file, mode, channels))
+    if not frames:
+        msg = 'The Y4M video has no frames.'
+        raise ValueError(msg)
+    return np.stack(frames)
+
+
+def read_many(
+    paths: Sequence[Union[str, Path]],
+    workers: Optional[int] = None,
+    scale: float = 1,
+    out: Optional[NDArray[Any]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.float_]:
+    """Read image data from several image files into one array.
+
+    The files are decoded in a pool of threads, and the decoded data
+    is stored directly in one array rather than being stacked after
+    all of the files are read. Each file in the sequence becomes one
+    frame in the Z axis of the array.
+
+    :param paths: The locations of the image files to read. All of
+        the files must contain images of the same size and color space.
+    :param workers: (Optional.) The number of threads used to decode
+        the files. The default is the default used by
+        :class:`concurrent.futures.ThreadPoolExecutor`.
+    :param scale: (Optional.) Reduce the resolution of the images
+        while reading them. See :func:`read_image`.
+    :param out: (Optional.) An array to store the image data in rather
+        than creating a new one. It must have the same shape and data
+        type as the array that would have been returned.
+    :param mode: (Optional.) The color space to read the images into.
+        See :func:`read_image`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_image`.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    paths = [str(path) for path in paths]
+    if not paths:
+        msg = 'No paths were given.'
+        raise ValueError(msg)
+
+    # Check that all of the files exist before doing any decoding, so
+    # a missing file fails quickly.
+    for path in paths:
+        _check_file(path)
+
+    # The first file determines the size of the output array.
+    first = _imread(paths[0], scale, mode)
+    shape = (len(paths), *_reorder(first, mode, channels).shape)
+    if out is None:
+        a = np.empty(shape, dtype=_normalized_dtype(first))
+    else:
+        _check_out(out, shape, _normalized_dtype(first))
+        a = out
+    _normalize(_reorder(first, mode, channels), out=a[0])
+
+    def load(i: int) -> None:
+        frame = _imread(paths[i], scale, mode)
+        if frame.shape != first.shape or frame.dtype != first.dtype:
+            msg = (
+                f'The file at {paths[i]} has shape {frame.shape} and type '
+                f'{frame.dtype}, expected {first.shape} and {first.dtype}.'
+            )
+            raise ValueError(msg)
+        _normalize(_reorder(frame, mode, channels), out=a[i])
+
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(load, i) for i in range(1, len(paths))]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    return a
+
+
+def read_raw(
+    filepath: Union[str, Path],
+    mmap: bool = True
+) -> NDArray[Any]:
+    """Read data from a `.npy` file, such as one saved by
+    :func:`imgwriter.write_raw` or :class:`imgwriter.RawWriter`.
+
+    The data is returned exactly as it was saved. By default, the file
+    is memory-mapped rather than read, so only the frames that are
+    used are loaded from disk.
+
+    :param filepath: The location of the file to read.
+    :param mmap: (Optional.) Whether to return a read-only
+        :class:`numpy.memmap` of the file rather than reading all of
+        the data into memory.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    _check_file(str(filepath))
+    return np.load(filepath, mmap_mode='r' if mmap else None)
+
+
+def read_series(
+    path: Union[str, Path],
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    workers: Optional[int] = None,
+    scale: float = 1,
+    out: Optional[NDArray[Any]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.float_]:
+    """Read a series of image files saved by :func:`imgwriter.write_image`.
+
+    When :func:`imgwriter.write_image` saves a series of images, it adds
+    the frame number to the name of each file. For example, saving
+    `spam.png` saves the frames as `spam_0.png`, `spam_1.png`, and so
+    on. Given the same path, this reads those frames back into one
+    array. The frames are ordered by frame number rather than by name,
+    so `spam_10.png` comes after `spam_9.png`.
+
+    :param path: The location and name of the file given when the
+        series was saved.
+    :param start: (Optional.) The number of the first frame to read.
+        The default is the first frame in the series.
+    :param stop: (Optional.) Stop reading before the frame with this
+        number. The default is to read through the last frame in the
+        series.
+    :param workers: (Optional.) The number of threads used to decode
+        the files.
+    :param scale: (Optional.) Reduce the resolution of the images
+        while reading them. See :func:`read_image`.
+    :param out: (Optional.) An array to store the image data in. See
+        :func:`read_many`.
+    :param mode: (Optional.) The color space to read the images into.
+        See :func:`read_image`.
+    :param channels: (Optional.) Only keep these color channels. See
+        :func:`read_image`.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    paths = _series_paths(path, start, stop)
+    return read_many(
+        paths, workers=workers, scale=scale, out=out,
+        mode=mode, channels=channels
+    )
+
+
+# Utility functions.
+def _decode_segment(
+    path: str,
+    name: str,
+    shape: tuple[int, ...],
+    start: int,
+    stop: int,
+    factor: int,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> int:
+    """Decode a segment of a video into shared memory. This is run in
+    a worker process by :func:`_read_video_shared`.
+
+    :param path: The path to the video file.
+    :param name: The name of the shared memory block.
+    :param shape: The shape of the array in the shared memory.
+    :param start: The first frame of the segment.
+    :param stop: The frame after the last frame of the segment.
+    :param factor: The factor the resolution is divided by.
+    :param mode: (Optional.) The color space to convert the frames to.
+    :param channels: (Optional.) The color channels to keep.
+    :return: The number of frames decoded.
+    :rtype: int
+    """
+    shm = SharedMemory(name=name)
+    try:
+        a: NDArray[np.uint8] = np.ndarray(
+            shape, dtype=np.uint8, buffer=shm.buf
+        )
+        capture = cv2.VideoCapture(path)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        i = start
+        while i < stop:
+            if _read_frame(capture, factor, a[i], mode, channels) is None:
+                break
+            i += 1
+        capture.release()
+        del a
+    finally:
+        shm.close()
+    return i - start
+
+
+def _series_paths(
+    path: Union[str, Path],
+    start: Optional[int] = None,
+    stop: Optional[int] = None
+) -> list[Path]:
+    """Find the files of a series of images saved by
+    :func:`imgwriter.write_image`.
+
+    :param path: The location and name of the file given when the
+        series was saved.
+    :param start: (Optional.) The number of the first frame.
+    :param stop: (Optional.) Stop before the frame with this number.
+    :return: The paths of the frames in order as a :class:`list`.
+    :rtype: list
+    """
+    path = Path(path)
+    pattern = re.compile(
+        rf'{re.escape(path.stem)}_(\d+){re.escape(path.suffix)}'
+    )
     frames = []
-    while capture.isOpened():
+    for candidate in path.parent.glob(f'{glob.escape(path.stem)}_*'):
+        match = pattern.fullmatch(candidate.name)
+        if match:
+            frames.append((int(match.group(1)), candidate))
+
+    # A series with only one frame is saved without a frame number.
+    if not frames and path.is_file():
+        frames.append((0, path))
+
+    frames = sorted(
+        (n, frame) for n, frame in frames
+        if (start is None or n >= start) and (stop is None or n < stop)
+    )
+    if not frames:
+        msg = f'There are no frames for {path}.'
+        raise FileNotFoundError(msg)
+    return [frame for _, frame in frames]
+
+
+def _frame_shape(
+    meta: Info,
+    factor: int = 1,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> tuple[int, ...]:
+    """Get the shape of the frames read from a video.
+
+    :param meta: Information about the video.
+    :param factor: (Optional.) The factor the resolution is divided by.
+    :param mode: (Optional.) The color space of the frames.
+    :param channels: (Optional.) The color channels kept.
+    :return: The shape as a :class:`tuple`.
+    :rtype: tuple
+    """
+    shape: tuple[int, ...] = (
+        -(-meta.height // factor),
+        -(-meta.width // factor),
+    )
+    if channels is not None:
+        return (*shape, len(channels))
+    if mode == 'gray':
+        return shape
+    elif mode is None:
+        return (*shape, meta.channels)
+    return (*shape, FRAME_CHANNELS.get(mode, meta.channels))
+
+
+def _frame_indices(
+    path: str,
+    step: int = 1,
+    sample: Optional[int] = None
+) -> Optional[list[int]]:
+    """Get the numbers of the frames to keep when reading a video.
+
+    :param path: The path to the video file.
+    :param step: (Optional.) Keep every step-th frame.
+    :param sample: (Optional.) Keep this many evenly spaced frames.
+    :return: A :class:`list` of frame numbers, or `None` if every frame
+        should be kept.
+    :rtype: list or None
+    """
+    if step < 1 or (sample is not None and sample < 1):
+        msg = 'The step and sample must be greater than zero.'
+        raise ValueError(msg)
+    if step == 1 and sample is None:
+        return None
+
+    frames = info(path).frames
+    if sample is not None:
+        spaced = np.linspace(0, max(frames - 1, 0), sample).round()
+        return [int(n) for n in np.unique(spaced)]
+    return list(range(0, frames, step))
+
+
+def _iter_frames(
+    capture: cv2.VideoCapture,
+    factor: int = 1,
+    indices: Optional[Iterable[int]] = None,
+    out: Optional[NDArray[np.uint8]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None,
+    buffer: Optional[NDArray[np.uint8]] = None
+) -> Iterator[NDArray[np.uint8]]:
+    """Decode frames from a video.
+
+    :param capture: The video being read.
+    :param factor: (Optional.) The factor the resolution is divided by.
+    :param indices: (Optional.) The numbers of the frames to decode, in
+        ascending order. The default is to decode every frame.
+    :param out: (Optional.) An array to decode the frames into. The
+        n-th frame decoded is stored in the n-th item of the Z axis.
+    :param mode: (Optional.) The color space to convert the frames to.
+    :param channels: (Optional.) The color channels to keep.
+    :param buffer: (Optional.) An array to decode every frame into
+        rather than `out`, so each frame reuses its memory.
+    :return: The frames as :class:`numpy.ndarray` objects.
+    :rtype: collections.abc.Iterator
+    """
+    position = 0
+    for i, n in enumerate(count() if indices is None else indices):
+        # Grabbing a frame skips converting it to image data, but the
+        # frame is still decoded. Past a certain distance, it's faster
+        # to seek to the frame and only decode from the keyframe before
+        # it.
+        if n - position > SEEK_THRESHOLD:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, n)
+            position = n
+        while position < n:
+            if not capture.grab():
+                return
+            position += 1
+
+        if buffer is not None:
+            dst: Optional[NDArray[np.uint8]] = buffer
+        else:
+            dst = None if out is None or i >= len(out) else out[i]
+        frame = _read_frame(capture, factor, dst, mode, channels)
+        if frame is None:
+            return
+        position += 1
+        yield frame
+
+
+def _read_frame(
+    capture: cv2.VideoCapture,
+    factor: int = 1,
+    out: Optional[NDArray[np.uint8]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> Optional[NDArray[np.uint8]]:
+    """Decode the next frame from a video.
+
+    :param capture: The video being read.
+    :param factor: (Optional.) The factor the resolution is divided by.
+    :param out: (Optional.) An array to decode the frame into.
+    :param mode: (Optional.) The color space to convert the frame to.
+    :param channels: (Optional.) The color channels to keep.
+    :return: The frame as a :class:`numpy.ndarray` object, or `None`
+        if there are no more frames.
+    :rtype: numpy.ndarray or None
+    """
+    # Opencv will decode directly into the output array if it is the
+    # right size and contiguous.
+    convert = mode is not None or channels is not None
+    if (factor == 1 and not convert
+            and out is not None and out.flags.c_contiguous):
+        ret, frame = capture.read(out)
+    else:
         ret, frame = capture.read()
-        if not ret:
-            break
-        frames.append(frame)
+        if ret and factor > 1:
+            frame = _downscale(frame, factor)
+        if ret and convert:
+            frame = _convert_frame(frame, mode, channels)
+        if ret and out is not None:
+            out[...] = frame
+            frame = out
+    return frame if ret else None
+
+
+def _read_video_into(
+    path: str,
+    factor: int,
+    out: NDArray[np.uint8],
+    indices: Optional[Sequence[int]] = None,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.uint8]:
+    """Decode a video into an existing array.
+
+    :param path: The path to the video file.
+    :param factor: The factor the resolution is divided by.
+    :param out: The array to decode the frames into.
+    :param indices: (Optional.) The frames to decode. The default is
+        to decode every frame.
+    :param mode: (Optional.) The color space to convert the frames to.
+    :param channels: (Optional.) The color channels to keep.
+    :return: The array the frames were decoded into.
+    :rtype: numpy.ndarray
+    """
+    shape = _frame_shape(info(path), factor, mode, channels)
+    length = len(out) if indices is None else len(indices)
+    _check_out(out, (length, *shape), np.uint8)
+
+    capture = cv2.VideoCapture(path)
+    try:
+        frames = _iter_frames(capture, factor, indices, out, mode, channels)
+        decoded = sum(1 for _ in islice(frames, len(out)))
+        extra = indices is None and decoded == len(out) and capture.grab()
+    finally:
+        capture.release()
+    if decoded < len(out) or extra:
+        more = 'more' if extra else 'fewer'
+        msg = (
+            f'The video at {path} has {more} frames than the output '
+            f'array, which has {len(out)}.'
+        )
+        raise ValueError(msg)
+    return out
+
+
+def _read_video_shared(
+    path: str,
+    factor: int,
+    workers: int,
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> Optional[NDArray[np.uint8]]:
+    """Decode a video with multiple processes into shared memory.
+
+    :param path: The path to the video file.
+    :param factor: The factor the resolution is divided by.
+    :param workers: The number of processes to use.
+    :param mode: (Optional.) The color space to convert the frames to.
+    :param channels: (Optional.) The color channels to keep.
+    :return: A :class:`numpy.ndarray` object, or `None` if the segments
+        couldn't be decoded.
+    :rtype: numpy.ndarray or None
+    """
+    meta = info(path)
+    shape = (meta.frames, *_frame_shape(meta, factor, mode, channels))
+    if not meta.frames:
+        return None
+
+    size = int(np.prod(shape))
+    shm = SharedMemory(create=True, size=size)
+    try:
+        bounds = np.linspace(0, meta.frames, workers + 1, dtype=int)
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(
+                    _decode_segment, path, shm.name, shape,
+                    int(start), int(stop), factor, mode, channels
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            counts = [future.result() for future in futures]
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+    # The frame count in the container is only an estimate. If the
+    # video ended early, the missing frames should be at the end.
+    # Otherwise, something went wrong.
+    expected = bounds[1:] - bounds[:-1]
+    if (np.array(counts[:-1]) != expected[:-1]).any():
+        shm.close()
+        shm.unlink()
+        return None
+
+    # Once it's unlinked, the shared memory will be freed when it is
+    # closed, which happens when the array is garbage collected.
+    a: NDArray[np.uint8] = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    shm.unlink()
+    finalize(a, shm.close)
+    return a[:bounds[-2] + counts[-1]]
+
+
+def _read_fileobj(fh: BinaryIO) -> NDArray[Any]:
+    """Read image or video data from a file-like object."""
+    # Y4M video is read as it arrives rather than all at once.
+    suffix = Path(str(getattr(fh, 'name', ''))).suffix
+    if suffix.casefold() == '.y4m':
+        return read_y4m(fh)
+
+    data = fh.read()
+    ftype = SUPPORTED.get(suffix.casefold()[1:])
+    if data.startswith(Y4M_MAGIC):
+        return read_y4m(BytesIO(data))
+    elif isinstance(ftype, Image):
+        return read_image_bytes(data)
+    elif isinstance(ftype, Video):
+        return read_video_bytes(data, suffix)
+    elif isinstance(ftype, Raw):
+        return np.load(BytesIO(data))
+    elif suffix:
+        raise UnsupportedFileType(f'{suffix}')
+
+    # Without a name, try decoding as an image first since it's cheap
+    # to find out that it isn't one.
+    try:
+        return read_image_bytes(data)
+    except ValueError:
+        return read_video_bytes(data)
+
+
+def _check_out(
+    out: NDArray[Any],
+    shape: tuple[int, ...],
+    dtype: Union[np.dtype, type]
+) -> None:
+    """Raise an exception if the output array can't hold the data."""
+    if out.shape != tuple(shape) or out.dtype != np.dtype(dtype):
+        msg = (
+            f'The output array has shape {out.shape} and type {out.dtype}, '
+            f'expected {tuple(shape)} and {np.dtype(dtype)}.'
+        )
+        raise ValueError(msg)
+
+
+def _check_mode(mode: Optional[str]) -> None:
+    """Raise an exception if the color space isn't supported."""
+    if mode not in MODE_FLAGS:
+        msg = f'The mode must be gray, rgb, or rgba, not {mode}.'
+        raise ValueError(msg)
+
+
+def _check_file(filepath: Union[str, Path]) -> None:
+    """Raise an exception if there is no file at the path."""
+    if not Path(filepath).is_file():
+        msg = f'There is no file at {filepath}.'
+        raise FileNotFoundError(msg)
+
+
+def _convert_frame(
+    frame: NDArray[np.uint8],
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[np.uint8]:
+    """Convert a BGR frame of video to a different color space.
+
+    :param frame: The frame to convert.
+    :param mode: (Optional.) The color space to convert the frame to.
+    :param channels: (Optional.) The color channels to keep, numbered
+        in RGB or RGBA order.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    if mode is not None:
+        frame = cv2.cvtColor(frame, FRAME_CONVERSIONS[mode])
+    if channels is not None:
+        if len(frame.shape) < 3:
+            msg = 'Channels cannot be selected from grayscale data.'
+            raise ValueError(msg)
+        if mode is None:
+            channels = [2 - channel for channel in channels]
+        frame = frame[..., channels]
+    return frame
+
+
+def _downscale(a: NDArray[Any], factor: int) -> NDArray[Any]:
+    """Reduce the resolution of image data by the given factor."""
+    height, width = a.shape[:2]
+    size = (-(-width // factor), -(-height // factor))
+    return cv2.resize(a, size, interpolation=cv2.INTER_AREA)
+
+
+def _finish_decode(
+    a: NDArray[Any],
+    factor: int,
+    flags: int,
+    mode: Optional[str] = None
+) -> NDArray[Any]:
+    """Finish the changes to the image data that opencv couldn't make
+    while decoding it.
+    """
+    if factor > 1 and flags in MODE_FLAGS.values():
+        a = _downscale(a, factor)
+    if mode == 'rgba' and (len(a.shape) < 3 or a.shape[2] == 3):
+        code = cv2.COLOR_GRAY2BGRA if len(a.shape) < 3 else cv2.COLOR_BGR2BGRA
+        a = cv2.cvtColor(a, code)
+    return a
+
+
+def _imdecode(
+    data: Buffer,
+    scale: float = 1,
+    mode: Optional[str] = None
+) -> NDArray[Any]:
+    """Decode the contents of an image file with opencv.
+
+    :param data: The contents of the image file.
+    :param scale: (Optional.) Reduce the resolution of the image by
+        this amount.
+    :param mode: (Optional.) The color space to decode the image into.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    # Wrapping the data with frombuffer lets opencv decode it without
+    # copying it first.
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    factor = _scale_factor(scale)
+    _check_mode(mode)
+    flags = MODE_FLAGS[mode]
+    if factor > 1:
+        flags = _read_flags(_BufferReader(data), factor, mode)
+
+    a = cv2.imdecode(buffer, flags)
+    if a is None:
+        msg = 'The data cannot be read.'
+        raise ValueError(msg)
+    return _finish_decode(a, factor, flags, mode)
+
+
+def _imread(
+    filepath: Union[str, Path],
+    scale: float = 1,
+    mode: Optional[str] = None
+) -> NDArray[Any]:
+    """Decode an image file with opencv.
+
+    :param filepath: The location of the image file to read.
+    :param scale: (Optional.) Reduce the resolution of the image by
+        this amount.
+    :param mode: (Optional.) The color space to decode the image into.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    # Ensure filepath is a string in case opencv doesn't like Path.
+    filepath = str(filepath)
+
+    # Before wasting time trying to open the file, check if it
+    # even exists.
+    _check_file(filepath)
+
+    factor = _scale_factor(scale)
+    _check_mode(mode)
+    flags = MODE_FLAGS[mode]
+    if factor > 1 and _is_jpeg(filepath):
+        with open(filepath, 'rb') as fh:
+            flags = _read_flags(fh, factor, mode)
+
+    # Read in the data from the image file. Unless asked, don't change
+    # whether it's color or grayscale. If it wasn't readable, puke.
+    a = cv2.imread(filepath, flags)
+    if a is None:
+        msg = f'The file at {filepath} cannot be read.'
+        raise ValueError(msg)
+    return _finish_decode(a, factor, flags, mode)
+
+
+@lru_cache(maxsize=2 ** 14)
+def _info(path: str, mtime: int, size: int) -> Info:
+    """Get information about the image data in a file. The modification
+    time and size of the file are only used to invalidate the cache.
+    """
+    ftype = SUPPORTED.get(Path(path).suffix.casefold()[1:])
+    if isinstance(ftype, Video):
+        return _info_video(path)
+    elif isinstance(ftype, Image):
+        return _info_image(path)
+    elif isinstance(ftype, Raw):
+        return _info_raw(path)
+    raise UnsupportedFileType(f'{Path(path).suffix}')
+
+
+def _info_image(path: str) -> Info:
+    """Get information about an image file from its header, falling
+    back to decoding the image if the header can't be parsed.
+    """
+    header = None
+    with open(path, 'rb') as fh:
+        if _is_jpeg(path):
+            jpeg = _read_jpeg_header(fh)
+            if jpeg is not None:
+                width, height, channels = jpeg
+                header = (width, height, min(channels, 3), 'uint8')
+        else:
+            header = _read_png_header(fh)
+    if header is not None:
+        return Info(*header)
+
+    a = _imread(path)
+    channels = a.shape[2] if len(a.shape) == 3 else 1
+    return Info(a.shape[1], a.shape[0], channels, str(a.dtype))
+
+
+def _info_raw(path: str) -> Info:
+    """Get information about a `.npy` file from its header."""
+    a = np.load(path, mmap_mode='r')
+    shape = a.shape if a.ndim > 2 else (1, *a.shape)
+    return Info(
+        width=shape[2],
+        height=shape[1],
+        channels=shape[3] if len(shape) > 3 else 1,
+        dtype=str(a.dtype),
+        frames=shape[0],
+    )
+
+
+def _info_video(path: str) -> Info:
+    """Get information about a video file from its container."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        msg = f'The file at {path} cannot be read.'
+        raise ValueError(msg)
+    fourcc = int(capture.get(cv2.CAP_PROP_FOURCC))
+    result = Info(
+        width=int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        channels=3,
+        dtype='uint8',
+        frames=int(capture.get(cv2.CAP_PROP_FRAME_COUNT)),
+        fps=capture.get(cv2.CAP_PROP_FPS),
+        codec=fourcc.to_bytes(4, 'little').decode('latin-1'),
+    )
     capture.release()
-    a = np.zeros((len(frames), *frames[0].shape), dtype=frames[0].dtype)
-    for i, frame in enumerate(frames):
-        a[i] = frame
+    return result
+
+
+def _is_jpeg(filepath: Union[str, Path]) -> bool:
+    """Determine whether the file is a JPEG from its extension."""
+    ftype = SUPPORTED.get(Path(filepath).suffix.casefold()[1:])
+    return isinstance(ftype, Image) and ftype.description == 'JPEG'
+
+
+def _read_exactly(fh: BinaryIO, out: NDArray[np.uint8]) -> None:
+    """Fill an array from a file-like object. Pipes can return less
+    data than is asked for, so this keeps reading until it's full.
+    """
+    view = out.data.cast('B')
+    filled = 0
+    while filled < len(view):
+        # BinaryIO doesn't declare readinto, but the binary files and
+        # pipes it stands for all have it.
+        n = fh.readinto(view[filled:])  # type: ignore[attr-defined]
+        if not n:
+            msg = 'The Y4M video ended in the middle of a frame.'
+            raise ValueError(msg)
+        filled += n
+
+
+def _read_flags(
+    fh: Union[BinaryIO, _BufferReader],
+    factor: int,
+    mode: Optional[str] = None
+) -> int:
+    """Get the opencv flags to decode an image at reduced resolution.
+
+    JPEGs can be reduced while they are being decoded, but opencv
+    needs to be told whether the image is color or grayscale to do
+    that. Everything else has to be resized after decoding.
+
+    :param fh: The open image file, or a reader for its contents.
+    :param factor: The factor the resolution is divided by.
+    :param mode: (Optional.) The color space to decode the image into.
+    :return: The flags as an :class:`int`.
+    :rtype: int
+    """
+    header = _read_jpeg_header(fh)
+    if header is None:
+        return MODE_FLAGS[mode]
+    _, _, channels = header
+    color = channels > 1 if mode in (None, 'rgba') else mode == 'rgb'
+    return REDUCED_FLAGS[factor][color]
+
+
+def _read_y4m_header(fh: BinaryIO) -> tuple[int, int, str]:
+    """Read the width, height, and chroma subsampling from the header
+    of a Y4M video.
+    """
+    line = fh.readline()
+    if not line.startswith(Y4M_MAGIC):
+        msg = 'The data is not Y4M video.'
+        raise ValueError(msg)
+    params = {
+        token[:1]: token[1:]
+        for token in line.decode('ascii').split()[1:]
+    }
+    chroma = params.get('C', '420jpeg')
+    if chroma in Y4M_LAYOUTS:
+        return int(params['W']), int(params['H']), Y4M_LAYOUTS[chroma]
+    msg = f'Y4M video with {chroma} chroma cannot be read.'
+    raise ValueError(msg)
+
+
+def _read_jpeg_header(
+    fh: Union[BinaryIO, _BufferReader]
+) -> Optional[tuple[int, int, int]]:
+    """Get the width, height, and number of channels of a JPEG from
+    its start of frame segment without decoding the image.
+
+    :param fh: The open JPEG file, or a reader for its contents.
+    :return: A :class:`tuple` object or `None` if the start of frame
+        segment couldn't be found.
+    :rtype: tuple or None
+    """
+    if fh.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        marker = fh.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+
+        # Markers can be padded with any number of 0xff bytes.
+        while marker[1] == 0xff:
+            byte = fh.read(1)
+            if not byte:
+                return None
+            marker = marker[1:] + byte
+        length = fh.read(2)
+        if len(length) < 2:
+            return None
+        size = int.from_bytes(length, 'big') - 2
+        if marker[1] in SOF_MARKERS:
+            segment = fh.read(size)
+            if len(segment) < 6:
+                return None
+            height = int.from_bytes(segment[1:3], 'big')
+            width = int.from_bytes(segment[3:5], 'big')
+            return width, height, segment[5]
+        fh.seek(size, 1)
+
+
+def _normalize(
+    a: NDArray[Any],
+    out: Optional[NDArray[Any]] = None
+) -> NDArray[Any]:
+    """Normalize image data decoded by opencv.
+
+    :param a: The image data to normalize.
+    :param out: (Optional.) An array to store the normalized data in.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    # If the data in the file was unsigned 8-bit integers, convert it
+    # to floats in the range 0 <= x <= 1.
+    if a.dtype == np.uint8:
+        return np.divide(a, 0xff, out=out)
+    if out is not None:
+        out[...] = a
+        return out
     return a
 
 
+def _normalized_dtype(a: NDArray[Any]) -> np.dtype:
+    """Get the data type of the image data after normalization."""
+    if a.dtype == np.uint8:
+        return np.dtype(float)
+    return a.dtype
+
+
+def _read_png_header(fh: BinaryIO) -> Optional[tuple[int, int, int, str]]:
+    """Get the width, height, number of channels, and data type of a PNG
+    from its chunks without decoding the image.
+
+    :param fh: The open PNG file.
+    :return: A :class:`tuple` object or `None` if the file isn't a PNG.
+    :rtype: tuple or None
+    """
+    if fh.read(8) != b'\x89PNG\r\n\x1a\n':
+        return None
+    length = int.from_bytes(fh.read(4), 'big')
+    if fh.read(4) != b'IHDR' or length < 13:
+        return None
+    ihdr = fh.read(length)
+    width = int.from_bytes(ihdr[:4], 'big')
+    height = int.from_bytes(ihdr[4:8], 'big')
+    depth, color_type = ihdr[8], ihdr[9]
+    if color_type not in PNG_CHANNELS:
+        return None
+    dtype = 'uint16' if depth == 16 else 'uint8'
+
+    # Transparency is stored in its own chunk, which has to come before
+    # the image data.
+    fh.seek(4, 1)
+    transparent = False
+    while True:
+        chunk = fh.read(8)
+        if len(chunk) < 8 or chunk[4:] in (b'IDAT', b'IEND'):
+            break
+        if chunk[4:] == b'tRNS':
+            transparent = True
+            break
+        fh.seek(int.from_bytes(chunk[:4], 'big') + 4, 1)
+    channels = PNG_CHANNELS[color_type][transparent]
+    return width, height, channels, dtype
+
+
+def _reorder(
+    a: NDArray[Any],
+    mode: Optional[str] = None,
+    channels: Optional[Sequence[int]] = None
+) -> NDArray[Any]:
+    """Put the color channels of image data decoded by opencv in the
+    order they are returned.
+
+    :param a: The image data.
+    :param mode: (Optional.) The color space the data was decoded into.
+    :param channels: (Optional.) The color channels to keep, numbered
+        in RGB or RGBA order.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    if len(a.shape) < 3:
+        if channels is not None:
+            msg = 'Channels cannot be selected from grayscale data.'
+            raise ValueError(msg)
+        return a
+
+    # Opencv returns color data from RGB files as BGR. Transform it
+    # back to RGB. Channels are numbered with the alpha channel last,
+    # and when asked for RGBA, it's kept last.
+    order = list(range(a.shape[2]))[::-1]
+    if a.shape[2] == 4:
+        order = [2, 1, 0, 3]
+    if channels is not None:
+        return a[..., [order[channel] for channel in channels]]
+    elif mode == 'rgba':
+        return a[..., order]
+    return np.flip(a, -1)
+
+
+def _memory_budget(max_memory: Optional[int] = None) -> Optional[int]:
+    """Get the memory budget for reading a video. If one isn't given,
+    use :data:`MAX_MEMORY` or the IMGWRITER_MAX_MEMORY environment
+    variable.
+    """
+    if max_memory is not None:
+        return max_memory
+    if MAX_MEMORY is not None:
+        return MAX_MEMORY
+    value = os.environ.get('IMGWRITER_MAX_MEMORY')
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        msg = (
+            'IMGWRITER_MAX_MEMORY must be a whole number of bytes, '
+            f'not {value!r}.'
+        )
+        raise ValueError(msg)
+
+
+def _scale_factor(scale: float) -> int:
+    """Convert a scale into the factor the resolution is divided by."""
+    factor = round(1 / scale) if scale > 0 else 0
+    if factor not in REDUCED_FLAGS or factor * scale != 1:
+        msg = 'The scale must be 1, 1/2, 1/4, or 1/8.'
+        raise ValueError(msg)
+    return factor
+
+
 # Function aliases.
 load = read
 load_image = read_image
@@ -4,35 +4,92 @@ imgwriter
 
 A Python module for saving arrays as images or video.
 """
+import hashlib
+import json
 import logging
-from copy import deepcopy
+import os
+import struct
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from fractions import Fraction
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Union
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Union
+)
+from uuid import uuid4
 
 import cv2
 import numpy as np
 from numpy.typing import ArrayLike, NDArray
 
-from imgwriter.common import SUPPORTED, Image, UnsupportedFileType, Video
+from imgwriter.cache import FileCache
+from imgwriter.common import (
+    SUPPORTED,
+    Y4M_CHROMA,
+    YUV_FROM_BGR,
+    Image,
+    Raw,
+    Target,
+    UnsupportedFileType,
+    Video,
+    get_resolution
+)
+from imgwriter.frames import solid
 
 
 # Importable names.
 __all__ = [
+    "RawWriter", "SeriesWriter", "VideoWriter", "Y4MWriter",
+    "open_writer",
     "save", "save_image", "save_video",
-    "write", "write_image", "write_video",
+    "write", "write_frames", "write_image", "write_many", "write_raw",
+    "write_spacer", "write_video",
 ]
 
 
 # Constants to replace indices with axis names for readability.
 X, Y, Z = 2, 1, 0
 
+# The start of a version 1.0 `.npy` file.
+NPY_MAGIC = np.lib.format.magic(1, 0)
+
+# The conversion from BGR data to studio range YUV.
+Y4M_FROM_BGR = np.array(YUV_FROM_BGR)
+
+# The default memory budget, in bytes, for conditioning a series of
+# frames before they are saved.
+CONDITION_MEMORY = 2 ** 26
+
+# The largest width or height the MPEG codecs can encode.
+MPEG_MAX_SIZE = 8191
+
+# The names of the interpolation methods used to resize frames.
+INTERPOLATIONS = {
+    'area': cv2.INTER_AREA,
+    'cubic': cv2.INTER_CUBIC,
+    'lanczos': cv2.INTER_LANCZOS4,
+    'linear': cv2.INTER_LINEAR,
+    'nearest': cv2.INTER_NEAREST,
+}
+
 
 # Types.
+Frames = Union[NDArray[np.uint8], '_ConditionedFrames']
 Saver = Union[
-    Callable[[Union[str, Path], NDArray[np.uint8], bool], None],
-    Callable[[Union[str, Path], NDArray[np.uint8], float, str], None]
+    Callable[[Union[str, Path], Frames, bool], None],
+    Callable[[Union[str, Path], Frames, float, str], None]
 ]
+Stamp = tuple[int, int, int]
 WrappedSaver = Union[
     Callable[[Union[str, Path], ArrayLike, bool], None],
     Callable[[Union[str, Path], ArrayLike, float, str], None]
@@ -41,19 +98,67 @@ WrappedSaver = Union[
 
 # Decorators
 def uses_opencv(fn: Saver) -> WrappedSaver:
-    """Condition the image data for use by opencv prior to saving."""
+    """Condition the image data for use by opencv prior to saving.
+
+    A series of frames that has to be copied to be conditioned is
+    conditioned a chunk at a time as the frames are saved, so the
+    decorated saver only ever sees a few conditioned frames at once.
+    """
     @wraps(fn)
     def wrapper(
-        filepath: Union[str, Path], a: ArrayLike, *args, **kwargs
+        filepath: Union[str, Path], a: ArrayLike, *args,
+        resolution: Optional[Union[str, Sequence[int]]] = None,
+        interpolation: Optional[str] = None,
+        max_memory: Optional[int] = None,
+        **kwargs
     ) -> None:
         # Convert the image data to an array just in case we were passed
-        # something else.
-        a = np.array(deepcopy(a))
+        # something else. The conversions below all make new arrays or
+        # views, so the caller's data is never changed and doesn't need
+        # to be copied first.
+        a = np.asarray(a)
+        color = len(a.shape) == 4 or (
+            len(a.shape) == 3
+            and 'as_series' in kwargs
+            and not kwargs['as_series']
+        )
+        series = (
+            (len(a.shape) == 4 or (len(a.shape) == 3 and not color))
+            and kwargs.get('as_series', True)
+        )
+
+        # Resizing is done while the data is conditioned, so the frames
+        # are only copied once.
+        size = None
+        if resolution is None and interpolation is not None:
+            msg = 'An interpolation can only be given with a resolution.'
+            raise ValueError(msg)
+        elif resolution is not None:
+            size = get_resolution(resolution)
+            if not series:
+                a = _condition_resized(a, size, interpolation, color)
+                return fn(filepath, a, *args, **kwargs)
+
+        # Series of frames that need to be copied to be conditioned are
+        # conditioned a few frames at a time as they are saved, so a
+        # full size conditioned copy of the data is never made. Check
+        # the values first, so a bad frame can't stop the save part
+        # of the way through.
+        isfloat = a.dtype in [float, np.float32]
+        if series and (size is not None or a.dtype != np.uint8):
+            if isfloat and (np.max(a) > 1 or np.min(a) < 0):
+                msg = 'Array values must be 0 >= x >= 1.'
+                raise ValueError(msg)
+            frames = _ConditionedFrames(
+                a, size, interpolation, color,
+                CONDITION_MEMORY if max_memory is None else max_memory
+            )
+            return fn(filepath, frames, *args, **kwargs)
 
         # While TIFFs can handle 32-bit floats, JPGs and PNGs can't, so
         # rather than having TIFFs as an exception, just convert all floats
         # to unsigned 8-bit integers.
-        if a.dtype in [float, np.float32]:
+        if isfloat:
             a = _float_to_uint8(a)
 
         # If the data isn't a float but not a unsigned 8-bit integer,
@@ -64,18 +169,741 @@ def uses_opencv(fn: Saver) -> WrappedSaver:
 
         # opencv saves color data in BGR order, so RGB data needs to be
         # flipped to BGR.
-        if len(a.shape) == 4:
-            a = np.flip(a, -1)
-        elif (len(a.shape) == 3
-                and 'as_series' in kwargs
-                and not kwargs['as_series']):
+        if color:
             a = np.flip(a, -1)
 
         return fn(filepath, a, *args, **kwargs)
     return wrapper
 
 
+# Classes.
+class RawWriter:
+    """Save frames of data to a `.npy` file one at a time.
+
+    The frames are written to the file exactly as they are given, with
+    no conversion or encoding, so the file can be used to pass data
+    losslessly between steps of a pipeline. The shape and data type of
+    the frames is set by the first frame written, and the number of
+    frames in the header of the file is updated when the writer is
+    closed. The file can be read with :func:`imgwriter.read` or
+    :func:`numpy.load`.
+
+    :param filepath: The location and name of the file that will
+        be saved.
+    :return: A :class:`RawWriter` object.
+    :rtype: imgwriter.RawWriter
+
+    Usage::
+
+        >>> with RawWriter('spam.npy') as writer:
+        ...     for frame in frames:
+        ...         writer.write(frame)
+    """
+    def __init__(self, filepath: Union[str, Path]) -> None:
+        self.filepath = Path(filepath)
+        self.frames = 0
+        self.shape: Optional[tuple[int, ...]] = None
+        self.dtype: Optional[np.dtype] = None
+        self._fh: Optional[BinaryIO] = None
+        self._header_size = 0
+
+    def __enter__(self) -> 'RawWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish writing the file."""
+        if self._fh is not None:
+            self._fh.seek(0)
+            self._fh.write(self._header(self.frames))
+            self._fh.close()
+            self._fh = None
+
+    def write(self, frame: ArrayLike) -> None:
+        """Add a frame to the end of the file.
+
+        :param frame: The data for the frame.
+        :return: None.
+        :rtype: None.
+        """
+        frame = np.asarray(frame)
+        fh = self._fh
+        if fh is None:
+            fh = self._open(frame)
+        elif frame.shape != self.shape or frame.dtype != self.dtype:
+            msg = (
+                f'The frame has shape {frame.shape} and type {frame.dtype}, '
+                f'but the file has shape {self.shape} and type '
+                f'{self.dtype}.'
+            )
+            raise ValueError(msg)
+
+        # Contiguous frames are written straight from their buffer.
+        fh.write(np.ascontiguousarray(frame).data)
+        self.frames += 1
+
+    def _header(self, frames: int) -> bytes:
+        """Build the header of the file in the `.npy` version 1.0
+        format.
+        """
+        shape = () if self.shape is None else self.shape
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (frames, *shape),
+        })
+
+        # The header is padded to a fixed size, so it can be rewritten
+        # with any number of frames without moving the data.
+        prefix = len(NPY_MAGIC) + 2
+        if not self._header_size:
+            size = prefix + len(header) + len(str(2 ** 64)) + 1
+            self._header_size = -(-size // 64) * 64
+        length = self._header_size - prefix
+        text = header.ljust(length - 1) + '\n'
+        return NPY_MAGIC + struct.pack('<H', length) + text.encode('latin1')
+
+    def _open(self, frame: NDArray[Any]) -> BinaryIO:
+        """Create the file for frames like the given frame."""
+        self.shape = frame.shape
+        self.dtype = frame.dtype
+        if self.dtype.hasobject:
+            msg = 'Frames of Python objects cannot be saved.'
+            raise ValueError(msg)
+        self._fh = open(self.filepath, 'wb')
+        self._fh.write(self._header(0))
+        return self._fh
+
+    _write = write
+
+
+class SeriesWriter:
+    """Save frames of image data to a series of image files one at
+    a time.
+
+    The files are named the same way as :func:`write_image` names a
+    series: saving to `spam.png` saves the frames as `spam_0.png`,
+    `spam_1.png`, and so on. If only one frame is written, it is
+    saved as `spam.png` when the writer is closed.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine the format used
+        by the files.
+    :return: A :class:`SeriesWriter` object.
+    :rtype: imgwriter.SeriesWriter
+
+    Usage::
+
+        >>> with SeriesWriter('spam.png') as writer:
+        ...     for frame in frames:
+        ...         writer.write(frame)
+    """
+    def __init__(self, filepath: Union[str, Path]) -> None:
+        self.filepath = Path(filepath)
+        self.frames = 0
+
+    def __enter__(self) -> 'SeriesWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish writing the series."""
+        if self.frames == 1:
+            self._framepath(0).replace(self.filepath)
+            self.frames = 0
+
+    def write(self, frame: ArrayLike) -> None:
+        """Save a frame as the next image in the series.
+
+        :param frame: The image data for the frame. It can be RGB or
+            grayscale, and it is converted the same way as the image
+            data passed to :func:`write_image`.
+        :return: None.
+        :rtype: None.
+        """
+        self._write(_condition_frame(frame))
+
+    def _write(self, frame: NDArray[np.uint8]) -> None:
+        """Save a frame that is already conditioned for opencv."""
+        cv2.imwrite(str(self._framepath(self.frames)), frame)
+        self.frames += 1
+
+    def _framepath(self, n: int) -> Path:
+        filepath = self.filepath
+        return filepath.parent / f'{filepath.stem}_{n}{filepath.suffix}'
+
+
+class VideoWriter:
+    """Save frames of image data to a video file one at a time.
+
+    Unlike :func:`write_video`, the frames don't have to be in memory
+    at the same time, so the memory used is the size of one frame no
+    matter how long the video is. The size of the video and whether
+    it's in color is set by the first frame written.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine the container
+        type used for the file.
+    :param framerate: (Optional.) The number of frames the video will
+        play per second.
+    :param codec: (Optional.) The codec used to encode the image data
+        into video. See :func:`write_video`.
+    :return: A :class:`VideoWriter` object.
+    :rtype: imgwriter.VideoWriter
+
+    Usage::
+
+        >>> with VideoWriter('spam.mp4', framerate=24) as writer:
+        ...     for frame in frames:
+        ...         writer.write(frame)
+    """
+    def __init__(
+        self, filepath: Union[str, Path],
+        framerate: float = 12.0,
+        codec: str = 'mp4v'
+    ) -> None:
+        self.filepath = Path(filepath)
+        self.framerate = framerate
+        self.codec = codec
+        self.frames = 0
+        self.shape: Optional[tuple[int, ...]] = None
+        self._vwriter: Optional[cv2.VideoWriter] = None
+
+    def __enter__(self) -> 'VideoWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish writing the video file."""
+        if self._vwriter is not None:
+            self._vwriter.release()
+            self._vwriter = None
+
+    def write(self, frame: ArrayLike) -> None:
+        """Add a frame to the end of the video.
+
+        :param frame: The image data for the frame. It can be RGB or
+            grayscale, and it is converted the same way as the image
+            data passed to :func:`write_video`.
+        :return: None.
+        :rtype: None.
+        """
+        self._write(_condition_frame(frame))
+
+    def _write(self, frame: NDArray[np.uint8]) -> None:
+        """Add a frame that is already conditioned for opencv."""
+        if self.shape is None:
+            self._open(frame.shape)
+        elif frame.shape != self.shape:
+            msg = (
+                f'The frame has shape {frame.shape}, but the video has '
+                f'shape {self.shape}.'
+            )
+            raise ValueError(msg)
+        if self._vwriter is None:
+            msg = 'The video is closed.'
+            raise ValueError(msg)
+        self._vwriter.write(frame)
+        self.frames += 1
+
+    def _open(self, shape: tuple[int, ...]) -> None:
+        """Create the video file for frames of the given shape."""
+        framesize = (shape[1], shape[0])
+        iscolor = len(shape) == 3
+        self._vwriter = _open_video(
+            self.filepath, self.framerate, self.codec, framesize, iscolor
+        )
+        self.shape = shape
+
+
+class Y4MWriter:
+    """Save frames of image data to an uncompressed YUV4MPEG2 (Y4M)
+    video one at a time.
+
+    Y4M video is raw YUV data with a small text header, so it's saved
+    almost as fast as the data can be copied, and nearly every video
+    tool can read it, including from a pipe. The video can be saved to
+    a file path or to any binary file-like object, such as
+    `sys.stdout.buffer`. File-like objects are left open when the
+    writer is closed.
+
+    :param file: The location and name of the file that will be saved,
+        or a binary file-like object open for writing.
+    :param framerate: (Optional.) The number of frames the video will
+        play per second.
+    :param codec: (Optional.) The chroma subsampling of color frames:
+        `'I420'` for 4:2:0 or `'I444'` for 4:4:4. Other codecs are
+        saved as 4:2:0. Grayscale frames are saved unchanged as luma
+        only, in full range, which is how opencv and ffmpeg read it.
+    :return: A :class:`Y4MWriter` object.
+    :rtype: imgwriter.Y4MWriter
+
+    Usage::
+
+        >>> with Y4MWriter(sys.stdout.buffer, framerate=24) as writer:
+        ...     for frame in frames:
+        ...         writer.write(frame)
+    """
+    def __init__(
+        self, file: Union[str, Path, BinaryIO],
+        framerate: float = 12.0,
+        codec: str = 'I420'
+    ) -> None:
+        self.file = file
+        self.framerate = framerate
+        self.codec = codec if codec in Y4M_CHROMA else 'I420'
+        self.frames = 0
+        self.shape: Optional[tuple[int, ...]] = None
+        self._fh: Optional[BinaryIO] = None
+        self._yuv: Optional[NDArray[np.uint8]] = None
+
+    def __enter__(self) -> 'Y4MWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Finish writing the video."""
+        if self._fh is not None:
+            self._fh.flush()
+            if isinstance(self.file, (str, Path)):
+                self._fh.close()
+            self._fh = None
+
+    def write(self, frame: ArrayLike) -> None:
+        """Add a frame to the end of the video.
+
+        :param frame: The image data for the frame. It can be RGB or
+            grayscale, and it is converted the same way as the image
+            data passed to :func:`write_video`.
+        :return: None.
+        :rtype: None.
+        """
+        self._write(_condition_frame(frame))
+
+    def _write(self, frame: NDArray[np.uint8]) -> None:
+        """Add a frame that is already conditioned for opencv."""
+        if self.shape is None:
+            self._open(frame.shape)
+        elif frame.shape != self.shape:
+            msg = (
+                f'The frame has shape {frame.shape}, but the video has '
+                f'shape {self.shape}.'
+            )
+            raise ValueError(msg)
+        fh, yuv = self._fh, self._yuv
+        if fh is None or yuv is None:
+            msg = 'The video is closed.'
+            raise ValueError(msg)
+
+        # The planes are converted into the same buffer for each frame.
+        fh.write(b'FRAME\n')
+        if len(frame.shape) == 2:
+            fh.write(np.ascontiguousarray(frame).data)
+        elif self.codec == 'I420':
+            cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420, dst=yuv)
+            fh.write(yuv.data)
+        else:
+            cv2.transform(frame, Y4M_FROM_BGR, dst=yuv)
+            for plane in cv2.split(yuv):
+                fh.write(plane.data)
+        self.frames += 1
+
+    def _open(self, shape: tuple[int, ...]) -> None:
+        """Start the video for frames of the given shape."""
+        if len(shape) == 3 and shape[2] != 3:
+            msg = 'Y4M video can only be saved from RGB or grayscale data.'
+            raise ValueError(msg)
+        height, width = shape[:2]
+        if len(shape) == 2:
+            chroma = 'mono'
+            yuv_shape: tuple[int, ...] = shape
+        elif self.codec == 'I420':
+            if width % 2 or height % 2:
+                msg = (
+                    f'A {width}x{height} video cannot be saved as 4:2:0 '
+                    'Y4M, which needs an even width and height.'
+                )
+                raise ValueError(msg)
+            chroma = Y4M_CHROMA[self.codec]
+            yuv_shape = (height * 3 // 2, width)
+        else:
+            chroma = Y4M_CHROMA[self.codec]
+            yuv_shape = shape
+
+        rate = Fraction(self.framerate).limit_denominator(1001)
+        header = (
+            f'YUV4MPEG2 W{width} H{height} '
+            f'F{rate.numerator}:{rate.denominator} Ip A1:1 C{chroma}\n'
+        )
+        if isinstance(self.file, (str, Path)):
+            self._fh = open(self.file, 'wb')
+        else:
+            self._fh = self.file
+        self._fh.write(header.encode('ascii'))
+        self._yuv = np.empty(yuv_shape, dtype=np.uint8)
+        self.shape = shape
+
+
+class _ConditionedFrames:
+    """A series of frames that are conditioned for use by opencv a
+    chunk at a time as they are used.
+
+    Only the frames in the current chunk are kept in memory. The chunk
+    is as many frames as fit in the memory budget, but it's always at
+    least one frame. It behaves enough like an array for the savers:
+    it has a shape, and its frames can be indexed and iterated.
+
+    :param a: The image data. The first axis is the frames.
+    :param size: The width and height to resize the frames to, or
+        `None` to keep their size.
+    :param interpolation: The name of the interpolation method used
+        to resize the frames.
+    :param color: Whether the data is in color.
+    :param max_memory: The most memory, in bytes, the conditioned
+        frames in a chunk are allowed to use.
+    :return: A :class:`_ConditionedFrames` object.
+    :rtype: imgwriter.imgwriter._ConditionedFrames
+    """
+    def __init__(
+        self, a: NDArray[Any],
+        size: Optional[tuple[int, int]],
+        interpolation: Optional[str],
+        color: bool,
+        max_memory: int
+    ) -> None:
+        self.dtype = np.dtype(np.uint8)
+        self.shape: tuple[int, ...] = a.shape
+        if size is not None:
+            self.shape = (len(a), size[1], size[0], *a.shape[3:])
+        self._a = a
+        self._size = size
+        self._interpolation = interpolation
+        self._color = color
+        self._start = -1
+        self._frames: Optional[NDArray[np.uint8]] = None
+
+        # Converting floats copies the frame as floats as well as
+        # creating the unsigned 8-bit integer frame.
+        frame_bytes = int(np.prod(self.shape[1:]))
+        if size is None and a.dtype in [float, np.float32]:
+            frame_bytes += a[0].nbytes
+        self.chunk = max(1, max_memory // max(1, frame_bytes))
+
+    def __getitem__(self, index: int) -> NDArray[np.uint8]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f'Frame {index} is out of range.')
+
+        start = index - index % self.chunk
+        frames = self._frames
+        if frames is None or start != self._start:
+            # Drop the old chunk before building the new one, so they
+            # aren't both in memory at the same time.
+            self._frames = frames = None
+            frames = self._condition(self._a[start:start + self.chunk])
+            self._frames = frames
+            self._start = start
+        return frames[index - start]
+
+    def __iter__(self) -> Iterator[NDArray[np.uint8]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return self.shape[Z]
+
+    def _condition(self, a: NDArray[Any]) -> NDArray[np.uint8]:
+        """Condition a chunk of frames."""
+        if self._size is not None:
+            return _condition_resized(
+                a, self._size, self._interpolation, self._color
+            )
+        if a.dtype in [float, np.float32]:
+            a = _float_to_uint8(a)
+        elif a.dtype != np.uint8:
+            a = a.astype(np.uint8)
+        if self._color:
+            a = np.flip(a, -1)
+        return a
+
+
 # Utility functions.
+def _condition_frame(a: ArrayLike) -> NDArray[np.uint8]:
+    """Condition one frame of image data for use by opencv.
+
+    :param a: The image data for the frame.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    a = np.asarray(a)
+    if a.dtype in [float, np.float32]:
+        a = _float_to_uint8(a)
+    elif a.dtype != np.uint8:
+        a = a.astype(np.uint8)
+
+    # opencv saves color data in BGR order.
+    if len(a.shape) == 3:
+        a = np.flip(a, -1)
+    return a
+
+
+def _condition_resized(
+    a: NDArray[Any],
+    size: tuple[int, int],
+    interpolation: Optional[str] = None,
+    color: bool = True
+) -> NDArray[np.uint8]:
+    """Condition image data for use by opencv while resizing it.
+
+    Each frame is resized before it is converted to unsigned 8-bit
+    integers and flipped to BGR, so the only full size array created
+    is the one that is returned.
+
+    :param a: The image data. Unless it is a single color image, the
+        first axis is the frames.
+    :param size: The width and height of the resized frames.
+    :param interpolation: (Optional.) The name of the interpolation
+        method used to resize the frames. The default is `'area'` when
+        the frames are shrunk and `'linear'` when they are enlarged.
+    :param color: (Optional.) Whether the data is in color.
+    :return: A :class:`numpy.ndarray` object.
+    :rtype: numpy.ndarray
+    """
+    series = len(a.shape) == 4 or (len(a.shape) == 3 and not color)
+    frames = a if series else a[np.newaxis]
+    flag = _interpolation_flag(interpolation, frames.shape[1:3], size)
+    out = np.empty(
+        (len(frames), size[1], size[0], *frames.shape[3:]),
+        dtype=np.uint8
+    )
+    for frame, dst in zip(frames, out):
+        isfloat = frame.dtype in [float, np.float32]
+        if isfloat and (np.max(frame) > 1 or np.min(frame) < 0):
+            msg = 'Array values must be 0 >= x >= 1.'
+            raise ValueError(msg)
+        elif not isfloat and frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+
+        # Resizing floats before they are converted keeps the detail
+        # lost when the values are rounded. Some interpolations can
+        # overshoot the original values, so they are clipped.
+        resized = cv2.resize(
+            np.ascontiguousarray(frame), size, interpolation=flag
+        )
+        if isfloat:
+            np.clip(resized, 0, 1, out=resized)
+
+        # opencv saves color data in BGR order.
+        if color:
+            resized = resized[..., ::-1]
+        if isfloat:
+            np.multiply(resized, 0xff, out=dst, casting='unsafe')
+        else:
+            dst[...] = resized
+    return out if series else out[Z]
+
+
+def _finish(futures: list[Future]) -> None:
+    """Wait for futures, raising the first exception from them."""
+    wait(futures)
+    for future in futures:
+        future.result()
+
+
+def _hash_frame(frame: NDArray[Any], crc: int) -> int:
+    """Add a frame of conditioned image data to a hash. The shape of
+    the frame is part of the hash.
+    """
+    crc = zlib.crc32(f'{frame.shape}{frame.dtype}'.encode(), crc)
+    return zlib.crc32(np.ascontiguousarray(frame).data, crc)
+
+
+def _hash_frames(frames: Iterable[NDArray[Any]], salt: str = '') -> int:
+    """Hash frames of conditioned image data. The shape of each frame
+    and the salt, such as the settings used to encode the frames, are
+    part of the hash.
+    """
+    crc = zlib.crc32(salt.encode())
+    for frame in frames:
+        crc = _hash_frame(frame, crc)
+    return crc
+
+
+def _interpolation_flag(
+    interpolation: Optional[str],
+    shape: Sequence[int],
+    size: tuple[int, int]
+) -> int:
+    """Get the opencv flag for an interpolation method. If no method
+    is given, use area interpolation to shrink frames of the given
+    shape and linear interpolation to enlarge them.
+    """
+    if interpolation is None:
+        shrink = size[0] <= shape[1] and size[1] <= shape[0]
+        interpolation = 'area' if shrink else 'linear'
+    try:
+        return INTERPOLATIONS[interpolation]
+    except KeyError:
+        msg = f'There is no interpolation named {interpolation}.'
+        raise ValueError(msg)
+
+
+def _is_y4m(filepath: Union[str, Path]) -> bool:
+    """Whether a file path is for Y4M video."""
+    return Path(filepath).suffix.casefold() == '.y4m'
+
+
+def _open_video(
+    filepath: Union[str, Path],
+    framerate: float,
+    codec: str,
+    framesize: tuple[int, int],
+    iscolor: bool
+) -> cv2.VideoWriter:
+    """Create a video file with opencv, raising a :class:`ValueError`
+    if opencv can't encode the video rather than saving nothing.
+    """
+    # cv2.VideoWriter requires a string rather than a Path.
+    fourcc = cv2.VideoWriter_fourcc(*codec)
+    vwriter = cv2.VideoWriter(
+        str(filepath), fourcc, framerate, framesize, iscolor
+    )
+    if not vwriter.isOpened():
+        msg = (
+            f'Could not write a {framesize[0]}x{framesize[1]} '
+            f'video to {filepath} with the {codec} codec.'
+        )
+        if max(framesize) > MPEG_MAX_SIZE:
+            msg += (
+                f' Frames larger than {MPEG_MAX_SIZE} pixels on a side '
+                'need a codec like FFV1 or MJPG in an .avi file.'
+            )
+        raise ValueError(msg)
+    return vwriter
+
+
+def _read_hashes(filepath: Union[str, Path]) -> list[Stamp]:
+    """Read the stamps of the data last saved to a file."""
+    try:
+        data = json.loads(_sidecar(filepath).read_text())
+        return [
+            tuple(int(n) for n in stamp)  # type: ignore[misc]
+            for stamp in data['frames']
+        ]
+    except (FileNotFoundError, KeyError, TypeError, ValueError):
+        return []
+
+
+def _is_image(filepath: Union[str, Path]) -> bool:
+    """Whether a file path is for an image."""
+    ftype = Path(filepath).suffix.casefold()[1:]
+    return isinstance(SUPPORTED.get(ftype), Image)
+
+
+def _is_raw(filepath: Union[str, Path]) -> bool:
+    """Whether a file path is for raw data."""
+    ftype = Path(filepath).suffix.casefold()[1:]
+    return isinstance(SUPPORTED.get(ftype), Raw)
+
+
+def _sidecar(filepath: Union[str, Path]) -> Path:
+    """Get the path of the file that holds the hashes of the data last
+    saved to a file.
+    """
+    filepath = Path(filepath)
+    return filepath.with_name(f'.{filepath.name}.crc')
+
+
+def _stamp(filepath: Union[str, Path], crc: int) -> Optional[Stamp]:
+    """Stamp the hash of the data saved to a file with the size and
+    modification time of the file, so a file changed by anything else
+    doesn't look unchanged. If the file doesn't exist, there is no
+    stamp.
+    """
+    try:
+        stat = Path(filepath).stat()
+    except FileNotFoundError:
+        return None
+    return (crc, stat.st_size, stat.st_mtime_ns)
+
+
+def _spacer_key(
+    res: Sequence[int],
+    color: Sequence[int],
+    suffix: str
+) -> str:
+    """Build the cache key for a spacer image. The version of opencv
+    is part of the key, since it changes how the image is encoded.
+    """
+    parts = [
+        'spacer', repr(tuple(res)), repr(tuple(color)),
+        suffix.casefold(), cv2.getVersionString(),
+    ]
+    return hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+
+
+def _target(value: Union[str, Path, Target, Mapping[str, Any]]) -> Target:
+    """Convert a value into a :class:`imgwriter.Target`."""
+    if isinstance(value, Target):
+        return value
+    if isinstance(value, (str, Path)):
+        return Target(value)
+    return Target(**value)
+
+
+def _write_y4m(
+    file: Union[str, Path, BinaryIO],
+    a: Frames,
+    framerate: float,
+    codec: str
+) -> None:
+    """Save conditioned image data as Y4M video."""
+    with Y4MWriter(file, framerate, codec) as writer:
+        for frame in a:
+            writer._write(frame)
+
+
+def _write_hashes(
+    filepath: Union[str, Path],
+    stamps: Sequence[Optional[Stamp]]
+) -> None:
+    """Save the stamps of the data saved to a file."""
+    sidecar = _sidecar(filepath)
+    tmp = sidecar.with_name(f'{sidecar.name}.{uuid4().hex}.tmp')
+    tmp.write_text(json.dumps({'frames': stamps}))
+    os.replace(tmp, sidecar)
+
+
+def _write_group(
+    frame: NDArray[np.uint8],
+    index: int,
+    key: tuple[Optional[tuple[int, int]], Optional[str], bool],
+    group: list[tuple[Optional[int], Any]]
+) -> None:
+    """Resize a conditioned frame and save it to each target that uses
+    the resolution.
+    """
+    writers = [w for only, w in group if only is None or only == index]
+    if not writers:
+        return
+
+    size, interpolation, _ = key
+    if size is not None and size != frame.shape[1::-1]:
+        flag = _interpolation_flag(interpolation, frame.shape, size)
+        frame = cv2.resize(frame, size, interpolation=flag)
+    for writer in writers:
+        writer._write(frame)
+
+
 def _float_to_uint8(a: ArrayLike) -> NDArray[np.uint8]:
     """Convert an array of floating point values to an array of
     unsigned 8-bit integers.
@@ -94,13 +922,57 @@ def _float_to_uint8(a: ArrayLike) -> NDArray[np.uint8]:
     return a.astype(np.uint8)
 
 
-def write(filepath: Union[str, Path], a: ArrayLike, *args, **kwargs) -> None:
+# Core functions.
+def open_writer(
+    filepath: Union[str, Path, BinaryIO],
+    framerate: float = 12.0,
+    codec: str = 'mp4v'
+) -> Union[RawWriter, SeriesWriter, VideoWriter, Y4MWriter]:
+    """Open a file to save frames of image data to one at a time.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine whether the frames
+        are saved as a video, as a series of images, or as raw data.
+        A binary file-like object is saved as Y4M video.
+    :param framerate: (Optional.) The number of frames the video will
+        play per second. This is ignored for images and raw data.
+    :param codec: (Optional.) The codec used to encode the video. This
+        is ignored for images and raw data.
+    :return: A :class:`SeriesWriter`, :class:`VideoWriter`,
+        :class:`Y4MWriter`, or :class:`RawWriter` object.
+    :rtype: imgwriter.SeriesWriter or imgwriter.VideoWriter or
+        imgwriter.Y4MWriter or imgwriter.RawWriter
+    """
+    if not isinstance(filepath, (str, Path)) or _is_y4m(filepath):
+        return Y4MWriter(filepath, framerate, codec)
+
+    filepath = Path(filepath)
+    ftype = filepath.suffix.casefold()[1:]
+    save_as = SUPPORTED.get(ftype)
+    if isinstance(save_as, Image):
+        return SeriesWriter(filepath)
+    elif isinstance(save_as, Video):
+        return VideoWriter(filepath, framerate, codec)
+    elif isinstance(save_as, Raw):
+        return RawWriter(filepath)
+    raise UnsupportedFileType(f'{ftype}')
+
+
+def write(
+    filepath: Union[str, Path, BinaryIO],
+    a: ArrayLike,
+    *args, **kwargs
+) -> None:
     """Save an array of image data to file.
 
     :param filepath: The location and name of the file that will
         be saved. The file extension will determine the format used
-        by the file.
+        by the file. A binary file-like object, such as
+        `sys.stdout.buffer`, is saved as Y4M video.
     :param a: The array of image data.
+    :param skip_if_unchanged: (Optional.) Don't encode the data again
+        if it's the same as the data already saved at the location.
+        See :func:`write_image` and :func:`write_video`.
     :return: None.
     :rtype: None.
 
@@ -113,23 +985,29 @@ def write(filepath: Union[str, Path], a: ArrayLike, *args, **kwargs) -> None:
     I have to limit the supported file formats to ones I think
     are supported across platforms.
     """
-    filepath = Path(filepath)
-    ftype = filepath.suffix.casefold()[1:]
-    save_as = SUPPORTED[ftype]
-    if isinstance(save_as, Image):
-        save_fn = save_image
-    elif isinstance(save_as, Video):
-        save_fn = save_video
-    else:
-        raise UnsupportedFileType(f'{ftype}')
+    # File-like objects are saved as Y4M video by the video saver.
+    save_fn: Callable[..., None] = save_video
+    if isinstance(filepath, (str, Path)):
+        filepath = Path(filepath)
+        ftype = filepath.suffix.casefold()[1:]
+        save_as = SUPPORTED[ftype]
+        if isinstance(save_as, Image):
+            save_fn = save_image
+        elif isinstance(save_as, Video):
+            save_fn = save_video
+        elif isinstance(save_as, Raw):
+            save_fn = write_raw
+        else:
+            raise UnsupportedFileType(f'{ftype}')
     save_fn(filepath, a, *args, **kwargs)
 
 
 @uses_opencv
 def write_image(
     filepath: Union[str, Path],
-    a: NDArray[np.uint8],
-    as_series: bool = True
+    a: Frames,
+    as_series: bool = True,
+    skip_if_unchanged: bool = False
 ) -> None:
     """Save an array of image data as an image file.
 
@@ -140,44 +1018,160 @@ def write_image(
     :param a: The array of image data.
     :param as_series: (Optional.) Whether the array is intended to be a
         series of images.
+    :param resolution: (Optional.) Resize the images before saving
+        them. This is either the name of a resolution in
+        :data:`imgwriter.RESOLUTIONS` or a tuple of the form (x, y).
+    :param interpolation: (Optional.) The method used to resize the
+        images: `'area'`, `'cubic'`, `'lanczos'`, `'linear'`, or
+        `'nearest'`. The default is `'area'` when the images are shrunk
+        and `'linear'` when they are enlarged. It can only be given
+        with a resolution.
+    :param max_memory: (Optional.) The most memory, in bytes, used to
+        convert a series of images before they are saved. The images
+        are converted a chunk at a time as they are saved rather than
+        all at once, and the chunk is always at least one image. The
+        default is :data:`CONDITION_MEMORY`, which is 64 MiB.
+    :param skip_if_unchanged: (Optional.) Don't encode an image again
+        if its data is the same as the last time it was saved. A hash
+        of the data for each image is kept in a hidden sidecar file
+        next to the file, so in a series only the images that changed
+        are saved. The size and modification time of each image are
+        kept with its hash, so an image saved some other way since is
+        always saved again.
     :return: None.
     :rtype: None.
     """
     filepath = Path(filepath)
+    frames: Iterable[tuple[Path, NDArray[np.uint8]]]
 
     # If the array isn't a series of images, just save what is given.
+    # It's never conditioned a chunk at a time, so it's already an
+    # array and isn't copied.
     if not as_series:
-        cv2.imwrite(str(filepath), a)
+        frames = [(filepath, np.asarray(a))]
 
     # If there is just 1 item in the Z axis, save the image data as
     # a single image.
     elif a.shape[Z] == 1:
-        a = a[Z]
-        cv2.imwrite(str(filepath), a)
+        frames = [(filepath, a[Z])]
 
     # If there are multiple items in the Z axis, save the image data
-    # as multiple images.
+    # as multiple images. The frames are generated as they are saved,
+    # so a series conditioned a chunk at a time is never all in memory.
     else:
         fileparent = filepath.parent
         filename = filepath.stem
         filetype = filepath.suffix
-        for i in range(a.shape[Z]):
-            framepath = str(fileparent / f'{filename}_{i}{filetype}')
-            cv2.imwrite(framepath, a[i])
+        frames = (
+            (fileparent / f'{filename}_{i}{filetype}', a[i])
+            for i in range(a.shape[Z])
+        )
+
+    if not skip_if_unchanged:
+        for framepath, frame in frames:
+            cv2.imwrite(str(framepath), frame)
+        return
+
+    salt = filepath.suffix.casefold()
+    saved = _read_hashes(filepath)
+    stamps = []
+    for i, (framepath, frame) in enumerate(frames):
+        crc = _hash_frames([frame], salt)
+        stamp = _stamp(framepath, crc)
+        if i >= len(saved) or saved[i] != stamp:
+            cv2.imwrite(str(framepath), frame)
+            stamp = _stamp(framepath, crc)
+        stamps.append(stamp)
+    _write_hashes(filepath, stamps)
+
+
+def write_raw(
+    filepath: Union[str, Path],
+    a: ArrayLike,
+    skip_if_unchanged: bool = False
+) -> None:
+    """Save an array of data as a `.npy` file.
+
+    Unlike the other formats, the data is saved exactly as it is given,
+    with no conversion to unsigned 8-bit integers or color channel
+    swapping, so nothing is lost. A contiguous array is written straight
+    from its buffer without being copied. See :class:`RawWriter` to
+    save the frames one at a time.
+
+    :param filepath: The location and name of the file that will
+        be saved.
+    :param a: The array of data.
+    :param skip_if_unchanged: (Optional.) Don't save the data again
+        if it's the same as the data already saved at the location.
+        See :func:`write_video`.
+    :return: None.
+    :rtype: None.
+    """
+    a = np.asarray(a)
+    if skip_if_unchanged:
+        crc = _hash_frame(a, zlib.crc32(b'.npy'))
+        if _read_hashes(filepath) == [_stamp(filepath, crc)]:
+            return
+
+    with open(filepath, 'wb') as fh:
+        np.save(fh, a, allow_pickle=False)
+    if skip_if_unchanged:
+        _write_hashes(filepath, [_stamp(filepath, crc)])
+
+
+def write_spacer(
+    filepath: Union[str, Path],
+    res: Sequence[int],
+    color: Sequence[int] = (0x00, 0x00, 0x00),
+    cache: Optional[FileCache] = None
+) -> None:
+    """Save an image that is a single color, such as a spacer used
+    between clips in a video.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine the format used
+        by the file.
+    :param res: The resolution of the image. This is a tuple of the
+        form (x, y), where "x" is the width of the image in pixels and
+        "y" is the height of the image in pixels.
+    :param color: (Optional.) The amounts of red, green, and blue (in
+        that order) in the color of the image, from 0 to 255.
+    :param cache: (Optional.) A :class:`imgwriter.FileCache` to keep
+        the encoded image in. If an image with the same resolution,
+        color, and format is already in the cache, it's copied to the
+        file path rather than being encoded again.
+    :return: None.
+    :rtype: None.
+    """
+    filepath = Path(filepath)
+    key = None
+    if cache is not None:
+        key = _spacer_key(res, color, filepath.suffix)
+        if cache.get(key, filepath):
+            return
+
+    # The data is built in BGR order and is already unsigned 8-bit
+    # integers, so it can go straight to opencv without conditioning.
+    cv2.imwrite(str(filepath), solid(res, tuple(color)[::-1]))
+    if cache is not None and key is not None:
+        cache.put(key, filepath)
 
 
 @uses_opencv
 def write_video(
-    filepath: Union[str, Path],
-    a: NDArray[np.uint8],
+    filepath: Union[str, Path, BinaryIO],
+    a: Frames,
     framerate: float = 12.0,
-    codec: str = 'mp4v'
+    codec: str = 'mp4v',
+    skip_if_unchanged: bool = False
 ) -> None:
     """Save an array of image data as a video file.
 
     :param filepath: The location and name of the file that will
         be saved. The file extension will determine the container
-        type used for the file.
+        type used for the file. It can also be a binary file-like
+        object, such as `sys.stdout.buffer`, which is saved as Y4M
+        video.
     :param a: The array of image data.
     :param framerate: (Optional.) The number of frames the video will
         play per second.
@@ -185,25 +1179,183 @@ def write_video(
         into video. The exact list of supported codecs depends upon
         the operating system. Per the opencv documentation, Linux and
         Windows will tend to use the list supported by ffmpeg and
-        macOS will use the list suported by QTKit.
+        macOS will use the list suported by QTKit. `'FFV1'` in `.avi`
+        and `'png '` in `.mov` are lossless, and `'MJPG'` in `.avi` is
+        fast and lossy. For Y4M video, the codec is the chroma
+        subsampling. See :class:`Y4MWriter`. If opencv can't encode
+        the video with the codec, such as an MPEG codec with frames
+        larger than 8191 pixels on a side, a :class:`ValueError` is
+        raised rather than saving an empty file.
+    :param resolution: (Optional.) Resize the frames before saving
+        them. See :func:`write_image`.
+    :param interpolation: (Optional.) The method used to resize the
+        frames. See :func:`write_image`.
+    :param max_memory: (Optional.) The most memory, in bytes, used to
+        convert the frames before they are saved. See
+        :func:`write_image`.
+    :param skip_if_unchanged: (Optional.) Don't encode the video again
+        if its data and settings are the same as the last time it was
+        saved. A hash of the data is kept in a hidden sidecar file next
+        to the video, along with the size and modification time of the
+        video. This is ignored for file-like objects.
     :return: None.
     :rtype: None.
     """
-    # cv2.VideoWriter requires a string rather than a Path.
-    filepath = str(filepath)
+    # Y4M video is the only format that can be written to a file-like
+    # object, and it's written by imgwriter rather than opencv.
+    if not isinstance(filepath, (str, Path)):
+        _write_y4m(filepath, a, framerate, codec)
+        return
 
-    fourcc = cv2.VideoWriter_fourcc(*codec)
-    framesize = (a.shape[X], a.shape[Y])
-    iscolor = False
-    if len(a.shape) == 4:
-        iscolor = True
+    # The data only needs to be hashed before it's encoded if the
+    # file could be unchanged. Otherwise, the frames are hashed as they
+    # are encoded, so they are only conditioned once.
+    salt = f'{Path(filepath).suffix.casefold()}{framerate!r}{codec}'
+    if skip_if_unchanged:
+        saved = _read_hashes(filepath)
+        stamp = _stamp(filepath, 0)
+        if len(saved) == 1 and stamp and saved[0][1:] == stamp[1:]:
+            if saved[0][0] == _hash_frames(a, salt):
+                return
 
-    vwriter = cv2.VideoWriter(
-        filepath, fourcc, framerate, framesize, iscolor
-    )
-    for i in range(a.shape[Z]):
-        vwriter.write(a[i])
-    vwriter.release()
+    write_frame: Callable[[NDArray[np.uint8]], Any]
+    close: Callable[[], Any]
+    if _is_y4m(filepath):
+        writer = Y4MWriter(filepath, framerate, codec)
+        write_frame, close = writer._write, writer.close
+    else:
+        framesize = (a.shape[X], a.shape[Y])
+        iscolor = False
+        if len(a.shape) == 4:
+            iscolor = True
+
+        vwriter = _open_video(filepath, framerate, codec, framesize, iscolor)
+        write_frame, close = vwriter.write, vwriter.release
+
+    crc = zlib.crc32(salt.encode())
+    try:
+        for frame in a:
+            if skip_if_unchanged:
+                crc = _hash_frame(frame, crc)
+            write_frame(frame)
+    finally:
+        close()
+
+    if skip_if_unchanged:
+        _write_hashes(filepath, [_stamp(filepath, crc)])
+
+
+def write_frames(
+    filepath: Union[str, Path],
+    frames: Iterable[ArrayLike],
+    framerate: float = 12.0,
+    codec: str = 'mp4v'
+) -> None:
+    """Save frames of image data from an iterable as a video file.
+
+    The frames are encoded as they are taken from the iterable, so a
+    generator can be used to create a video that wouldn't fit in
+    memory as a single array.
+
+    :param filepath: The location and name of the file that will
+        be saved. The file extension will determine the container
+        type used for the file.
+    :param frames: The frames of image data.
+    :param framerate: (Optional.) The number of frames the video will
+        play per second.
+    :param codec: (Optional.) The codec used to encode the image data
+        into video. See :func:`write_video`.
+    :return: None.
+    :rtype: None.
+    """
+    with VideoWriter(filepath, framerate, codec) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+
+def write_many(
+    frames: Iterable[ArrayLike],
+    targets: Iterable[Union[str, Path, Target, Mapping[str, Any]]],
+    workers: Optional[int] = None
+) -> None:
+    """Save the same frames of image data to several files, such as a
+    master, proxies at smaller resolutions, and a poster frame.
+
+    Each frame is conditioned for opencv once, and then it is resized
+    once for each resolution needed by the targets. The files are
+    encoded in a pool of threads, and the next frame is conditioned
+    while the last one is being encoded. The frames are taken from
+    the iterable one at a time, so a generator can be used to create
+    files that wouldn't fit in memory as a single array.
+
+    :param frames: The frames of image data. An array is split into
+        frames along its first axis, like the data passed to
+        :func:`write_video`.
+    :param targets: The files to save. Each target is either a
+        :class:`imgwriter.Target`, a mapping of the arguments for one,
+        or just a file path.
+    :param workers: (Optional.) The number of threads used to encode
+        the files. The default is one for each resolution.
+    :return: None.
+    :rtype: None.
+
+    Usage::
+
+        >>> write_many(frames, [
+        ...     Target('master.mov', framerate=24),
+        ...     Target('proxy.mp4', resolution='1080p', framerate=24),
+        ...     Target('poster.png', resolution='1080p', frame=0),
+        ... ])
+    """
+    targets_ = [_target(target) for target in targets]
+
+    with ExitStack() as stack:
+        # Targets at the same resolution share the resized frames.
+        groups: dict[Any, list[tuple[Optional[int], Any]]] = {}
+        for target in targets_:
+            key = (
+                None if target.resolution is None
+                else get_resolution(target.resolution),
+                target.interpolation,
+                _is_raw(target.filepath),
+            )
+            if key[1] is not None and key[1] not in INTERPOLATIONS:
+                msg = f'There is no interpolation named {key[1]}.'
+                raise ValueError(msg)
+            if key[1] is not None and key[0] is None:
+                msg = 'An interpolation can only be given with a resolution.'
+                raise ValueError(msg)
+            writer = stack.enter_context(open_writer(
+                target.filepath, target.framerate, target.codec
+            ))
+            only = target.frame if _is_image(target.filepath) else None
+            groups.setdefault(key, []).append((only, writer))
+
+        executor = stack.enter_context(
+            ThreadPoolExecutor(workers or len(groups) or 1)
+        )
+        pending: list[Future] = []
+        i = -1
+        for i, frame in enumerate(frames):
+            # Raw files get the frame as it was given, since they
+            # don't need to be conditioned for opencv.
+            frame = np.asarray(frame)
+            conditioned = _condition_frame(frame)
+            _finish(pending)
+            pending = [
+                executor.submit(
+                    _write_group, frame if key[2] else conditioned,
+                    i, key, group
+                )
+                for key, group in groups.items()
+            ]
+        _finish(pending)
+
+    for target in targets_:
+        only = target.frame if _is_image(target.filepath) else None
+        if only is not None and only > i:
+            msg = f'There is no frame {only} to save to {target.filepath}.'
+            raise ValueError(msg)
 
 
 # Function aliases.
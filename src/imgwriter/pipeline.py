@@ -0,0 +1,478 @@
+"""
+pipeline
+~~~~~~~~
+
+Stream frames of image data from one file to another.
+"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import count, islice
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+    Union
+)
+from weakref import finalize
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from imgwriter.common import SUPPORTED, Image, Raw, UnsupportedFileType, Video
+from imgwriter.imgreader import (
+    _check_file,
+    _downscale,
+    _imread,
+    _iter_frames,
+    _reorder,
+    _scale_factor,
+    _series_paths,
+    info,
+    iter_y4m,
+    read_raw
+)
+from imgwriter.imgwriter import open_writer
+
+
+# Importable names.
+__all__ = ['iter_frames', 'map_frames', 'transcode',]
+
+
+# Types.
+FrameFunction = Callable[[NDArray[np.uint8]], NDArray[Any]]
+T = TypeVar('T')
+
+
+# Constants.
+# How long the threads in a pipeline wait on each other before checking
+# whether the other thread has stopped.
+POLL_INTERVAL = 0.1
+
+# The shared memory a process in a :func:`map_frames` pool reads frames
+# from and writes results to. It's set when the process starts.
+_worker: dict[str, Any] = {}
+
+
+# Core functions.
+def iter_frames(
+    path: Union[str, Path, BinaryIO],
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    step: int = 1,
+    scale: float = 1
+) -> Iterator[NDArray[np.uint8]]:
+    """Decode the frames of a video or a series of images one at a time.
+
+    The frames are yielded as RGB or grayscale arrays of unsigned 8-bit
+    integers, which is what :func:`imgwriter.open_writer` expects. The
+    frames aren't normalized to floats, so they can go to a writer
+    without being converted.
+
+    :param path: The location of the file. If it's an image, it's read
+        as a series saved by :func:`imgwriter.write_image`. The frames
+        of a `.npy` file are yielded as they were saved. A binary
+        file-like object, such as `sys.stdin.buffer`, is read as Y4M
+        video.
+    :param start: (Optional.) The number of the first frame to read.
+    :param stop: (Optional.) Stop reading before the frame with this
+        number.
+    :param step: (Optional.) Only read every step-th frame.
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. It must be 1, 1/2, 1/4, or 1/8.
+    :return: The frames as :class:`numpy.ndarray` objects.
+    :rtype: collections.abc.Iterator
+    """
+    _check_step(step)
+    factor = _scale_factor(scale)
+    if not isinstance(path, (str, Path)):
+        frames = islice(iter_y4m(path), start, stop, step)
+        for frame in frames:
+            if factor > 1:
+                frame = _downscale(frame, factor)
+            yield np.flip(frame, -1)
+        return
+
+    path = Path(path)
+    ftype = SUPPORTED.get(path.suffix.casefold()[1:])
+
+    if isinstance(ftype, Image):
+        for framepath in _series_paths(path, start, stop)[::step]:
+            yield _reorder(_imread(framepath, scale))
+
+    elif isinstance(ftype, Video):
+        _check_file(str(path))
+        start = start or 0
+        indices: Iterable[int] = count(start, step)
+        if stop is not None:
+            indices = range(start, stop, step)
+
+        # Opencv decodes frames as BGR. Flipping them here is only a
+        # view, and the writer flips them back before encoding, so the
+        # data is never copied.
+        capture = cv2.VideoCapture(str(path))
+        try:
+            for frame in _iter_frames(capture, factor, indices):
+                yield np.flip(frame, -1)
+        finally:
+            capture.release()
+
+    # Raw frames are views of the memory-mapped file, so they are only
+    # read from disk as they are used.
+    elif isinstance(ftype, Raw):
+        a = read_raw(path)
+        for frame in a[start:stop:step]:
+            if factor > 1:
+                frame = _downscale(frame, factor)
+            yield frame
+
+    else:
+        raise UnsupportedFileType(f'{path.suffix}')
+
+
+def map_frames(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    fn: FrameFunction,
+    workers: Optional[int] = None,
+    buffer: Optional[int] = None,
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    step: int = 1,
+    framerate: Optional[float] = None,
+    codec: str = 'mp4v'
+) -> int:
+    """Apply a function to each frame of a video or series of images
+    in a pool of processes, saving the results to a file in order.
+
+    The frames are passed to the processes through blocks of shared
+    memory, so the image data is never pickled. Only a limited number
+    of frames are being processed at any time, so the memory used
+    doesn't depend on the length of the video.
+
+    The function is called once in this process with the first frame
+    to find the shape and data type of the results. Every result must
+    have that shape and data type. Since the function is sent to the
+    processes in the pool, it must be picklable on systems that don't
+    fork new processes.
+
+    :param src: The location of the file to read. See :func:`transcode`.
+    :param dst: The location of the file to write. See :func:`transcode`.
+    :param fn: The function to apply. It's passed one RGB or grayscale
+        frame of unsigned 8-bit integers and returns the image data to
+        save for that frame.
+    :param workers: (Optional.) The number of processes used to apply
+        the function. The default is the number of processors on the
+        system. If it's one, the function is applied in this process.
+    :param buffer: (Optional.) The most frames being processed at any
+        time. The default is twice the number of workers.
+    :param start: (Optional.) The number of the first frame to process.
+    :param stop: (Optional.) Stop processing before the frame with
+        this number.
+    :param step: (Optional.) Only process every step-th frame.
+    :param framerate: (Optional.) The frame rate of the destination
+        video. See :func:`transcode`.
+    :param codec: (Optional.) The codec used to encode the destination
+        video. See :func:`imgwriter.write_video`.
+    :return: The number of frames processed as an :class:`int`.
+    :rtype: int
+
+    Usage::
+
+        >>> def invert(frame):
+        ...     return 0xff - frame
+        >>> map_frames('spam.mp4', 'inverted.mp4', invert, workers=4)
+        72
+    """
+    _check_step(step)
+    if framerate is None:
+        framerate = _default_framerate(src, step)
+    workers = workers or os.cpu_count() or 1
+    size = buffer or 2 * workers
+    frames = iter_frames(src, start, stop, step)
+
+    with open_writer(dst, framerate, codec) as writer:
+        if workers == 1:
+            for frame in _prefetch(frames):
+                writer.write(fn(frame))
+            return writer.frames
+
+        # The first frame is read in this thread, and the processes in
+        # the pool are started before the decoding thread. Forking while
+        # that thread is decoding could copy locks it holds, such as
+        # ones inside opencv, into the processes and deadlock them.
+        first = next(frames, None)
+        if first is None:
+            return 0
+        result = np.asarray(fn(first))
+        writer.write(result)
+
+        with _shared_array((size, *first.shape), first.dtype) as src_, \
+                _shared_array((size, *result.shape), result.dtype) as dst_:
+            initargs = (
+                fn,
+                src_[0].shape, src_[0].dtype, src_[1],
+                dst_[0].shape, dst_[0].dtype, dst_[1],
+            )
+            with ProcessPoolExecutor(
+                workers, initializer=_init_map_worker, initargs=initargs
+            ) as executor:
+                executor.submit(os.getpid).result()
+                _map_frames(
+                    executor, _prefetch(frames), src_[0], dst_[0], writer
+                )
+        return writer.frames
+
+
+def transcode(
+    src: Union[str, Path, BinaryIO],
+    dst: Union[str, Path, BinaryIO],
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    step: int = 1,
+    scale: float = 1,
+    framerate: Optional[float] = None,
+    codec: str = 'mp4v',
+    buffer: int = 4
+) -> int:
+    """Convert a video or a series of images to a different format.
+
+    Frames are streamed from the source to the destination, so only a
+    few frames are in memory at a time. The source is decoded in a
+    separate thread from the one encoding the destination, so decoding
+    and encoding happen at the same time.
+
+    :param src: The location of the file to read. If it's an image, it's
+        read as a series saved by :func:`imgwriter.write_image`. If
+        it's a binary file-like object, it's read as Y4M video.
+    :param dst: The location of the file to write. If it's an image,
+        the frames are saved as a series of images. If it's a binary
+        file-like object, the frames are saved as Y4M video.
+    :param start: (Optional.) The number of the first frame to convert.
+    :param stop: (Optional.) Stop converting before the frame with
+        this number.
+    :param step: (Optional.) Only convert every step-th frame.
+    :param scale: (Optional.) Reduce the resolution of the frames. It
+        must be 1, 1/2, 1/4, or 1/8.
+    :param framerate: (Optional.) The frame rate of the destination
+        video. The default is the frame rate of the source video divided
+        by the step, so the video plays for the same length of time. If
+        the source is a series of images, the default is the default of
+        :func:`imgwriter.write_video`. If the frame rate of the source
+        video isn't known, it must be given.
+    :param codec: (Optional.) The codec used to encode the destination
+        video. See :func:`imgwriter.write_video`.
+    :param buffer: (Optional.) The most decoded frames waiting to be
+        encoded at any time.
+    :return: The number of frames converted as an :class:`int`.
+    :rtype: int
+
+    Usage::
+
+        >>> transcode('spam.mp4', 'spam.png', start=24, stop=48)
+        24
+        >>> transcode('spam.png', 'eggs.mov', codec='avc1', framerate=24)
+        24
+    """
+    _check_step(step)
+    if framerate is None:
+        framerate = _default_framerate(src, step)
+
+    frames = iter_frames(src, start, stop, step, scale)
+    with open_writer(dst, framerate, codec) as writer:
+        for frame in _prefetch(frames, buffer):
+            writer.write(frame)
+        return writer.frames
+
+
+# Utility functions.
+@contextmanager
+def _shared_array(
+    shape: tuple[int, ...],
+    dtype: np.dtype
+) -> Iterator[tuple[NDArray[Any], str]]:
+    """Create an array in a block of shared memory that other processes
+    can attach to by name. The block is removed when the context ends.
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    shm = SharedMemory(create=True, size=max(nbytes, 1))
+    a: NDArray[Any] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    # The block can't be closed while an array still uses it, so it's
+    # closed when the array is garbage collected.
+    finalize(a, shm.close)
+    try:
+        yield a, shm.name
+    finally:
+        shm.unlink()
+
+
+def _check_step(step: int) -> None:
+    """Raise an exception if the step isn't valid."""
+    if step < 1:
+        msg = 'The step must be greater than zero.'
+        raise ValueError(msg)
+
+
+def _default_framerate(
+    src: Union[str, Path, BinaryIO],
+    step: int = 1
+) -> float:
+    """Get the frame rate that keeps a converted video the same length
+    as the source.
+    """
+    if not isinstance(src, (str, Path)):
+        return 12.0
+    ftype = SUPPORTED.get(Path(src).suffix.casefold()[1:])
+    if not isinstance(ftype, Video):
+        return 12.0
+    fps = info(src).fps
+    if not fps:
+        msg = (
+            f'The frame rate of the video at {src} is not known, so a '
+            'framerate must be given.'
+        )
+        raise ValueError(msg)
+    return fps / step
+
+
+def _init_map_worker(
+    fn: FrameFunction,
+    src_shape: tuple[int, ...],
+    src_dtype: np.dtype,
+    src_name: str,
+    dst_shape: tuple[int, ...],
+    dst_dtype: np.dtype,
+    dst_name: str
+) -> None:
+    """Attach a process in a :func:`map_frames` pool to the shared
+    memory used to pass frames.
+    """
+    for key, shape, dtype, name in (
+        ('src', src_shape, src_dtype, src_name),
+        ('dst', dst_shape, dst_dtype, dst_name),
+    ):
+        shm = SharedMemory(name=name)
+        _worker[f'{key}_shm'] = shm
+        _worker[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker['fn'] = fn
+
+
+def _map_frame(slot: int) -> None:
+    """Apply the function to the frame in a slot of shared memory."""
+    src, dst = _worker['src'], _worker['dst']
+    result = np.asarray(_worker['fn'](src[slot]))
+    if result.shape != dst.shape[1:] or result.dtype != dst.dtype:
+        msg = (
+            f'The function returned {result.dtype} data with shape '
+            f'{result.shape}, but the first frame returned '
+            f'{dst.dtype} data with shape {dst.shape[1:]}.'
+        )
+        raise ValueError(msg)
+    dst[slot] = result
+
+
+def _map_frames(
+    executor: ProcessPoolExecutor,
+    frames: Iterator[NDArray[np.uint8]],
+    src: NDArray[Any],
+    dst: NDArray[Any],
+    writer: Any
+) -> None:
+    """Send frames through shared memory to a pool of processes and
+    write the results in order.
+
+    Each frame is copied into a slot of the shared memory used as a
+    ring buffer. When every slot is in use, the oldest result is
+    written before its slot is reused.
+    """
+    pending: deque[tuple[int, Future]] = deque()
+    try:
+        for i, frame in enumerate(frames):
+            if len(pending) == len(src):
+                slot, future = pending.popleft()
+                future.result()
+                writer.write(dst[slot])
+            if frame.shape != src.shape[1:]:
+                msg = (
+                    f'Frame {i + 1} has shape {frame.shape}, but the '
+                    f'first frame has shape {src.shape[1:]}.'
+                )
+                raise ValueError(msg)
+
+            slot = i % len(src)
+            src[slot] = frame
+            pending.append((slot, executor.submit(_map_frame, slot)))
+
+        while pending:
+            slot, future = pending.popleft()
+            future.result()
+            writer.write(dst[slot])
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _prefetch(items: Iterable[T], size: int = 4) -> Iterator[T]:
+    """Run an iterable in a background thread, yielding its items in
+    order as they become available.
+
+    At most `size` items are waiting in the queue at any time. If the
+    iterable raises an exception, it is raised again by this generator.
+    If this generator is closed early, the background thread stops.
+
+    :param items: The iterable to run.
+    :param size: (Optional.) The most items waiting in the queue.
+    :return: The items from the iterable.
+    :rtype: collections.abc.Iterator
+    """
+    queue: Queue[tuple[str, Any]] = Queue(maxsize=size)
+    stopped = Event()
+
+    def put(kind: str, value: Any = None) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put((kind, value), timeout=POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def run() -> None:
+        try:
+            for item in items:
+                if not put('item', item):
+                    return
+        except BaseException as ex:
+            put('error', ex)
+        else:
+            put('done')
+
+    thread = Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                kind, value = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                if not thread.is_alive() and queue.empty():
+                    return
+                continue
+            if kind == 'error':
+                raise value
+            elif kind == 'done':
+                return
+            yield value
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,309 @@
+"""
+reducers
+~~~~~~~~
+
+Reduce the frames of a video to a single value without reading the
+whole video into memory.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from functools import partial, reduce
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from imgwriter.common import Reducer
+from imgwriter.imgreader import (
+    _check_mode,
+    _frame_shape,
+    _read_frame,
+    _scale_factor,
+    info
+)
+
+
+# Importable names.
+__all__ = ['reduce_video',]
+
+
+# Constants.
+# The weights of the red, green, and blue channels in the luminance.
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
+
+# Types.
+Batch = NDArray[np.uint8]
+ReduceFunction = Callable[[Any, Batch], Any]
+
+
+# Core functions.
+def reduce_video(
+    path: Union[str, Path],
+    fn: Union[Reducer, ReduceFunction],
+    init: Any = None,
+    combine: Optional[Callable[[Any, Any], Any]] = None,
+    finish: Optional[Callable[[Any], Any]] = None,
+    batch: int = 16,
+    workers: Optional[int] = None,
+    scale: float = 1,
+    mode: Optional[str] = 'rgb'
+) -> Any:
+    """Reduce the frames of a video to a single value.
+
+    The frames are decoded into a batch, and the function is called
+    with the value so far and each batch of frames. Only one batch is
+    in memory at a time. The array for the batch is reused, so the
+    function must copy any frames it needs to keep.
+
+    The video can be split into segments that are reduced in parallel
+    by a pool of processes. The values for the segments are then
+    combined in order. This needs a `combine` function, and the
+    functions must be picklable on systems that don't fork new
+    processes.
+
+    :param path: The path to the video file.
+    :param fn: The function that reduces a batch of frames, or a
+        :class:`imgwriter.Reducer`, such as the ones built by the
+        functions in :mod:`imgwriter.reducers`. If it's a reducer, the
+        other functions and initial value come from the reducer.
+    :param init: (Optional.) The value before any frames are reduced.
+        Each segment starts from a copy of it.
+    :param combine: (Optional.) A function that combines the values
+        of two segments.
+    :param finish: (Optional.) A function that turns the reduced value
+        into the result.
+    :param batch: (Optional.) The number of frames in each batch.
+    :param workers: (Optional.) The number of processes used to reduce
+        segments of the video in parallel. The default is to reduce
+        the video in this process.
+    :param scale: (Optional.) Reduce the resolution of the frames
+        while reading them. See :func:`imgwriter.read_video`.
+    :param mode: (Optional.) The color space of the frames. It can be
+        `'gray'`, `'rgb'`, `'rgba'`, or `None` for the BGR data opencv
+        decodes. The default is `'rgb'`.
+    :return: The reduced value.
+    :rtype: Any
+
+    Usage::
+
+        >>> from imgwriter import reducers
+        >>> path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+        >>> reduce_video(path, reducers.mean()).shape
+        (480, 720, 3)
+        >>> reduce_video(path, lambda n, batch: n + len(batch), init=0)
+        3
+    """
+    if isinstance(fn, Reducer):
+        init, combine, finish = fn.init, fn.combine, fn.finish
+        fn = fn.fn
+    if batch < 1:
+        msg = 'The batch must be greater than zero.'
+        raise ValueError(msg)
+    factor = _scale_factor(scale)
+    _check_mode(mode)
+    meta = info(path)
+    shape = (batch, *_frame_shape(meta, factor, mode))
+    reduce_segment = partial(
+        _reduce_segment, str(path), fn, init, shape, factor, mode
+    )
+
+    if workers is None or workers <= 1 or meta.frames < 2:
+        result = reduce_segment(0, None)
+    elif combine is None:
+        msg = 'A combine function is needed to reduce in parallel.'
+        raise ValueError(msg)
+    else:
+        # The frame count in the container is only an estimate, so the
+        # last segment reads until the video ends.
+        bounds = np.linspace(0, meta.frames, workers + 1, dtype=int)
+        starts = [int(n) for n in bounds[:-1]]
+        stops: list[Optional[int]] = [int(n) for n in bounds[1:-1]]
+        stops.append(None)
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(reduce_segment, starts, stops))
+        result = reduce(combine, results)
+
+    if finish is not None:
+        result = finish(result)
+    return result
+
+
+def histogram(bins: int = 256) -> Reducer:
+    """Count the values of each color channel in the frames.
+
+    :param bins: (Optional.) The number of bins in the histogram. It
+        must divide 256 evenly.
+    :return: A :class:`imgwriter.Reducer` that results in an array of
+        counts with one row for each color channel.
+    :rtype: imgwriter.Reducer
+    """
+    if bins < 1 or 256 % bins:
+        msg = 'The number of bins must divide 256 evenly.'
+        raise ValueError(msg)
+    return Reducer(
+        _histogram,
+        combine=partial(_merge, ops=(np.add,)),
+        finish=partial(_histogram_finish, bins=bins)
+    )
+
+
+def luminance(mode: Optional[str] = 'rgb') -> Reducer:
+    """Find the mean luminance of each frame, using the ITU-R BT.601
+    weights for color frames.
+
+    :param mode: (Optional.) The color space of the frames. It must be
+        the same as the mode given to :func:`reduce_video`, so the
+        weights are applied to the right channels. The default is
+        `'rgb'`.
+    :return: A :class:`imgwriter.Reducer` that results in an array with
+        the luminance of each frame, from 0 to 255.
+    :rtype: imgwriter.Reducer
+    """
+    _check_mode(mode)
+    weights = LUMA_WEIGHTS[::-1] if mode is None else LUMA_WEIGHTS
+    return Reducer(
+        partial(_luminance, weights=weights),
+        combine=partial(_merge, ops=(_concatenate,)),
+        finish=_first
+    )
+
+
+def mean() -> Reducer:
+    """Find the mean frame.
+
+    :return: A :class:`imgwriter.Reducer` that results in a frame of
+        64-bit floats from 0 to 255.
+    :rtype: imgwriter.Reducer
+    """
+    return Reducer(
+        _mean,
+        combine=partial(_merge, ops=(np.add, np.add)),
+        finish=_mean_finish
+    )
+
+
+def min_max() -> Reducer:
+    """Find the smallest and largest values of each color channel.
+
+    :return: A :class:`imgwriter.Reducer` that results in a tuple of
+        the minimums and the maximums.
+    :rtype: imgwriter.Reducer
+    """
+    return Reducer(
+        _min_max,
+        combine=partial(_merge, ops=(np.minimum, np.maximum))
+    )
+
+
+# Utility functions.
+def _concatenate(a: NDArray[Any], b: NDArray[Any]) -> NDArray[Any]:
+    return np.concatenate((a, b))
+
+
+def _first(acc: Optional[tuple[Any, ...]]) -> Any:
+    return None if acc is None else acc[0]
+
+
+def _histogram(acc: Optional[tuple[NDArray[Any]]], batch: Batch) -> Any:
+    channels = batch[..., np.newaxis] if batch.ndim < 4 else batch
+    counts = np.stack([
+        np.bincount(channels[..., c].ravel(), minlength=256)
+        for c in range(channels.shape[-1])
+    ])
+    return _merge(acc, (counts,), (np.add,))
+
+
+def _histogram_finish(
+    acc: Optional[tuple[NDArray[Any]]],
+    bins: int
+) -> Optional[NDArray[Any]]:
+    if acc is None:
+        return None
+    counts = acc[0]
+    return counts.reshape((len(counts), bins, 256 // bins)).sum(-1)
+
+
+def _luminance(
+    acc: Optional[tuple[NDArray[Any]]],
+    batch: Batch,
+    weights: NDArray[np.float64]
+) -> Any:
+    # Taking the mean of each channel first and then weighting them is
+    # the same as weighting each pixel, but it's much less work.
+    means = batch.reshape((len(batch), -1, *batch.shape[3:])).mean(1)
+    if batch.ndim == 4:
+        means = means[:, :3] @ weights
+    return _merge(acc, (means,), (_concatenate,))
+
+
+def _mean(acc: Optional[tuple[NDArray[Any], int]], batch: Batch) -> Any:
+    total = batch.sum(0, dtype=np.float64)
+    return _merge(acc, (total, len(batch)), (np.add, np.add))
+
+
+def _mean_finish(
+    acc: Optional[tuple[NDArray[Any], int]]
+) -> Optional[NDArray[np.float64]]:
+    return None if acc is None else acc[0] / acc[1]
+
+
+def _merge(
+    a: Optional[tuple[Any, ...]],
+    b: Optional[tuple[Any, ...]],
+    ops: tuple[Callable[[Any, Any], Any], ...]
+) -> Optional[tuple[Any, ...]]:
+    """Combine two values item by item. Either can be `None` if there
+    were no frames to reduce.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return tuple(op(x, y) for op, x, y in zip(ops, a, b))
+
+
+def _min_max(acc: Optional[tuple[Any, Any]], batch: Batch) -> Any:
+    # The last axis of a color batch is the channel, so this keeps the
+    # channels separate and reduces a grayscale batch to one value.
+    axes = (0, 1, 2)
+    value = (batch.min(axis=axes), batch.max(axis=axes))
+    return _merge(acc, value, (np.minimum, np.maximum))
+
+
+def _reduce_segment(
+    path: str,
+    fn: ReduceFunction,
+    init: Any,
+    shape: tuple[int, ...],
+    factor: int,
+    mode: Optional[str],
+    start: int,
+    stop: Optional[int]
+) -> Any:
+    """Reduce a segment of a video. This can be run in a worker process
+    by :func:`reduce_video`.
+    """
+    acc = deepcopy(init)
+    buffer = np.empty(shape, dtype=np.uint8)
+    capture = cv2.VideoCapture(path)
+    try:
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        n = 0
+        i = start
+        while stop is None or i < stop:
+            if _read_frame(capture, factor, buffer[n], mode) is None:
+                break
+            i += 1
+            n += 1
+            if n == len(buffer):
+                acc = fn(acc, buffer)
+                n = 0
+        if n:
+            acc = fn(acc, buffer[:n])
+    finally:
+        capture.release()
+    return acc
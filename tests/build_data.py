@@ -69,11 +69,9 @@ a[1, :, :] = 0.5
 a[2, :, :] = 1.0
 for vid in vidtypes:
     for codec in vid.codecs:
+        name = f'__test_save_grayscale_video_{codec.strip()}.{vid.ext}'
         try:
-            save_video(
-                f'tests/data/__test_save_grayscale_video_{codec}.{vid.ext}',
-                a, 12, codec
-            )
+            save_video(f'tests/data/{name}', a, 12, codec)
         except Exception as ex:
             cls = type(ex)
             raise cls(f'Type: gray {vid.ext} {codec}. {str(ex)}')
@@ -87,7 +85,7 @@ for vid in vidtypes:
     for codec in vid.codecs:
         try:
             save_video(
-                f'tests/data/__test_save_rgb_video_{codec}.{vid.ext}',
+                f'tests/data/__test_save_rgb_video_{codec.strip()}.{vid.ext}',
                 a, 12, codec
             )
         except Exception as ex:
@@ -0,0 +1,146 @@
+"""
+test_batch
+~~~~~~~~~~
+
+Unit tests for the imgwriter.batch and imgwriter.cli modules.
+"""
+import json
+
+import numpy as np
+import pytest as pt
+
+from imgwriter import batch as b
+from imgwriter import cli
+from imgwriter import imgreader as ir
+from imgwriter import imgwriter as iw
+
+
+# Fixtures.
+@pt.fixture
+def jobs(tmp_path):
+    """A batch of jobs for testing."""
+    return [
+        {
+            'job': 'spacer',
+            'filepath': str(tmp_path / 'spam.png'),
+            'resolution': [16, 9],
+            'color': 'c05632',
+        },
+        {
+            'job': 'fade',
+            'filepath': str(tmp_path / 'eggs.mp4'),
+            'resolution': [64, 48],
+            'frames': 6,
+        },
+        {
+            'job': 'write',
+            'filepath': str(tmp_path / 'bacon.png'),
+            'source': 'tests/data/__test_save_rgb_image.png',
+        },
+    ]
+
+
+# Tests for run_batch.
+@pt.mark.parametrize('workers', [1, 2,])
+def test_run_batch(jobs, workers, tmp_path):
+    """Given a list of jobs, :func:`run_batch` should run each job and
+    return the results in order.
+    """
+    results = b.run_batch(jobs, workers=workers)
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.job for result in results] == ['spacer', 'fade', 'write']
+    assert all(result.ok for result in results)
+    assert all(result.seconds >= 0 for result in results)
+
+    a = ir.read_image(tmp_path / 'spam.png', as_video=False)
+    assert a.shape == (9, 16, 3)
+    assert (np.around(a[0, 0] * 0xff) == [0xc0, 0x56, 0x32]).all()
+    assert ir.info(tmp_path / 'eggs.mp4').frames == 6
+    assert (tmp_path / 'bacon.png').exists()
+
+
+def test_run_batch_failures(jobs, tmp_path):
+    """If a job fails, :func:`run_batch` should record the error and
+    keep running the rest of the jobs.
+    """
+    jobs.insert(0, {'job': 'spam', 'filepath': 'eggs.png'})
+    jobs.insert(1, {'job': 'spacer', 'filepath': 'x.jpg', 'resolution': 'x'})
+    results = b.run_batch(jobs, workers=2)
+    assert results[0].error == 'ValueError: There is no job named spam.'
+    assert results[1].error == 'ValueError: There is no resolution named x.'
+    assert all(result.ok for result in results[2:])
+
+
+def test_run_batch_write_video(tmp_path):
+    """A write job should save a video with the same colors as the
+    video it was read from.
+    """
+    a = np.zeros((2, 48, 64, 3), dtype=np.uint8)
+    a[..., 0] = 0xff
+    source = tmp_path / 'spam.avi'
+    iw.write_video(source, a, 12, 'FFV1')
+    job = {
+        'job': 'write',
+        'filepath': str(tmp_path / 'eggs.avi'),
+        'source': str(source),
+        'codec': 'FFV1',
+    }
+    result, = b.run_batch([job], workers=1)
+    assert result.ok
+    result = ir.read_video(tmp_path / 'eggs.avi', mode='rgb')
+    assert (result == a).all()
+
+
+# Tests for load_manifest.
+@pt.mark.parametrize('ndjson', [False, True,])
+def test_load_manifest(jobs, ndjson, tmp_path):
+    """Given the path to a JSON or NDJSON manifest, :func:`load_manifest`
+    should return the jobs in the manifest.
+    """
+    path = tmp_path / 'manifest.json'
+    if ndjson:
+        path.write_text('\n\n'.join(json.dumps(job) for job in jobs))
+    else:
+        path.write_text(json.dumps(jobs))
+    assert b.load_manifest(path) == jobs
+
+
+# Tests for the command line interface.
+def test_cli_batch(jobs, tmp_path, capsys):
+    """Given the batch command and a manifest, the command line
+    interface should run the jobs and print the results.
+    """
+    jobs.append({'job': 'spam', 'filepath': 'eggs.png'})
+    path = tmp_path / 'manifest.ndjson'
+    path.write_text('\n'.join(json.dumps(job) for job in jobs))
+    status = cli.main(['batch', str(path), '-w', '1'])
+    lines = capsys.readouterr().out.splitlines()
+    assert status == 1
+    assert [line.split('\t')[0] for line in lines[:-1]] == [
+        'ok', 'ok', 'ok', 'FAILED',
+    ]
+    assert lines[-1] == '3 of 4 jobs succeeded.'
+
+
+def test_cli_transcode(tmp_path, capsys):
+    """Given the transcode command, a source, and a destination, the
+    command line interface should convert the source.
+    """
+    src = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    dst = tmp_path / 'spam.png'
+    status = cli.main(['transcode', src, str(dst), '--stop', '2'])
+    assert status == 0
+    assert capsys.readouterr().out == 'Converted 2 frames.\n'
+    assert ir.read_series(dst).shape == (2, 480, 720, 3)
+
+
+def test_cli_transcode_stdout(capsysbinary):
+    """Given `-` as the destination, the transcode command should write
+    Y4M video to standard output and the message to standard error.
+    """
+    src = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    status = cli.main(['transcode', src, '-', '--stop', '1'])
+    captured = capsysbinary.readouterr()
+    assert status == 0
+    assert captured.out.startswith(b'YUV4MPEG2 W720 H480 F12:1 ')
+    assert captured.err == b'Converted 1 frames.\n'
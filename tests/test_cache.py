@@ -0,0 +1,279 @@
+"""
+test_cache
+~~~~~~~~~~
+
+Unit tests for the imgwriter.cache module.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest as pt
+
+from imgwriter import cache as c
+from imgwriter import imgreader as ir
+
+
+# Fixtures.
+@pt.fixture
+def cache(tmp_path):
+    """A :class:`DiskCache` for testing."""
+    return c.DiskCache(tmp_path / 'cache')
+
+
+# Tests for DiskCache.
+def test_diskcache_get_missing(cache):
+    """If the key isn't in the cache, :meth:`DiskCache.get` should
+    return `None`.
+    """
+    assert cache.get('spam') is None
+
+
+def test_diskcache_put_and_get(cache):
+    """Data put into a :class:`DiskCache` should be returned by
+    :meth:`DiskCache.get` as a read-only :class:`numpy.memmap`.
+    """
+    a = np.arange(24, dtype=np.uint8).reshape((2, 3, 4))
+    cache.put('spam', a)
+    result = cache.get('spam')
+    assert isinstance(result, np.memmap)
+    assert not result.flags.writeable
+    assert (result == a).all()
+
+
+def test_diskcache_evicts_least_recently_used(tmp_path):
+    """When the data in a :class:`DiskCache` goes over the size budget,
+    the least recently used data should be removed.
+    """
+    a = np.zeros(1024, dtype=np.uint8)
+    cache = c.DiskCache(tmp_path / 'cache', max_bytes=2500)
+    cache.put('spam', a)
+    cache.put('eggs', a)
+    os.utime(cache._entry('spam'), ns=(0, 0))
+    cache.get('eggs')
+    cache.put('bacon', a)
+    assert cache.get('spam') is None
+    assert cache.get('eggs') is not None
+    assert cache.get('bacon') is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_diskcache_too_large(cache):
+    """If data is larger than the size budget, :meth:`DiskCache.put`
+    should return the data without caching it.
+    """
+    cache.max_bytes = 10
+    a = np.zeros(1024, dtype=np.uint8)
+    assert cache.put('spam', a) is a
+    assert cache.get('spam') is None
+
+
+def test_diskcache_put_same_key_threads(cache):
+    """Threads putting data under the same key at the same time should
+    not interfere with each other's writes.
+    """
+    a = np.arange(2 ** 16, dtype=np.uint8)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(
+            lambda _: cache.put('spam', a), range(32)
+        ))
+    assert all((result == a).all() for result in results)
+    assert list(cache.path.glob('*.tmp')) == []
+
+
+# Tests for FileCache.
+@pt.mark.parametrize('link', [False, True,])
+def test_filecache_put_and_get(link, tmp_path):
+    """A file put into a :class:`FileCache` should be copied or linked
+    to the given path by :meth:`FileCache.get`.
+    """
+    cache = c.FileCache(tmp_path / 'cache', link=link)
+    src = tmp_path / 'spam.jpg'
+    src.write_bytes(b'spam')
+    dst = tmp_path / 'eggs.jpg'
+    assert not cache.get('spam', dst)
+    cache.put('spam', src)
+    assert cache.get('spam', dst)
+    assert dst.read_bytes() == b'spam'
+    assert (dst.stat().st_nlink == 2) == link
+    assert cache.nbytes == 4
+
+
+def test_filecache_same_key_threads(tmp_path):
+    """Threads putting and getting a file under the same key at the
+    same time should not interfere with each other.
+    """
+    cache = c.FileCache(tmp_path / 'cache')
+    src = tmp_path / 'spam.jpg'
+    src.write_bytes(b'spam' * 2 ** 14)
+    dst = tmp_path / 'eggs.jpg'
+
+    def put_and_get(_):
+        cache.put('spam', src)
+        return cache.get('spam', dst)
+    with ThreadPoolExecutor(4) as executor:
+        assert all(executor.map(put_and_get, range(32)))
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_filecache_evicts_least_recently_used(tmp_path):
+    """When the files in a :class:`FileCache` go over the size budget,
+    the least recently used files should be removed.
+    """
+    cache = c.FileCache(tmp_path / 'cache', max_bytes=10)
+    src = tmp_path / 'spam.png'
+    src.write_bytes(b'spam')
+    cache.put('spam', src)
+    cache.put('eggs', src)
+    os.utime(cache._entry('spam', src), ns=(0, 0))
+    cache.put('bacon', src)
+    assert not cache.get('spam', tmp_path / 'out.png')
+    assert cache.get('eggs', tmp_path / 'out.png')
+    assert cache.nbytes <= cache.max_bytes
+
+
+# Tests for make_key.
+def test_make_key_options(tmp_path):
+    """The key should change when the options used to read the file
+    or the file itself changes.
+    """
+    path = tmp_path / 'spam.txt'
+    path.write_text('spam')
+    key = c.make_key('read_image', path, as_video=True)
+    assert key == c.make_key('read_image', path, as_video=True)
+    assert key != c.make_key('read_image', path, as_video=False)
+    assert key != c.make_key('read_video', path, as_video=True)
+
+    path.write_text('spam eggs')
+    assert key != c.make_key('read_image', path, as_video=True)
+
+
+# Tests for reading with a cache.
+def test_read_image_cached(cache, monkeypatch):
+    """When given a cache, :func:`read_image` should only decode the
+    file the first time it is read.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    expected = ir.read_image(path)
+    a = ir.read_image(path, cache=cache)
+    assert isinstance(a, np.memmap)
+    assert (a == expected).all()
+
+    def imread(*args, **kwargs):
+        raise AssertionError('File was decoded.')
+    monkeypatch.setattr(ir.cv2, 'imread', imread)
+    a = ir.read_image(path, cache=cache)
+    assert (a == expected).all()
+
+
+def test_read_video_cached(cache, monkeypatch):
+    """When given a cache, :func:`read_video` should only decode the
+    file the first time it is read.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    expected = ir.read_video(path)
+    a = ir.read(path, cache=cache)
+    assert not a.flags.writeable
+    assert (a == expected).all()
+
+    def capture(*args, **kwargs):
+        raise AssertionError('File was decoded.')
+    monkeypatch.setattr(ir.cv2, 'VideoCapture', capture)
+    a = ir.read(path, cache=cache)
+    assert (a == expected).all()
+
+
+def test_read_image_cached_file_does_not_exist(cache):
+    """If given the path of a file that doesn't exist, :func:`read_image`
+    should raise a :class:`FileNotFoundError` even with a cache.
+    """
+    path = 'tests/data/spam.jpg'
+    with pt.raises(
+        FileNotFoundError,
+        match=f'There is no file at {path}.'
+    ):
+        _ = ir.read_image(path, cache=cache)
+
+
+# Tests for MemoryCache.
+def test_memorycache_put_and_get():
+    """Data put into a :class:`MemoryCache` should be returned by
+    :meth:`MemoryCache.get` as a read-only array, and the hits and
+    misses should be counted.
+    """
+    cache = c.MemoryCache()
+    a = np.zeros((2, 3), dtype=np.uint8)
+    assert cache.get('spam') is None
+    cache.put('spam', a)
+    result = cache.get('spam')
+    assert result is a
+    assert not result.flags.writeable
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.nbytes == a.nbytes
+
+
+def test_memorycache_too_large():
+    """If data is larger than the size budget, :meth:`MemoryCache.put`
+    should return the data without caching it or making it read-only.
+    """
+    cache = c.MemoryCache(max_bytes=10)
+    a = np.zeros(1024, dtype=np.uint8)
+    assert cache.put('spam', a) is a
+    assert a.flags.writeable
+    assert cache.get('spam') is None
+
+
+def test_memorycache_evicts_least_recently_used():
+    """When the data in a :class:`MemoryCache` goes over the size budget,
+    the least recently used data should be removed.
+    """
+    a = np.zeros(1024, dtype=np.uint8)
+    cache = c.MemoryCache(max_bytes=2500)
+    cache.put('spam', a.copy())
+    cache.put('eggs', a.copy())
+    cache.get('spam')
+    cache.put('bacon', a.copy())
+    assert cache.get('eggs') is None
+    assert cache.get('spam') is not None
+    assert cache.get('bacon') is not None
+    assert len(cache) == 2
+    assert cache.nbytes == 2048
+
+
+def test_memorycache_threads():
+    """A :class:`MemoryCache` should be usable from multiple threads."""
+    path = 'tests/data/__test_save_rgb_image.png'
+    cache = c.MemoryCache()
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(
+            lambda _: ir.read_image(path, cache=cache),
+            range(32)
+        ))
+    assert all((a == results[0]).all() for a in results)
+    assert cache.hits + cache.misses == 32
+    assert len(cache) == 1
+
+
+def test_read_image_memorycache(monkeypatch):
+    """When given a :class:`MemoryCache`, :func:`read_image` should only
+    decode the file the first time it is read.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    cache = c.MemoryCache()
+    expected = ir.read_image(path, cache=cache)
+
+    def imread(*args, **kwargs):
+        raise AssertionError('File was decoded.')
+    monkeypatch.setattr(ir.cv2, 'imread', imread)
+    assert ir.read_image(path, cache=cache) is expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_read_video_lazy_not_cached(cache):
+    """If :func:`read_video` returns a :class:`VideoStream`, it should
+    not be put in the cache.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    stream = ir.read_video(path, max_memory=1, lazy=True, cache=cache)
+    assert isinstance(stream, ir.VideoStream)
+    assert cache.nbytes == 0
@@ -4,8 +4,11 @@ test_examples
 
 Unit tests for the example scripts.
 """
+from importlib.util import module_from_spec, spec_from_file_location
 from subprocess import run
 
+from imgwriter import info
+
 
 # Common test code.
 def compare_files(a, b):
@@ -93,6 +96,24 @@ def test_make_color_fade_r(tmp_path):
     compare_files(path, expected)
 
 
+def test_make_color_fade_too_large_for_mpeg(tmp_path, monkeypatch):
+    """When the resolution is too large for the MPEG codecs and no codec
+    is given, `make_color_fade.py` should save the video as FFV1 in an
+    `.avi` file instead.
+    """
+    spec = spec_from_file_location(
+        'make_color_fade', 'examples/make_color_fade.py'
+    )
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, 'MPEG_MAX_SIZE', 8)
+    path = tmp_path / 'spam.mp4'
+    module.main(str(path), (16, 8), (0, 0, 0), (0xff, 0xff, 0xff), 2, 12)
+    assert not path.exists()
+    meta = info(tmp_path / 'spam.avi')
+    assert (meta.width, meta.frames, meta.codec) == (16, 2, 'ffv1')
+
+
 # Tests for examples/make_space.py.
 def test_make_spacer(tmp_path):
     """When called with a file path, `make_spacer.py` should create
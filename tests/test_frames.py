@@ -0,0 +1,66 @@
+"""
+test_frames
+~~~~~~~~~~~
+
+Unit tests for the imgwriter.frames module.
+"""
+import numpy as np
+
+from imgwriter import frames as fr
+
+
+# Tests for solid.
+def test_solid():
+    """Given a resolution and a color, :func:`solid` should return an
+    RGB frame of unsigned 8-bit integers filled with that color.
+    """
+    a = fr.solid((4, 3), (0xc0, 0x56, 0x32))
+    assert a.shape == (3, 4, 3)
+    assert a.dtype == np.uint8
+    assert (a == [0xc0, 0x56, 0x32]).all()
+
+
+def test_solid_dtype():
+    """Given a data type, :func:`solid` should return a frame of that
+    data type. Given a single value, it should return a grayscale
+    frame.
+    """
+    a = fr.solid((4, 3), 0.5, dtype=np.float32)
+    assert a.shape == (3, 4)
+    assert a.dtype == np.float32
+    assert (a == 0.5).all()
+
+
+# Tests for fade.
+def test_fade():
+    """Given a resolution, two colors, and a number of frames,
+    :func:`fade` should yield RGB frames that move from the first
+    color towards the second.
+    """
+    frames = fr.fade((3, 2), (0x00, 0xff, 0x00), (0xff, 0x00, 0xff), 3)
+    result = np.array(list(frames))
+    assert result.shape == (3, 2, 3, 3)
+    assert result.dtype == np.uint8
+    assert (result[:, 0, 0] == [
+        [0x00, 0xff, 0x00],
+        [0x55, 0xaa, 0x55],
+        [0xaa, 0x55, 0xaa],
+    ]).all()
+    assert (result == result[:, :1, :1]).all()
+
+
+def test_fade_matches_full_array():
+    """The frames from :func:`fade` should have the same values as a
+    fade calculated over a full array of frame indices.
+    """
+    res, frames = (4, 3), 72
+    start_color, end_color = (0xff, 0x12, 0x00), (0x00, 0x9a, 0xff)
+    diff_inc = [-1 * (s - e) / frames for s, e in zip(start_color, end_color)]
+    expected = np.indices((frames, *res[::-1], 3), dtype=np.float32)[0]
+    for c in 0, 1, 2:
+        expected[:, :, :, c] *= diff_inc[c]
+        expected[:, :, :, c] += start_color[c]
+    expected = expected.astype(np.uint8)
+
+    result = np.array(list(fr.fade(res, start_color, end_color, frames)))
+    assert (result == expected).all()
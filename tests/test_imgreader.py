@@ -4,10 +4,19 @@ test_imgreader
 
 Unit tests for the imgwriter.imgreader module.
 """
+import os
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import replace
+from io import BytesIO
+
+import cv2
 import numpy as np
 import pytest as pt
 
 from imgwriter import imgreader as ir
+from imgwriter import imgwriter as iw
 
 
 # Fixtures.
@@ -29,6 +38,28 @@ def image_as_vid(request):
     return np.around(a, 2)
 
 
+@pt.fixture
+def series(tmp_path):
+    """Save a series of twelve grayscale images for testing."""
+    a = np.zeros((12, 2, 3), dtype=np.uint8)
+    for i in range(a.shape[0]):
+        a[i] = i * 0x10
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, a)
+    return path, a / 0xff
+
+
+@pt.fixture
+def small_video(tmp_path):
+    """Save a short video where each frame is a different color."""
+    a = np.zeros((20, 32, 48, 3), dtype=np.uint8)
+    for i in range(a.shape[0]):
+        a[i] = (i * 12, 0xff - i * 12, 0x80)
+    path = tmp_path / 'spam.mp4'
+    iw.write_video(path, a)
+    return path
+
+
 @pt.fixture
 def video_data():
     """An array of video data for testing."""
@@ -44,6 +75,70 @@ def video_data():
     yield a.astype(np.uint8)
 
 
+# Tests for info.
+@pt.mark.parametrize('name', [
+    '__test_save_rgb_image.jpg',
+    '__test_save_rgb_image.png',
+    '__test_save_rgb_image.tiff',
+    '__test_save_grayscale_image.jpg',
+    '__test_save_grayscale_image.png',
+    '__test_save_rgb_video_mp4v.mp4',
+])
+def test_info(name):
+    """Given the path to a file, :func:`info` should return the shape
+    of the data that would be read from the file.
+    """
+    path = f'tests/data/{name}'
+    result = ir.info(path)
+    a = ir.read(path)
+    assert result.shape == a.shape
+
+
+def test_info_video():
+    """Given the path to a video file, :func:`info` should return the
+    frame count and frame rate of the video.
+    """
+    result = ir.info('tests/data/__test_save_rgb_video_mp4v.mp4')
+    assert result.frames == 3
+    assert result.fps == 12.0
+    assert len(result.codec) == 4
+
+
+def test_info_png_alpha(tmp_path):
+    """Given the path to a 16-bit PNG with an alpha channel, :func:`info`
+    should return the number of channels and data type from the header.
+    """
+    path = tmp_path / 'spam.png'
+    cv2.imwrite(str(path), np.zeros((4, 5, 4), dtype=np.uint16))
+    result = ir.info(path)
+    assert (result.width, result.height) == (5, 4)
+    assert result.channels == 4
+    assert result.dtype == 'uint16'
+
+
+def test_info_file_changed(tmp_path):
+    """If the file changes, :func:`info` should not return the cached
+    information for the old file.
+    """
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, np.zeros((1, 2, 3, 3)))
+    assert ir.info(path).shape == (1, 2, 3, 3)
+    iw.write_image(path, np.zeros((1, 4, 5, 3)))
+    assert ir.info(path).shape == (1, 4, 5, 3)
+
+
+def test_info_file_does_not_exist():
+    """If given the path of a file that doesn't exist, :func:`info`
+    should raise a :class:`FileNotFoundError`.
+    """
+    path = 'tests/data/spam.jpg'
+    with pt.raises(
+        FileNotFoundError,
+        match=f'There is no file at {path}.'
+    ):
+        _ = ir.info(path)
+
+
 # Tests for load.
 def test_load_is_alias_for_read():
     """:func:`read` is an alias for :func:`save`."""
@@ -190,6 +285,27 @@ def test_read_color_mp4(video_data):
     assert (np.abs(a.astype(int) - video_data.astype(int)) <= 5).all()
 
 
+def test_read_fileobj_image():
+    """Given a file-like object with the name of an image file,
+    :func:`read` should return the contents of the image.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    with open(path, 'rb') as fh:
+        a = ir.read(fh)
+    assert (a == ir.read_image(path)).all()
+
+
+def test_read_fileobj_video():
+    """Given a file-like object without a name that contains a video,
+    :func:`read` should return the contents of the video.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    with open(path, 'rb') as fh:
+        fileobj = BytesIO(fh.read())
+    a = ir.read(fileobj)
+    assert (a == ir.read_video(path)).all()
+
+
 # Tests for read_image.
 @pt.mark.path('__test_save_rgb_image.jpg')
 def test_read_image_rgb_jpg_as_vid(image_as_vid):
@@ -241,6 +357,170 @@ def test_read_image_file_not_readablet():
         _ = ir.read_image(path)
 
 
+@pt.mark.parametrize('ext', ['jpg', 'png',])
+def test_read_image_scale(ext, tmp_path):
+    """Given a scale, :func:`read_image` should reduce the resolution
+    of the image by that amount.
+    """
+    path = tmp_path / f'spam.{ext}'
+    iw.write_image(path, np.full((1, 48, 64, 3), 0x80, dtype=np.uint8))
+    a = ir.read_image(path, scale=1 / 4)
+    assert a.shape == (1, 12, 16, 3)
+    assert (np.abs(a - 0x80 / 0xff) < .02).all()
+
+
+def test_read_image_scale_grayscale_jpg(tmp_path):
+    """Given a scale and a grayscale JPG, :func:`read_image` should
+    keep the image grayscale.
+    """
+    path = tmp_path / 'spam.jpg'
+    iw.write_image(path, np.full((1, 48, 64), 0x80, dtype=np.uint8))
+    a = ir.read_image(path, scale=1 / 8)
+    assert a.shape == (1, 6, 8)
+
+
+def test_read_image_scale_invalid():
+    """Given a scale that isn't supported, :func:`read_image` should
+    raise a :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_save_rgb_image.jpg'
+    with pt.raises(ValueError, match='The scale must be'):
+        _ = ir.read_image(path, scale=1 / 3)
+
+
+def test_read_image_out():
+    """Given an output array, :func:`read_image` should store the image
+    data in that array.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    out = np.zeros((1, 3, 3, 3))
+    a = ir.read_image(path, out=out)
+    assert a is out
+    assert (out == ir.read_image(path)).all()
+
+
+def test_read_image_out_invalid():
+    """Given an output array of the wrong shape, :func:`read_image`
+    should raise a :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    out = np.zeros((3, 3, 3))
+    with pt.raises(ValueError, match='The output array has shape'):
+        _ = ir.read_image(path, out=out)
+
+
+@pt.mark.parametrize('mode,shape', [
+    ('gray', (3, 3)),
+    ('rgb', (3, 3, 3)),
+    ('rgba', (3, 3, 4)),
+])
+def test_read_image_mode(mode, shape):
+    """Given a mode, :func:`read_image` should convert the image to
+    that color space.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    a = ir.read_image(path, as_video=False, mode=mode)
+    assert a.shape == shape
+    if mode == 'gray':
+        expected = cv2.imread(path, cv2.IMREAD_GRAYSCALE) / 0xff
+        assert (a == expected).all()
+    else:
+        expected = ir.read_image(path, as_video=False)
+        assert (a[..., :3] == expected).all()
+    if mode == 'rgba':
+        assert (a[..., 3] == 1).all()
+
+
+def test_read_image_mode_grayscale_as_rgb():
+    """Given a grayscale image and the rgb mode, :func:`read_image`
+    should return the same value in each color channel.
+    """
+    path = 'tests/data/__test_save_grayscale_image.png'
+    gray = ir.read_image(path, as_video=False)
+    a = ir.read_image(path, as_video=False, mode='rgb')
+    assert a.shape == (*gray.shape, 3)
+    for channel in range(3):
+        assert (a[..., channel] == gray).all()
+
+
+def test_read_image_mode_invalid():
+    """Given an unknown mode, :func:`read_image` should raise a
+    :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    with pt.raises(ValueError, match='The mode must be'):
+        _ = ir.read_image(path, mode='cmyk')
+
+
+def test_read_image_channels():
+    """Given channels, :func:`read_image` should return only those
+    color channels in that order.
+    """
+    path = 'tests/data/__test_save_rgb_image.png'
+    expected = ir.read_image(path, as_video=False)
+    a = ir.read_image(path, as_video=False, channels=[2, 0])
+    assert a.shape == (3, 3, 2)
+    assert (a == expected[..., [2, 0]]).all()
+
+
+@pt.mark.parametrize('channel,value', [(0, 0xff), (3, 0x80),])
+def test_read_image_channels_alpha(channel, value, tmp_path):
+    """Given channels and an image with an alpha channel,
+    :func:`read_image` should number the channels in RGBA order.
+    """
+    a = np.zeros((3, 3, 4), dtype=np.uint8)
+    a[..., 2] = 0xff
+    a[..., 3] = 0x80
+    path = tmp_path / 'spam.png'
+    cv2.imwrite(str(path), a)
+    result = ir.read_image(path, as_video=False, channels=[channel])
+    assert (result == value / 0xff).all()
+
+
+def test_read_image_channels_grayscale():
+    """Given channels and a grayscale image, :func:`read_image` should
+    raise a :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_save_grayscale_image.png'
+    with pt.raises(ValueError, match='Channels cannot be selected'):
+        _ = ir.read_image(path, channels=[0])
+
+
+# Tests for read_image_bytes.
+@pt.mark.parametrize('cls', [bytes, bytearray, memoryview,])
+def test_read_image_bytes(cls):
+    """Given the contents of an image file, :func:`read_image_bytes`
+    should return the same data as :func:`read_image`.
+    """
+    path = 'tests/data/__test_save_rgb_image.jpg'
+    with open(path, 'rb') as fh:
+        data = cls(fh.read())
+    a = ir.read_image_bytes(data, as_video=False)
+    assert (a == ir.read_image(path, as_video=False)).all()
+
+
+@pt.mark.parametrize('cls', [bytes, bytearray, memoryview,])
+def test_read_image_bytes_scale(cls, monkeypatch):
+    """Given a scale, :func:`read_image_bytes` should reduce the image
+    the same way as :func:`read_image`, reading the JPEG header from
+    the data without copying it into a file-like object.
+    """
+    path = 'tests/data/__test_make_spacer.jpg'
+    with open(path, 'rb') as fh:
+        data = cls(fh.read())
+    monkeypatch.setattr(ir, 'BytesIO', None)
+    a = ir.read_image_bytes(data, as_video=False, scale=1 / 2)
+    assert (a == ir.read_image(path, as_video=False, scale=1 / 2)).all()
+
+
+def test_read_image_bytes_not_readable():
+    """If given data that isn't a readable image, :func:`read_image_bytes`
+    should raise a :class:`ValueError` exception.
+    """
+    with pt.raises(ValueError, match='The data cannot be read.'):
+        _ = ir.read_image_bytes(b'spam')
+
+
 # Tests for read_video.
 def test_read_video_color_mp4(video_data):
     """Given a path to an MP4 file, :func:`read_video` should return the
@@ -255,3 +535,462 @@ def test_read_video_color_mp4(video_data):
     # `int` because `numpy.uint8` is unsigned, so any negative values
     # roll over.
     assert (np.abs(a.astype(int) - video_data.astype(int)) <= 5).all()
+
+
+def test_read_video_scale():
+    """Given a scale, :func:`read_video` should reduce the resolution
+    of each frame by that amount.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    a = ir.read_video(path, scale=1 / 2)
+    assert a.shape == (3, 240, 360, 3)
+
+
+@pt.mark.parametrize('scale', [1, 1 / 2,])
+def test_read_video_workers(scale):
+    """Given a number of workers, :func:`read_video` should decode the
+    video in parallel and return the same data as a serial read.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    expected = ir.read_video(path, scale=scale)
+    a = ir.read_video(path, scale=scale, workers=2)
+    assert a.shape == expected.shape
+    assert (a == expected).all()
+
+
+def test_read_video_out():
+    """Given an output array, :func:`read_video` should decode the
+    frames into that array.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    out = np.zeros((3, 480, 720, 3), dtype=np.uint8)
+    a = ir.read_video(path, out=out)
+    assert a is out
+    assert (out == ir.read_video(path)).all()
+
+
+@pt.mark.parametrize('shape,dtype,msg', [
+    ((3, 480, 720), np.uint8, 'The output array has shape'),
+    ((3, 480, 720, 3), float, 'The output array has shape'),
+    ((2, 480, 720, 3), np.uint8, 'has more frames than'),
+    ((4, 480, 720, 3), np.uint8, 'has fewer frames than'),
+])
+def test_read_video_out_invalid(shape, dtype, msg):
+    """Given an output array that doesn't match the video,
+    :func:`read_video` should raise a :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_save_rgb_video_mp4v.mp4'
+    out = np.zeros(shape, dtype=dtype)
+    with pt.raises(ValueError, match=msg):
+        _ = ir.read_video(path, out=out)
+
+
+def test_read_video_step(small_video):
+    """Given a step, :func:`read_video` should return every step-th
+    frame of the video.
+    """
+    expected = ir.read_video(small_video)[::3]
+    a = ir.read_video(small_video, step=3)
+    assert a.shape == expected.shape
+    assert (a == expected).all()
+
+
+def test_read_video_sample(small_video):
+    """Given a sample, :func:`read_video` should return that many
+    evenly spaced frames from the video.
+    """
+    expected = ir.read_video(small_video)[[0, 6, 13, 19]]
+    a = ir.read_video(small_video, sample=4)
+    assert (a == expected).all()
+
+
+def test_read_video_step_seek(small_video, monkeypatch):
+    """If the gap between frames is large, :func:`read_video` should
+    seek to the next frame and return the same frames.
+    """
+    expected = ir.read_video(small_video)[::7]
+    monkeypatch.setattr(ir, 'SEEK_THRESHOLD', 2)
+    a = ir.read_video(small_video, step=7)
+    assert (a == expected).all()
+
+
+def test_read_video_step_invalid(small_video):
+    """Given a step less than one, :func:`read_video` should raise a
+    :class:`ValueError` exception.
+    """
+    with pt.raises(ValueError, match='must be greater than zero'):
+        _ = ir.read_video(small_video, step=0)
+
+
+@pt.mark.parametrize('workers', [None, 2,])
+def test_read_video_mode(small_video, workers):
+    """Given a mode, :func:`read_video` should convert each frame from
+    BGR to that color space.
+    """
+    expected = ir.read_video(small_video)[..., ::-1]
+    a = ir.read_video(small_video, workers=workers, mode='rgb')
+    assert (a == expected).all()
+
+    a = ir.read_video(small_video, workers=workers, mode='rgba')
+    assert a.shape == (20, 32, 48, 4)
+    assert (a[..., :3] == expected).all()
+    assert (a[..., 3] == 0xff).all()
+
+    a = ir.read_video(small_video, workers=workers, mode='gray')
+    assert a.shape == (20, 32, 48)
+
+
+def test_read_video_channels(small_video):
+    """Given channels, :func:`read_video` should return only those
+    color channels in that order. The channels are numbered in RGB
+    order.
+    """
+    expected = ir.read_video(small_video)[..., ::-1]
+    a = ir.read_video(small_video, channels=[0])
+    assert a.shape == (20, 32, 48, 1)
+    assert (a == expected[..., [0]]).all()
+
+    a = ir.read_video(small_video, mode='rgba', channels=[3, 0])
+    assert (a[..., 0] == 0xff).all()
+    assert (a[..., 1] == expected[..., 0]).all()
+
+
+def test_read_video_channels_grayscale(small_video):
+    """Given channels and the gray mode, :func:`read_video` should
+    raise a :class:`ValueError` exception.
+    """
+    with pt.raises(ValueError, match='Channels cannot be selected'):
+        _ = ir.read_video(small_video, mode='gray', channels=[0])
+
+
+def test_read_video_max_memory(small_video):
+    """If the video is larger than the memory budget, :func:`read_video`
+    should raise a :class:`MemoryBudgetExceeded` exception before
+    decoding any frames.
+    """
+    with pt.raises(ir.MemoryBudgetExceeded, match='needs 92160 bytes'):
+        _ = ir.read_video(small_video, max_memory=2 ** 16)
+    a = ir.read_video(small_video, max_memory=2 ** 17)
+    assert a.shape == (20, 32, 48, 3)
+    a = ir.read_video(small_video, max_memory=2 ** 16, scale=1 / 2)
+    assert a.shape == (20, 16, 24, 3)
+
+
+def test_read_video_max_memory_extra_frames(small_video, monkeypatch):
+    """If the video has more frames than its container reports, the
+    frames past the count should still be checked against the memory
+    budget by :func:`read_video`.
+    """
+    meta = ir.info(small_video)
+    monkeypatch.setattr(ir, 'info', lambda path: replace(meta, frames=2))
+    with pt.raises(ir.MemoryBudgetExceeded, match='more frames than'):
+        _ = ir.read_video(small_video, max_memory=2 ** 14)
+    result = ir.read_video(small_video, max_memory=2 ** 14, lazy=True)
+    assert isinstance(result, ir.VideoStream)
+    a = ir.read_video(small_video, max_memory=2 ** 17)
+    assert a.shape == (20, 32, 48, 3)
+
+
+def test_read_video_max_memory_default(small_video, monkeypatch):
+    """If no memory budget is given, :func:`read_video` should use the
+    budget in :data:`MAX_MEMORY`.
+    """
+    monkeypatch.setattr(ir, 'MAX_MEMORY', 2 ** 16)
+    with pt.raises(MemoryError):
+        _ = ir.read(small_video)
+
+
+def test_read_video_max_memory_environment(small_video, monkeypatch):
+    """If no memory budget is given, :func:`read_video` should use the
+    budget in the `IMGWRITER_MAX_MEMORY` environment variable, and it
+    should raise a :class:`ValueError` if that isn't a number.
+    """
+    monkeypatch.setenv('IMGWRITER_MAX_MEMORY', str(2 ** 16))
+    with pt.raises(ir.MemoryBudgetExceeded):
+        _ = ir.read_video(small_video)
+    monkeypatch.setenv('IMGWRITER_MAX_MEMORY', 'spam')
+    with pt.raises(ValueError, match='IMGWRITER_MAX_MEMORY must be'):
+        _ = ir.read_video(small_video)
+
+
+def test_import_bad_max_memory_environment():
+    """A bad `IMGWRITER_MAX_MEMORY` environment variable shouldn't stop
+    :mod:`imgwriter` from being imported.
+    """
+    env = {**os.environ, 'IMGWRITER_MAX_MEMORY': 'spam'}
+    args = [sys.executable, '-c', 'import imgwriter']
+    result = subprocess.run(args, env=env)
+    assert result.returncode == 0
+
+
+def test_read_video_memory(small_video):
+    """:func:`read_video` should decode the frames straight into the
+    array it returns rather than copying them into it.
+    """
+    tracemalloc.start()
+    try:
+        a = ir.read_video(small_video)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 1.5 * a.nbytes
+
+
+def test_read_video_lazy(small_video):
+    """If the video is larger than the memory budget and `lazy` is set,
+    :func:`read_video` should return a :class:`VideoStream` with the
+    frames.
+    """
+    expected = ir.read_video(small_video, step=2)
+    stream = ir.read(small_video, max_memory=2 ** 10, lazy=True)
+    assert isinstance(stream, ir.VideoStream)
+    stream = ir.read_video(small_video, step=2, max_memory=2 ** 10, lazy=True)
+    assert stream.shape == expected.shape
+    assert len(stream) == 10
+    assert stream.nbytes == expected.nbytes
+    for frame, expected_frame in zip(stream, expected):
+        assert (frame == expected_frame).all()
+
+
+# Tests for iter_video.
+def test_iter_video(small_video):
+    """Given a path to a video, :func:`iter_video` should yield the
+    frames of the video one at a time.
+    """
+    expected = ir.read_video(small_video, mode='gray', sample=4)
+    frames = ir.iter_video(small_video, mode='gray', sample=4)
+    a = np.array(list(frames))
+    assert (a == expected).all()
+
+
+def test_iter_video_out(small_video):
+    """Given an output array, :func:`iter_video` should decode each
+    frame into that array.
+    """
+    expected = ir.read_video(small_video, scale=1 / 2, sample=4)
+    out = np.zeros(expected.shape[1:], dtype=np.uint8)
+    frames = ir.iter_video(small_video, scale=1 / 2, sample=4, out=out)
+    for frame, expected_frame in zip(frames, expected):
+        assert frame is out
+        assert (out == expected_frame).all()
+
+    stream = ir.VideoStream(small_video, scale=1 / 2, sample=4, out=out)
+    assert all(frame is out for frame in stream)
+
+
+def test_iter_video_out_invalid(small_video):
+    """If the output array can't hold a frame, :func:`iter_video` and
+    :class:`VideoStream` should raise a ValueError.
+    """
+    out = np.zeros((32, 48), dtype=np.uint8)
+    with pt.raises(ValueError, match='The output array has shape'):
+        _ = next(ir.iter_video(small_video, out=out))
+    with pt.raises(ValueError, match='The output array has shape'):
+        ir.VideoStream(small_video, out=out)
+
+
+# Tests for read_many.
+def test_read_many():
+    """Given a sequence of paths to image files, :func:`read_many`
+    should return the data from the images as a single
+    :class:`numpy.ndarray`.
+    """
+    paths = [
+        'tests/data/__test_save_rgb_image.png',
+        'tests/data/__test_save_rgb_image.tiff',
+        'tests/data/__test_save_rgb_image.jpg',
+    ]
+    a = ir.read_many(paths, workers=2)
+    assert a.shape == (3, 3, 3, 3)
+    for i, path in enumerate(paths):
+        assert (a[i] == ir.read_image(path, as_video=False)).all()
+
+
+def test_read_many_out():
+    """Given an output array, :func:`read_many` should store the image
+    data in that array.
+    """
+    paths = [
+        'tests/data/__test_save_rgb_image.png',
+        'tests/data/__test_save_rgb_image.tiff',
+    ]
+    out = np.zeros((2, 3, 3, 3))
+    a = ir.read_many(paths, out=out)
+    assert a is out
+    assert (out == ir.read_many(paths)).all()
+
+
+def test_read_many_different_shapes():
+    """If the images are different shapes, :func:`read_many` should
+    raise a :class:`ValueError` exception.
+    """
+    paths = [
+        'tests/data/__test_save_rgb_image.png',
+        'tests/data/__test_save_grayscale_image.png',
+    ]
+    with pt.raises(ValueError, match='has shape'):
+        _ = ir.read_many(paths)
+
+
+def test_read_many_file_does_not_exist():
+    """If given the path of a file that doesn't exist, :func:`read_many`
+    should raise a :class:`FileNotFoundError`.
+    """
+    path = 'tests/data/spam.jpg'
+    paths = ['tests/data/__test_save_rgb_image.png', path,]
+    with pt.raises(
+        FileNotFoundError,
+        match=f'There is no file at {path}.'
+    ):
+        _ = ir.read_many(paths)
+
+
+def test_read_many_file_not_readable():
+    """If given the path of a file that isn't a readable image,
+    :func:`read_many` should raise a :class:`ValueError` exception.
+    """
+    path = 'tests/data/__test_not_image.txt'
+    paths = ['tests/data/__test_save_rgb_image.png', path,]
+    with pt.raises(
+        ValueError,
+        match=f'The file at {path} cannot be read.'
+    ):
+        _ = ir.read_many(paths)
+
+
+# Tests for read_raw.
+def test_read_raw(tmp_path):
+    """Given the path to a `.npy` file, :func:`read` should return a
+    read-only memory map of the data exactly as it was saved.
+    """
+    a = np.random.default_rng(0).random((3, 4, 5, 3))
+    path = tmp_path / 'spam.npy'
+    iw.write(path, a)
+    result = ir.read(path)
+    assert isinstance(result, np.memmap)
+    assert not result.flags.writeable
+    assert result.dtype == a.dtype
+    assert (result == a).all()
+    assert isinstance(ir.read_raw(path, mmap=False), np.ndarray)
+    assert ir.info(path) == ir.Info(5, 4, 3, 'float64', 3)
+
+
+def test_read_raw_fileobj(tmp_path):
+    """Given a file-like object named as a `.npy` file, :func:`read`
+    should load the data from it.
+    """
+    a = np.arange(24, dtype=np.uint16).reshape((2, 3, 4))
+    path = tmp_path / 'spam.npy'
+    iw.write_raw(path, a)
+    with open(path, 'rb') as fh:
+        assert (ir.read(fh) == a).all()
+
+
+# Tests for read_y4m.
+@pt.mark.parametrize('codec', ['I420', 'I444',])
+def test_read_y4m(codec, tmp_path):
+    """Given a Y4M video, :func:`read_y4m` should return the frames in
+    the same color space as :func:`read_video`.
+    """
+    a = np.zeros((3, 16, 16, 3), dtype=np.uint8)
+    for i in range(3):
+        a[i, ..., i] = 0xc0
+    path = tmp_path / 'spam.y4m'
+    iw.write_video(path, a, codec=codec)
+    result = ir.read_y4m(path, mode='rgb')
+    assert result.shape == a.shape
+    assert (np.abs(result.astype(int) - a) <= 2).all()
+    expected = ir.read_video(path).astype(int)
+    assert (np.abs(ir.read_y4m(path) - expected) <= 3).all()
+
+
+def test_read_y4m_fileobj():
+    """Given a file-like object without a name that holds Y4M video,
+    :func:`read` should read the frames from it.
+    """
+    a = np.arange(128, dtype=np.uint8).reshape((2, 8, 8))
+    fh = BytesIO()
+    iw.write(fh, a)
+    fh.seek(0)
+    result = ir.read(fh)
+    assert result.shape == (2, 8, 8, 3)
+    assert (np.abs(result[..., 0].astype(int) - a) <= 1).all()
+
+
+def test_read_y4m_gray(tmp_path):
+    """Grayscale Y4M video should be read with the same values by
+    :func:`read_y4m` and :func:`read`, which reads through opencv.
+    """
+    a = np.zeros((2, 8, 8), dtype=np.uint8)
+    a[1] = 0xff
+    path = tmp_path / 'spam.y4m'
+    iw.write_video(path, a)
+    assert (ir.read_y4m(path, mode='gray') == a).all()
+    assert (ir.read(path)[..., 0] == a).all()
+
+
+def test_iter_y4m_pipe():
+    """:func:`iter_y4m` should read frames from a file-like object that
+    returns less data than is asked for, like a pipe.
+    """
+    class Pipe(BytesIO):
+        def readinto(self, b):
+            return super().readinto(b[:5])
+
+    fh = BytesIO()
+    iw.write(fh, np.full((2, 4, 4), 0x80, dtype=np.uint8))
+    frames = list(ir.iter_y4m(Pipe(fh.getvalue()), mode='gray'))
+    assert len(frames) == 2
+    assert (frames[1] == 0x80).all()
+
+
+@pt.mark.parametrize('data,msg', [
+    (b'spam\n', 'The data is not Y4M video.'),
+    (b'YUV4MPEG2 W2 H2 C422\n', 'with 422 chroma cannot be read'),
+    (b'YUV4MPEG2 W2 H2 C444\nFRAME\n\x00', 'ended in the middle'),
+])
+def test_read_y4m_invalid(data, msg):
+    """If the data isn't Y4M video that can be read, :func:`read_y4m`
+    should raise a :class:`ValueError` exception.
+    """
+    with pt.raises(ValueError, match=msg):
+        ir.read_y4m(BytesIO(data))
+
+
+# Tests for read_series.
+def test_read_series(series):
+    """Given the path used to save a series of images, :func:`read_series`
+    should return the data from the images in frame number order.
+    """
+    path, expected = series
+    a = ir.read_series(path)
+    assert (a == expected).all()
+
+
+def test_read_series_range(series):
+    """Given a start and a stop, :func:`read_series` should return
+    only the frames in that range.
+    """
+    path, expected = series
+    a = ir.read_series(path, start=2, stop=11)
+    assert (a == expected[2:11]).all()
+
+
+def test_read_series_single_frame(tmp_path):
+    """If the series only had one frame, :func:`read_series` should
+    read the file saved without a frame number.
+    """
+    expected = np.array([[[0., .5, 1.]]])
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, expected)
+    a = ir.read_series(path)
+    assert (np.around(a, 2) == expected).all()
+
+
+def test_read_series_no_frames(tmp_path):
+    """If there are no frames for the path, :func:`read_series` should
+    raise a :class:`FileNotFoundError`.
+    """
+    path = tmp_path / 'spam.png'
+    with pt.raises(FileNotFoundError, match='There are no frames for'):
+        _ = ir.read_series(path)
@@ -4,12 +4,24 @@ test_imgwriter
 
 Unit tests for the imgwriter.imgwriter module.
 """
+import tracemalloc
+from io import BytesIO
+
 import cv2
 import numpy as np
 import pytest as pt
 
 from imgwriter import imgwriter as iw
-from imgwriter.common import VALID_FORMATS, Image, Video
+from imgwriter.cache import FileCache
+from imgwriter.common import (
+    RESOLUTIONS,
+    VALID_FORMATS,
+    Image,
+    Target,
+    UnsupportedFileType,
+    Video
+)
+from imgwriter.imgreader import read_video
 
 
 # Tests for float_to_unt8.
@@ -409,7 +421,7 @@ def test_save_video_float_grayscale(tmp_path):
     vids = [vid for vid in VALID_FORMATS if isinstance(vid, Video)]
     for vid in vids:
         for codec in vid.codecs:
-            exp_name = f'__test_save_grayscale_video_{codec}.{vid.ext}'
+            exp_name = f'__test_save_grayscale_video_{codec.strip()}.{vid.ext}'
             save_video_test(a, vid.ext, codec, exp_name, tmp_path)
 
 
@@ -425,7 +437,7 @@ def test_save_video_8_bit_grayscale(tmp_path):
     vids = [vid for vid in VALID_FORMATS if isinstance(vid, Video)]
     for vid in vids:
         for codec in vid.codecs:
-            exp_name = f'__test_save_grayscale_video_{codec}.{vid.ext}'
+            exp_name = f'__test_save_grayscale_video_{codec.strip()}.{vid.ext}'
             save_video_test(a, vid.ext, codec, exp_name, tmp_path)
 
 
@@ -442,7 +454,7 @@ def test_save_video_float_rgb(tmp_path):
     vids = [vid for vid in VALID_FORMATS if isinstance(vid, Video)]
     for vid in vids:
         for codec in vid.codecs:
-            exp_name = f'__test_save_rgb_video_{codec}.{vid.ext}'
+            exp_name = f'__test_save_rgb_video_{codec.strip()}.{vid.ext}'
             save_video_test(a, vid.ext, codec, exp_name, tmp_path)
 
 
@@ -459,10 +471,555 @@ def test_save_video_8_bit_rgb(tmp_path):
     vids = [vid for vid in VALID_FORMATS if isinstance(vid, Video)]
     for vid in vids:
         for codec in vid.codecs:
-            exp_name = f'__test_save_rgb_video_{codec}.{vid.ext}'
+            exp_name = f'__test_save_rgb_video_{codec.strip()}.{vid.ext}'
             save_video_test(a, vid.ext, codec, exp_name, tmp_path)
 
 
+@pt.mark.parametrize('ext,codec', [('avi', 'FFV1'), ('mov', 'png '),])
+@pt.mark.parametrize('shape', [(5, 48, 64, 3), (5, 48, 64),])
+def test_write_video_lossless(ext, codec, shape, tmp_path):
+    """Given a lossless codec, the frames read back by :func:`read_video`
+    should be exactly the frames given to :func:`write_video`.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 0x100, shape, dtype=np.uint8)
+    path = tmp_path / f'spam.{ext}'
+    iw.write_video(path, a, 12, codec)
+    result = read_video(path)
+    if len(shape) == 4:
+        assert (result == a[..., ::-1]).all()
+    else:
+        assert (result == a[..., None]).all()
+
+
+def test_write_video_mjpg(tmp_path):
+    """Given the MJPG codec, every frame should be encoded on its own,
+    so the frames read back by :func:`read_video` should be close to
+    the frames given to :func:`write_video`.
+    """
+    a = np.zeros((5, 48, 64, 3), dtype=np.uint8)
+    for i in range(len(a)):
+        a[i, :, :, i % 3] = 0xff
+    path = tmp_path / 'spam.avi'
+    iw.write_video(path, a, 12, 'MJPG')
+    capture = cv2.VideoCapture(str(path))
+    fourcc = int(capture.get(cv2.CAP_PROP_FOURCC))
+    capture.release()
+    assert fourcc.to_bytes(4, 'little') == b'MJPG'
+    result = read_video(path)
+    assert (np.abs(result.astype(int) - a[..., ::-1]) <= 8).all()
+
+
+# Tests for write_spacer.
+@pt.mark.parametrize('ext', ['jpg', 'png',])
+def test_write_spacer(ext, tmp_path):
+    """Given a file path, a resolution, and a color, :func:`write_spacer`
+    should save an image that is the same as saving an array of that
+    color.
+    """
+    a = np.zeros((1, 9, 16, 3), dtype=np.uint8)
+    a[..., :] = (0xc0, 0x56, 0x32)
+    expected = tmp_path / f'expected.{ext}'
+    iw.write_image(expected, a)
+    path = tmp_path / f'spam.{ext}'
+    iw.write_spacer(path, (16, 9), (0xc0, 0x56, 0x32))
+    assert path.read_bytes() == expected.read_bytes()
+
+
+def test_write_spacer_cached(tmp_path, monkeypatch):
+    """Given a :class:`FileCache`, :func:`write_spacer` should only
+    encode the image the first time a spacer is requested.
+    """
+    cache = FileCache(tmp_path / 'cache')
+    iw.write_spacer(tmp_path / 'spam.jpg', (16, 9), cache=cache)
+
+    def imwrite(*args, **kwargs):
+        raise AssertionError('Image was encoded.')
+    monkeypatch.setattr(iw.cv2, 'imwrite', imwrite)
+    path = tmp_path / 'eggs.jpg'
+    iw.write_spacer(path, (16, 9), cache=cache)
+    assert path.read_bytes() == (tmp_path / 'spam.jpg').read_bytes()
+    with pt.raises(AssertionError, match='Image was encoded.'):
+        iw.write_spacer(tmp_path / 'bacon.png', (16, 9), cache=cache)
+
+
+# Tests for open_writer.
+@pt.mark.parametrize('ext,cls', [
+    ('png', iw.SeriesWriter),
+    ('mp4', iw.VideoWriter),
+])
+def test_open_writer(ext, cls, tmp_path):
+    """Given a file path, :func:`open_writer` should return the writer
+    for the type of the file.
+    """
+    assert isinstance(iw.open_writer(tmp_path / f'spam.{ext}'), cls)
+
+
+def test_open_writer_unsupported(tmp_path):
+    """Given a file type that isn't supported, :func:`open_writer` should
+    raise an :class:`UnsupportedFileType` exception.
+    """
+    with pt.raises(UnsupportedFileType):
+        _ = iw.open_writer(tmp_path / 'spam.txt')
+
+
+def test_serieswriter(tmp_path):
+    """:class:`SeriesWriter` should save each frame as an image named
+    the same way :func:`write_image` names a series.
+    """
+    a = np.zeros((3, 4, 5, 3), dtype=np.uint8)
+    a[1] = 0x80
+    iw.write_image(tmp_path / 'expected.png', a)
+    with iw.SeriesWriter(tmp_path / 'spam.png') as writer:
+        for frame in a:
+            writer.write(frame)
+    for i in range(3):
+        result = (tmp_path / f'spam_{i}.png').read_bytes()
+        assert result == (tmp_path / f'expected_{i}.png').read_bytes()
+
+
+# Tests for write_frames.
+@pt.mark.parametrize('shape,dtype,value', [
+    ((3, 48, 64, 3), np.uint8, 0xff),
+    ((3, 48, 64, 3), float, 1.0),
+    ((3, 48, 64), np.uint8, 0xff),
+])
+def test_write_frames(shape, dtype, value, tmp_path):
+    """Given an iterable of frames, :func:`write_frames` should save
+    a video with the same frames :func:`write_video` would save.
+    """
+    a = np.zeros(shape, dtype=dtype)
+    a[1] = value / 2
+    a[2, ..., 0] = value
+    expected_path = tmp_path / 'expected.mp4'
+    iw.write_video(expected_path, a)
+    path = tmp_path / 'spam.mp4'
+    iw.write_frames(path, iter(a))
+
+    capture = cv2.VideoCapture(str(path))
+    expected_capture = cv2.VideoCapture(str(expected_path))
+    for _ in range(shape[0]):
+        _, frame = capture.read()
+        _, expected = expected_capture.read()
+        assert (frame == expected).all()
+    assert not capture.read()[0]
+
+
+def test_videowriter_frame_shape_changes(tmp_path):
+    """If a frame is a different shape than the first frame,
+    :meth:`VideoWriter.write` should raise a :class:`ValueError`
+    exception.
+    """
+    with iw.VideoWriter(tmp_path / 'spam.mp4') as writer:
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        with pt.raises(ValueError, match='The frame has shape'):
+            writer.write(np.zeros((48, 32, 3), dtype=np.uint8))
+    assert writer.frames == 1
+
+
+@pt.mark.parametrize('codec,ext', [('mp4v', 'mp4'), ('avc1', 'mp4'),])
+def test_write_frames_too_large_for_codec(codec, ext, tmp_path):
+    """If the frames are too large for the codec, :func:`write_frames`
+    should raise a :class:`ValueError` exception that names a codec
+    that can save them.
+    """
+    frames = [np.zeros((16, 8192, 3), dtype=np.uint8)]
+    with pt.raises(ValueError, match='need a codec like FFV1 or MJPG'):
+        iw.write_frames(tmp_path / f'spam.{ext}', frames, codec=codec)
+
+
+def test_write_video_codec_cannot_open(tmp_path):
+    """If opencv can't encode the video with the codec,
+    :func:`write_video` should raise a :class:`ValueError` exception
+    rather than saving nothing.
+    """
+    a = np.zeros((1, 16, 16, 3), dtype=np.uint8)
+    with pt.raises(ValueError, match='with the spam codec'):
+        iw.write_video(tmp_path / 'spam.mp4', a, codec='spam')
+
+
+@pt.mark.parametrize('codec', ['FFV1', 'MJPG',])
+def test_write_video_16k_width(codec, tmp_path):
+    """Given a codec named by the error for frames too large for the
+    MPEG codecs, :func:`write_video` should save frames as wide as the
+    16k resolution.
+    """
+    width, _ = RESOLUTIONS['16k']
+    a = np.zeros((1, 16, width, 3), dtype=np.uint8)
+    path = tmp_path / 'spam.avi'
+    iw.write_video(path, a, 12, codec)
+    assert read_video(path).shape == (1, 16, width, 3)
+
+
+# Tests for resizing while saving.
+def test_write_image_resolution(tmp_path):
+    """Given a resolution, :func:`write_image` should shrink the image
+    with area interpolation before saving it.
+    """
+    a = np.random.default_rng(0).integers(0, 0x100, (48, 64, 3), np.uint8)
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, a, as_series=False, resolution=(32, 24))
+    expected = cv2.resize(a, (32, 24), interpolation=cv2.INTER_AREA)
+    assert (cv2.imread(str(path))[..., ::-1] == expected).all()
+
+
+def test_write_image_resolution_float_series(tmp_path):
+    """Given a resolution and interpolation, :func:`write_image` should
+    resize each image of a series of float data.
+    """
+    a = np.zeros((2, 9, 16), dtype=float)
+    a[1] = 1.0
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, a, resolution='720p', interpolation='cubic')
+    for i, value in enumerate((0x00, 0xff)):
+        result = cv2.imread(str(tmp_path / f'spam_{i}.png'), 0)
+        assert result.shape == (720, 1280)
+        assert (result == value).all()
+
+
+def test_write_image_interpolation_without_resolution(tmp_path):
+    """Given an interpolation without a resolution, :func:`write_image`
+    should raise a :class:`ValueError` exception.
+    """
+    a = np.zeros((48, 64, 3), dtype=np.uint8)
+    with pt.raises(ValueError, match='only be given with a resolution'):
+        iw.write_image(tmp_path / 'spam.png', a, interpolation='cubic')
+
+
+def test_write_video_resolution(tmp_path):
+    """Given a resolution, :func:`write_video` should resize the frames
+    before saving them.
+    """
+    a = np.zeros((3, 48, 64, 3), dtype=np.uint8)
+    path = tmp_path / 'spam.mp4'
+    iw.write_video(path, a, resolution=(32, 16))
+    capture = cv2.VideoCapture(str(path))
+    assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == 32
+    assert capture.get(cv2.CAP_PROP_FRAME_HEIGHT) == 16
+    capture.release()
+
+
+@pt.mark.parametrize('kwargs,msg', [
+    ({'resolution': 'spam'}, 'There is no resolution named spam.'),
+    (
+        {'resolution': (8, 8), 'interpolation': 'spam'},
+        'There is no interpolation named spam.'
+    ),
+])
+def test_write_image_resolution_invalid(kwargs, msg, tmp_path):
+    """If given an unknown resolution or interpolation, :func:`write_image`
+    should raise a :class:`ValueError` exception.
+    """
+    a = np.zeros((1, 9, 16, 3), dtype=np.uint8)
+    with pt.raises(ValueError, match=msg):
+        iw.write_image(tmp_path / 'spam.png', a, **kwargs)
+
+
+# Tests for conditioning a chunk at a time.
+@pt.mark.parametrize('resolution', [None, (32, 24),])
+def test_write_image_max_memory(resolution, tmp_path):
+    """Given a memory budget, :func:`write_image` should save the same
+    images it saves when the whole series is conditioned at once.
+    """
+    a = np.random.default_rng(0).random((5, 48, 64, 3))
+    iw.write_image(tmp_path / 'spam.png', a, resolution=resolution)
+    iw.write_image(
+        tmp_path / 'eggs.png', a, resolution=resolution, max_memory=1
+    )
+    for i in range(len(a)):
+        expected = cv2.imread(str(tmp_path / f'spam_{i}.png'))
+        result = cv2.imread(str(tmp_path / f'eggs_{i}.png'))
+        assert (result == expected).all()
+
+
+def test_write_video_max_memory(tmp_path):
+    """Given a memory budget, :func:`write_video` should only convert
+    the frames a chunk at a time, rather than making a converted copy
+    of the whole video.
+    """
+    a = np.random.default_rng(0).random((20, 48, 64, 3))
+    tracemalloc.start()
+    try:
+        iw.write_video(tmp_path / 'spam.avi', a, 12, 'FFV1', max_memory=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 4 * a[0].nbytes
+    result = read_video(tmp_path / 'spam.avi')
+    assert (result == (a * 0xff).astype(np.uint8)[..., ::-1]).all()
+
+
+def test_write_video_max_memory_out_of_range(tmp_path):
+    """If a frame in the series is out of range, :func:`write_video`
+    should raise a :class:`ValueError` before saving any frames.
+    """
+    a = np.zeros((3, 48, 64, 3), dtype=float)
+    a[2, 0, 0, 0] = 2.0
+    path = tmp_path / 'spam.avi'
+    with pt.raises(ValueError, match='Array values must be'):
+        iw.write_video(path, a, 12, 'FFV1', max_memory=1)
+    assert not path.exists()
+
+
+# Tests for write_many.
+def test_write_many(tmp_path):
+    """Given frames and targets, :func:`write_many` should save the
+    frames to each target at its resolution, and save only the chosen
+    frame for a poster image.
+    """
+    a = np.zeros((4, 48, 64, 3), dtype=float)
+    for i in range(len(a)):
+        a[i, ..., 0] = i / 4
+    iw.write_many(a, [
+        tmp_path / 'master.mp4',
+        {'filepath': tmp_path / 'proxy.mp4', 'resolution': (32, 24)},
+        Target(tmp_path / 'poster.png', resolution=(16, 12), frame=2),
+    ])
+
+    for name, size in (('master', (64, 48)), ('proxy', (32, 24))):
+        capture = cv2.VideoCapture(str(tmp_path / f'{name}.mp4'))
+        assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == size[0]
+        assert capture.get(cv2.CAP_PROP_FRAME_HEIGHT) == size[1]
+        assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == 4
+        capture.release()
+
+    poster = cv2.imread(str(tmp_path / 'poster.png'))
+    assert poster.shape == (12, 16, 3)
+    assert (poster == (0, 0, 0x7f)).all()
+    assert not list(tmp_path.glob('poster_*.png'))
+
+
+def test_write_many_generator(tmp_path):
+    """Given a generator of frames, :func:`write_many` should save the
+    frames as they are taken from it.
+    """
+    frames = (np.full((8, 8), i, dtype=np.uint8) for i in range(3))
+    iw.write_many(frames, [tmp_path / 'spam.png'])
+    for i in range(3):
+        result = cv2.imread(str(tmp_path / f'spam_{i}.png'), 0)
+        assert (result == i).all()
+
+
+@pt.mark.parametrize('target,msg', [
+    (Target('spam.png', frame=5), 'There is no frame 5'),
+    (Target('spam.png', interpolation='spam'), 'no interpolation named'),
+    (Target('spam.png', interpolation='area'), 'with a resolution'),
+])
+def test_write_many_invalid(target, msg, tmp_path, monkeypatch):
+    """If a target can't be saved, :func:`write_many` should raise a
+    :class:`ValueError` exception.
+    """
+    monkeypatch.chdir(tmp_path)
+    a = np.zeros((2, 8, 8), dtype=np.uint8)
+    with pt.raises(ValueError, match=msg):
+        iw.write_many(a, [target])
+
+
+# Tests for skipping unchanged data.
+def test_write_image_skip_if_unchanged(tmp_path, monkeypatch):
+    """When `skip_if_unchanged` is set, :func:`write_image` should only
+    save the images in a series whose data changed.
+    """
+    a = np.zeros((3, 8, 8, 3), dtype=np.uint8)
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, a, skip_if_unchanged=True)
+    assert (tmp_path / '.spam.png.crc').exists()
+
+    saved = []
+    imwrite = cv2.imwrite
+
+    def record(filepath, frame):
+        saved.append(filepath)
+        return imwrite(filepath, frame)
+    monkeypatch.setattr(iw.cv2, 'imwrite', record)
+    iw.write_image(path, a, skip_if_unchanged=True)
+    assert saved == []
+
+    a[1] = 0xff
+    (tmp_path / 'spam_2.png').unlink()
+    iw.write_image(path, a, skip_if_unchanged=True)
+    assert saved == [str(tmp_path / f'spam_{i}.png') for i in (1, 2)]
+    assert (cv2.imread(saved[0]) == 0xff).all()
+
+
+def test_write_video_skip_if_unchanged(tmp_path, monkeypatch):
+    """When `skip_if_unchanged` is set, :func:`write` should not encode
+    a video again unless its data or settings changed.
+    """
+    a = np.zeros((3, 8, 8, 3), dtype=float)
+    path = tmp_path / 'spam.mp4'
+    iw.write(path, a, skip_if_unchanged=True)
+
+    opened = []
+    videowriter = cv2.VideoWriter
+
+    def record(*args):
+        opened.append(args)
+        return videowriter(*args)
+    monkeypatch.setattr(iw.cv2, 'VideoWriter', record)
+    iw.write(path, a, skip_if_unchanged=True)
+    assert opened == []
+    iw.write(path, a, framerate=24, skip_if_unchanged=True)
+    assert len(opened) == 1
+    a[0] = 0.5
+    iw.write(path, a, framerate=24, skip_if_unchanged=True)
+    assert len(opened) == 2
+
+
+def test_write_image_skip_if_unchanged_after_other_write(tmp_path):
+    """If the image was saved again without `skip_if_unchanged`,
+    :func:`write` should save the data again rather than skipping it.
+    """
+    a = np.zeros((8, 8, 3), dtype=np.uint8)
+    b = np.full((8, 8, 3), 0xff, dtype=np.uint8)
+    path = tmp_path / 'spam.png'
+    iw.write(path, a, as_series=False, skip_if_unchanged=True)
+    iw.write(path, b, as_series=False)
+    iw.write(path, a, as_series=False, skip_if_unchanged=True)
+    assert (cv2.imread(str(path)) == 0x00).all()
+
+
+def test_write_video_skip_if_unchanged_after_other_write(tmp_path):
+    """If the video was saved again without `skip_if_unchanged`,
+    :func:`write` should save the data again rather than skipping it.
+    """
+    a = np.zeros((2, 8, 8, 3), dtype=np.uint8)
+    b = np.full((2, 8, 8, 3), 0xff, dtype=np.uint8)
+    path = tmp_path / 'spam.avi'
+    iw.write(path, a, codec='FFV1', skip_if_unchanged=True)
+    iw.write(path, b, codec='FFV1')
+    iw.write(path, a, codec='FFV1', skip_if_unchanged=True)
+    assert (read_video(path) == 0x00).all()
+
+
+def test_write_raw_skip_if_unchanged(tmp_path, monkeypatch):
+    """When `skip_if_unchanged` is set, :func:`write` should not save
+    a `.npy` file again unless its data changed.
+    """
+    a = np.zeros((3, 8, 8), dtype=np.float32)
+    path = tmp_path / 'spam.npy'
+    iw.write(path, a, skip_if_unchanged=True)
+
+    saved = []
+    save = np.save
+
+    def record(*args, **kwargs):
+        saved.append(args)
+        return save(*args, **kwargs)
+    monkeypatch.setattr(iw.np, 'save', record)
+    iw.write(path, a, skip_if_unchanged=True)
+    assert saved == []
+    a[0] = 0.5
+    iw.write(path, a, skip_if_unchanged=True)
+    assert len(saved) == 1
+    assert (np.load(path) == a).all()
+
+
+def test_write_video_skip_if_unchanged_conditions_once(tmp_path, monkeypatch):
+    """When the video has to be encoded, :func:`write_video` should
+    hash the frames as they are encoded, so they are only conditioned
+    once.
+    """
+    calls = []
+    condition = iw._ConditionedFrames._condition
+
+    def record(self, chunk):
+        calls.append(len(chunk))
+        return condition(self, chunk)
+    monkeypatch.setattr(iw._ConditionedFrames, '_condition', record)
+    a = np.zeros((3, 8, 8, 3), dtype=float)
+    path = tmp_path / 'spam.avi'
+    iw.write_video(path, a, 12, 'FFV1', skip_if_unchanged=True, max_memory=1)
+    assert calls == [1, 1, 1]
+    assert (tmp_path / '.spam.avi.crc').exists()
+
+
+# Tests for RawWriter.
+def test_rawwriter(tmp_path):
+    """:class:`RawWriter` should save frames to a `.npy` file exactly as
+    they are given, one at a time.
+    """
+    a = np.random.default_rng(0).random((3, 4, 5, 3)).astype(np.float32)
+    path = tmp_path / 'spam.npy'
+    with iw.open_writer(path) as writer:
+        assert isinstance(writer, iw.RawWriter)
+        for frame in a:
+            writer.write(frame[::-1])
+    result = np.load(path)
+    assert result.dtype == a.dtype
+    assert (result == a[:, ::-1]).all()
+
+
+def test_rawwriter_frame_changes(tmp_path):
+    """If a frame is a different shape or type than the first frame,
+    :meth:`RawWriter.write` should raise a :class:`ValueError` exception.
+    """
+    with iw.RawWriter(tmp_path / 'spam.npy') as writer:
+        writer.write(np.zeros((4, 4), dtype=np.uint8))
+        with pt.raises(ValueError, match='The frame has shape'):
+            writer.write(np.zeros((4, 4), dtype=float))
+    assert np.load(tmp_path / 'spam.npy').shape == (1, 4, 4)
+
+
+def test_write_many_raw(tmp_path):
+    """:func:`write_many` should save frames to a `.npy` target without
+    conditioning them.
+    """
+    a = np.linspace(0, 1, 48).reshape((2, 4, 2, 3))
+    iw.write_many(a, [tmp_path / 'spam.npy', tmp_path / 'spam.png'])
+    assert (np.load(tmp_path / 'spam.npy') == a).all()
+
+
+# Tests for Y4MWriter.
+@pt.mark.parametrize('codec,chroma,size', [
+    ('I420', b'C420jpeg', 48 * 64 * 3 // 2),
+    ('I444', b'C444', 48 * 64 * 3),
+    ('mp4v', b'C420jpeg', 48 * 64 * 3 // 2),
+])
+def test_write_video_y4m(codec, chroma, size, tmp_path):
+    """Given a path ending in `.y4m`, :func:`write_video` should save the
+    frames as uncompressed YUV with the codec's chroma subsampling.
+    """
+    a = np.zeros((2, 48, 64, 3), dtype=np.uint8)
+    a[..., 0] = 0xff
+    path = tmp_path / 'spam.y4m'
+    iw.write_video(path, a, 24, codec)
+    data = path.read_bytes()
+    header, _, frames = data.partition(b'\n')
+    assert header == b'YUV4MPEG2 W64 H48 F24:1 Ip A1:1 ' + chroma
+    assert len(frames) == 2 * (len(b'FRAME\n') + size)
+    assert all(abs(y - 82) <= 1 for y in frames[6:9])
+
+    capture = cv2.VideoCapture(str(path))
+    _, frame = capture.read()
+    capture.release()
+    assert (np.abs(frame.astype(int) - (0, 0, 0xff)) <= 2).all()
+
+
+def test_write_y4m_fileobj():
+    """Given a binary file-like object, :func:`write` should save the
+    frames to it as Y4M video, writing grayscale data as luma only.
+    """
+    a = np.zeros((3, 8, 8), dtype=float)
+    a[1] = 1.0
+    fh = BytesIO()
+    iw.write(fh, a, framerate=30000 / 1001)
+    header, *frames = fh.getvalue().split(b'FRAME\n')
+    assert header == b'YUV4MPEG2 W8 H8 F30000:1001 Ip A1:1 Cmono\n'
+    assert frames == [bytes(64), bytes([0xff] * 64), bytes(64)]
+    assert not fh.closed
+
+
+def test_y4mwriter_odd_size(tmp_path):
+    """If 4:2:0 video has an odd width or height, :meth:`Y4MWriter.write`
+    should raise a :class:`ValueError` exception.
+    """
+    with iw.open_writer(tmp_path / 'spam.y4m') as writer:
+        assert isinstance(writer, iw.Y4MWriter)
+        with pt.raises(ValueError, match='needs an even width and height'):
+            writer.write(np.zeros((9, 16, 3), dtype=np.uint8))
+
+
 # Tests for write.
 def test_write_is_alias_for_save():
     """:func:`write` is an alias for :func:`save`."""
@@ -0,0 +1,266 @@
+"""
+test_pipeline
+~~~~~~~~~~~~~
+
+Unit tests for the imgwriter.pipeline module.
+"""
+import multiprocessing
+from dataclasses import replace
+from io import BytesIO
+
+import numpy as np
+import pytest as pt
+
+from imgwriter import imgreader as ir
+from imgwriter import imgwriter as iw
+from imgwriter import pipeline as pl
+from imgwriter.common import UnsupportedFileType
+
+
+# Frame functions for map_frames. These are defined at the module
+# level so they can be sent to other processes.
+def invert(frame):
+    """Invert the colors of a frame."""
+    return 0xff - frame
+
+
+def luminance(frame):
+    """Convert a frame to grayscale floats."""
+    return frame.mean(-1) / 0xff
+
+
+def fail_on_fifth_frame(frame):
+    """Raise an exception for the frame that is mostly blue."""
+    if frame[0, 0, 0] > 40:
+        raise RuntimeError('Spam.')
+    return frame
+
+
+def change_shape(frame):
+    """Return a differently shaped result after the first frame."""
+    return frame[:8] if frame[0, 0, 0] else frame
+
+
+# Fixtures.
+@pt.fixture
+def small_video(tmp_path):
+    """Save a short video where each frame is a different color."""
+    a = np.zeros((20, 32, 48, 3), dtype=np.uint8)
+    for i in range(a.shape[0]):
+        a[i] = (i * 12, 0xff - i * 12, 0x80)
+    path = tmp_path / 'spam.mp4'
+    iw.write_video(path, a)
+    return path
+
+
+# Tests for iter_frames.
+def test_iter_frames_video(small_video):
+    """Given the path to a video, :func:`iter_frames` should yield the
+    frames of the video in RGB order.
+    """
+    expected = ir.read_video(small_video, mode='rgb')
+    a = np.array(list(pl.iter_frames(small_video)))
+    assert (a == expected).all()
+
+
+def test_iter_frames_range(small_video):
+    """Given a start, stop, and step, :func:`iter_frames` should only
+    yield those frames.
+    """
+    expected = ir.read_video(small_video, mode='rgb')[3:15:4]
+    a = np.array(list(pl.iter_frames(small_video, 3, 15, 4)))
+    assert (a == expected).all()
+
+
+def test_iter_frames_series(tmp_path):
+    """Given the path to an image series, :func:`iter_frames` should
+    yield the images as unsigned 8-bit integers.
+    """
+    a = np.zeros((3, 4, 5, 3), dtype=np.uint8)
+    a[1] = 0x80
+    a[2, ..., 0] = 0xff
+    path = tmp_path / 'spam.png'
+    iw.write_image(path, a)
+    assert (np.array(list(pl.iter_frames(path))) == a).all()
+
+
+def test_iter_frames_raw_scale(tmp_path):
+    """When a `.npy` file is read at a reduced scale,
+    :func:`iter_frames` should round the size of the frames up, the
+    same way video frames are.
+    """
+    a = np.zeros((2, 7, 5, 3), dtype=np.uint8)
+    path = tmp_path / 'spam.npy'
+    iw.write_raw(path, a)
+    frames = list(pl.iter_frames(path, scale=1 / 2))
+    assert [frame.shape for frame in frames] == [(4, 3, 3)] * 2
+
+
+def test_iter_frames_unsupported():
+    """Given a file type that isn't supported, :func:`iter_frames`
+    should raise a :class:`UnsupportedFileType` exception.
+    """
+    with pt.raises(UnsupportedFileType):
+        _ = list(pl.iter_frames('tests/data/__test_not_image.txt'))
+
+
+# Tests for map_frames.
+@pt.mark.parametrize('workers', [1, 2,])
+def test_map_frames(small_video, workers, tmp_path):
+    """Given a source, a destination, and a function, :func:`map_frames`
+    should save the result of applying the function to each frame in
+    order.
+    """
+    path = tmp_path / 'eggs.png'
+    n = pl.map_frames(small_video, path, invert, workers=workers, buffer=3)
+    assert n == 20
+    expected = 0xff - ir.read_video(small_video, mode='rgb')
+    assert (np.around(ir.read_series(path) * 0xff) == expected).all()
+
+
+def test_map_frames_result_dtype(small_video, tmp_path):
+    """The results of the function given to :func:`map_frames` can be
+    a different shape and data type than the frames.
+    """
+    path = tmp_path / 'eggs.png'
+    pl.map_frames(small_video, path, luminance, workers=2, stop=4)
+    a = ir.read_series(path)
+    assert a.shape == (4, 32, 48)
+    expected = ir.read_video(small_video, mode='rgb')[:4].mean(-1)
+    assert (np.abs(a * 0xff - expected) <= 1).all()
+
+
+def test_map_frames_error(small_video, tmp_path):
+    """If the function raises an exception in a worker, :func:`map_frames`
+    should raise the exception.
+    """
+    path = tmp_path / 'eggs.mp4'
+    with pt.raises(RuntimeError, match='Spam.'):
+        pl.map_frames(small_video, path, fail_on_fifth_frame, workers=2)
+
+
+def test_map_frames_result_shape_changes(small_video, tmp_path):
+    """If the function returns a result with a different shape than the
+    first result, :func:`map_frames` should raise a :class:`ValueError`
+    exception.
+    """
+    path = tmp_path / 'eggs.mp4'
+    with pt.raises(ValueError, match='but the first frame returned'):
+        pl.map_frames(small_video, path, change_shape, workers=2)
+
+
+def test_map_frames_starts_pool_before_prefetch(
+    small_video, tmp_path, monkeypatch
+):
+    """:func:`map_frames` should start the processes in the pool before
+    the thread that decodes the frames, so the processes don't fork
+    while that thread holds locks.
+    """
+    children = []
+    prefetch = pl._prefetch
+
+    def record(items):
+        children.append(len(multiprocessing.active_children()))
+        return prefetch(items)
+    monkeypatch.setattr(pl, '_prefetch', record)
+    pl.map_frames(small_video, tmp_path / 'eggs.png', invert, workers=2)
+    assert children == [2]
+
+
+# Tests for transcode.
+def test_transcode_video_to_series(small_video, tmp_path):
+    """Given a video and an image path, :func:`transcode` should save
+    the frames of the video as a series of images.
+    """
+    path = tmp_path / 'eggs.png'
+    assert pl.transcode(small_video, path, stop=5) == 5
+    expected = ir.read_video(small_video, mode='rgb')[:5]
+    assert (ir.read_series(path) * 0xff == expected).all()
+
+
+def test_transcode_series_to_video(small_video, tmp_path):
+    """Given an image series and a video path, :func:`transcode` should
+    save the images as a video with the given frame rate.
+    """
+    series = tmp_path / 'eggs.png'
+    pl.transcode(small_video, series)
+    path = tmp_path / 'bacon.mp4'
+    assert pl.transcode(series, path, framerate=24) == 20
+    meta = ir.info(path)
+    assert (meta.frames, meta.fps) == (20, 24)
+
+
+def test_transcode_video_framerate(small_video, tmp_path):
+    """When converting a video with a step, :func:`transcode` should
+    divide the frame rate by the step by default.
+    """
+    path = tmp_path / 'eggs.mp4'
+    assert pl.transcode(small_video, path, step=2, scale=1 / 2) == 10
+    meta = ir.info(path)
+    assert (meta.width, meta.height, meta.fps) == (24, 16, 6)
+
+
+def test_transcode_unknown_framerate(small_video, tmp_path, monkeypatch):
+    """If the frame rate of the source video isn't known and isn't
+    given, :func:`transcode` should raise a ValueError.
+    """
+    meta = replace(ir.info(small_video), fps=None)
+    monkeypatch.setattr(pl, 'info', lambda path: meta)
+    with pt.raises(ValueError, match='framerate must be given'):
+        pl.transcode(small_video, tmp_path / 'eggs.mp4')
+
+
+def test_transcode_single_frame(small_video, tmp_path):
+    """If only one frame is converted to an image, :func:`transcode`
+    should save it without a frame number.
+    """
+    path = tmp_path / 'eggs.png'
+    assert pl.transcode(small_video, path, start=7, stop=8) == 1
+    assert [p.name for p in tmp_path.glob('eggs*')] == ['eggs.png']
+
+
+def test_transcode_decode_error(small_video, tmp_path):
+    """If decoding fails, :func:`transcode` should raise the exception
+    from the decoding thread.
+    """
+    with pt.raises(ValueError, match='The scale must be'):
+        pl.transcode(small_video, tmp_path / 'eggs.mp4', scale=1 / 3)
+
+
+def test_transcode_y4m_pipe(small_video, tmp_path):
+    """Given file-like objects, :func:`transcode` should write and read
+    Y4M video, so it can be used with pipes.
+    """
+    fh = BytesIO()
+    assert pl.transcode(small_video, fh, stop=4) == 4
+    fh.seek(0)
+    dst = tmp_path / 'eggs.png'
+    assert pl.transcode(fh, dst, step=2) == 2
+    expected = ir.read_video(small_video, mode='rgb')[:4:2]
+    a = ir.read_series(dst, mode='rgb')
+    assert (np.abs(a * 0xff - expected) <= 4).all()
+
+
+# Tests for _prefetch.
+def test_prefetch_order():
+    """:func:`_prefetch` should yield the items of the iterable in
+    order.
+    """
+    assert list(pl._prefetch(range(100), 2)) == list(range(100))
+
+
+def test_prefetch_stops_early():
+    """If the consumer stops early, :func:`_prefetch` should stop the
+    background thread.
+    """
+    taken = []
+
+    def items():
+        for i in range(100):
+            taken.append(i)
+            yield i
+
+    gen = pl._prefetch(items(), 2)
+    assert next(gen) == 0
+    gen.close()
+    assert len(taken) < 10
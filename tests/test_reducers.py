@@ -0,0 +1,145 @@
+"""
+test_reducers
+~~~~~~~~~~~~~
+
+Unit tests for the imgwriter.reducers module.
+"""
+import numpy as np
+import pytest as pt
+
+from imgwriter import imgreader as ir
+from imgwriter import reducers as rd
+from imgwriter.common import Reducer
+
+
+# Reduce functions. These are defined at the module level so they can
+# be sent to other processes.
+def count(n, batch):
+    """Count the frames."""
+    return n + len(batch)
+
+
+def add(a, b):
+    """Combine two counts."""
+    return a + b
+
+
+# Fixtures.
+@pt.fixture
+def path():
+    """The path to a test video."""
+    return 'tests/data/__test_save_rgb_video_mp4v.mp4'
+
+
+@pt.fixture
+def video(path):
+    """The frames of the test video in RGB."""
+    return ir.read_video(path, mode='rgb')
+
+
+# Tests for reduce_video.
+@pt.mark.parametrize('batch', [1, 2, 16,])
+def test_reduce_video(batch, path):
+    """Given a function and initial value, :func:`reduce_video` should
+    call the function with each batch of frames and return the result.
+    """
+    assert rd.reduce_video(path, count, init=0, batch=batch) == 3
+
+
+def test_reduce_video_reducer(path):
+    """Given a :class:`Reducer`, :func:`reduce_video` should use its
+    functions and initial value.
+    """
+    reducer = Reducer(count, init=10, finish=str)
+    assert rd.reduce_video(path, reducer) == '13'
+
+
+def test_reduce_video_workers(path, video):
+    """Given workers and a combine function, :func:`reduce_video` should
+    reduce segments of the video in parallel and combine them in order.
+    """
+    assert rd.reduce_video(path, count, 0, add, workers=2) == 3
+    result = rd.reduce_video(path, rd.luminance(), workers=3)
+    assert (result == rd.reduce_video(path, rd.luminance())).all()
+
+
+def test_reduce_video_workers_without_combine(path):
+    """If given workers without a combine function, :func:`reduce_video`
+    should raise a ValueError.
+    """
+    with pt.raises(ValueError, match='A combine function is needed'):
+        rd.reduce_video(path, count, init=0, workers=2)
+
+
+def test_reduce_video_invalid_batch(path):
+    """If the batch size isn't positive, :func:`reduce_video` should
+    raise a ValueError.
+    """
+    with pt.raises(ValueError, match='The batch must be greater'):
+        rd.reduce_video(path, count, init=0, batch=0)
+
+
+def test_reduce_video_scale_and_mode(path, video):
+    """:func:`reduce_video` should read frames at the given scale and
+    in the given color space.
+    """
+    result = rd.reduce_video(path, rd.mean(), scale=0.5, mode='gray')
+    assert result.shape == (video.shape[1] // 2, video.shape[2] // 2)
+
+
+# Tests for the built-in reducers.
+def test_histogram(path, video):
+    """The histogram reducer should count the values of each channel."""
+    result = rd.reduce_video(path, rd.histogram(), batch=2)
+    expected = np.stack([
+        np.bincount(video[..., c].ravel(), minlength=256)
+        for c in range(3)
+    ])
+    assert (result == expected).all()
+
+    result = rd.reduce_video(path, rd.histogram(bins=4))
+    assert result.shape == (3, 4)
+    assert (result == expected.reshape((3, 4, 64)).sum(-1)).all()
+
+
+def test_histogram_invalid_bins():
+    """If the bins don't divide 256 evenly, :func:`histogram` should
+    raise a ValueError.
+    """
+    with pt.raises(ValueError, match='The number of bins must divide'):
+        rd.histogram(bins=3)
+
+
+def test_luminance(path, video):
+    """The luminance reducer should find the mean luminance of each
+    frame.
+    """
+    result = rd.reduce_video(path, rd.luminance(), batch=2)
+    expected = (video @ [0.299, 0.587, 0.114]).mean((1, 2))
+    assert np.allclose(result, expected)
+
+
+def test_luminance_bgr(path, video):
+    """Given the mode of BGR frames, the luminance reducer should weight
+    the channels in BGR order.
+    """
+    reducer = rd.luminance(mode=None)
+    result = rd.reduce_video(path, reducer, batch=2, mode=None)
+    expected = (video @ [0.299, 0.587, 0.114]).mean((1, 2))
+    assert np.allclose(result, expected)
+
+
+def test_mean(path, video):
+    """The mean reducer should find the mean frame."""
+    result = rd.reduce_video(path, rd.mean(), batch=2)
+    assert result.dtype == np.float64
+    assert np.allclose(result, video.mean(0))
+
+
+def test_min_max(path, video):
+    """The min_max reducer should find the smallest and largest value
+    of each channel.
+    """
+    mins, maxes = rd.reduce_video(path, rd.min_max(), batch=2)
+    assert (mins == video.min((0, 1, 2))).all()
+    assert (maxes == video.max((0, 1, 2))).all()